@@ -0,0 +1,223 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+# TTL policy by how long ago the requested window ended
+CURRENT_WINDOW_TTL = timedelta(hours=1)  # window reaches into the current month
+RECENT_WINDOW_TTL = timedelta(days=1)  # ended less than RECENT_WINDOW_AGE ago
+CLOSED_WINDOW_TTL = timedelta(days=30)
+RECENT_WINDOW_AGE = timedelta(days=90)
+DEFAULT_TTL = timedelta(days=1)  # requests without an ISO todate (e.g. AOI geometries)
+
+CACHED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+def window_ttl(url: str, today: date | None = None) -> timedelta:
+    """
+    Cache lifetime for a GET request, based on the age of the window in
+    its `todate` query parameter.
+    """
+    if today is None:
+        today = date.today()
+
+    todate = parse_qs(urlparse(url).query).get("todate")
+    if not todate:
+        return DEFAULT_TTL
+
+    try:
+        end = date.fromisoformat(todate[0][:10])
+    except ValueError:
+        return DEFAULT_TTL
+    if end >= today.replace(day=1):
+        return CURRENT_WINDOW_TTL
+    if today - end <= RECENT_WINDOW_AGE:
+        return RECENT_WINDOW_TTL
+    return CLOSED_WINDOW_TTL
+
+
+class ResponseCache:
+    """
+    Persistent cache of GET responses.
+
+    Each entry is a gzip-compressed JSON blob holding the response body
+    and its metadata (url, status, validators, stored_at). Entries are
+    keyed by the full request URL, parameters included, and evicted
+    least-recently-used first once the cache exceeds max_bytes.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: int = 500 * 1024 * 1024,
+        ttl=window_ttl,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._usage: dict[Path, tuple[float, int]] | None = None
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _path(self, url: str) -> Path:
+        return self.cache_dir / f"{self.key(url)}.json.gz"
+
+    def _load_usage(self):
+        if self._usage is None:
+            self._usage = {}
+            for path in self.cache_dir.glob("*.json.gz"):
+                stat = path.stat()
+                self._usage[path] = (stat.st_mtime, stat.st_size)
+        return self._usage
+
+    def get(self, url: str) -> dict | None:
+        path = self._path(url)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning("Dropping unreadable cache entry %s", path)
+            self.delete(url)
+            return None
+
+        self._touch(path)
+        return entry
+
+    def is_fresh(self, entry: dict, now: float | None = None) -> bool:
+        if now is None:
+            now = time.time()
+        age = now - entry["meta"]["stored_at"]
+        return age < self.ttl(entry["meta"]["url"]).total_seconds()
+
+    def put(self, url: str, status: int, headers, body: str):
+        meta = {
+            "url": url,
+            "status": status,
+            "stored_at": time.time(),
+            "headers": {h: headers[h] for h in CACHED_HEADERS if h in headers},
+        }
+        self._write(url, {"meta": meta, "body": body})
+
+    def revalidated(self, url: str, entry: dict):
+        """
+        Mark an entry as fresh again after a 304 Not Modified.
+        """
+        entry["meta"]["stored_at"] = time.time()
+        self._write(url, entry)
+
+    def delete(self, url: str):
+        path = self._path(url)
+        with self._lock:
+            path.unlink(missing_ok=True)
+            self._load_usage().pop(path, None)
+
+    def _touch(self, path: Path):
+        now = time.time()
+        with self._lock:
+            try:
+                os.utime(path, (now, now))
+            except FileNotFoundError:
+                return
+            usage = self._load_usage()
+            if path in usage:
+                usage[path] = (now, usage[path][1])
+
+    def _write(self, url: str, entry: dict):
+        path = self._path(url)
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(entry, f)
+
+        with self._lock:
+            os.replace(tmp, path)
+            self._load_usage()[path] = (time.time(), path.stat().st_size)
+            self._evict()
+
+    def _evict(self):
+        usage = self._usage
+        total = sum(size for _, size in usage.values())
+        if total <= self.max_bytes:
+            return
+
+        for path, (_, size) in sorted(usage.items(), key=lambda item: item[1][0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            del usage[path]
+            total -= size
+            logger.debug("Evicted cache entry %s", path.name)
+
+
+def cached_response(entry: dict, request) -> requests.Response:
+    response = requests.Response()
+    response.status_code = entry["meta"]["status"]
+    response.reason = "OK"
+    response.headers = CaseInsensitiveDict(entry["meta"]["headers"])
+    response._content = entry["body"].encode("utf-8")
+    response.encoding = "utf-8"
+    response.url = request.url
+    response.request = request
+    response.from_cache = True
+    return response
+
+
+class CachingAdapter(BaseAdapter):
+    """
+    Transport adapter that serves GET requests from a ResponseCache and
+    revalidates stale entries with If-None-Match / If-Modified-Since.
+    Other requests, and cache misses, go through `inner`.
+    """
+
+    def __init__(self, cache: ResponseCache, inner: BaseAdapter):
+        super().__init__()
+        self.cache = cache
+        self.inner = inner
+
+    def send(self, request, **kwargs):
+        if request.method != "GET":
+            return self.inner.send(request, **kwargs)
+
+        entry = self.cache.get(request.url)
+        if entry is not None:
+            if self.cache.is_fresh(entry):
+                return cached_response(entry, request)
+
+            validators = entry["meta"]["headers"]
+            if "ETag" in validators:
+                request.headers["If-None-Match"] = validators["ETag"]
+            if "Last-Modified" in validators:
+                request.headers["If-Modified-Since"] = validators["Last-Modified"]
+
+        response = self.inner.send(request, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.revalidated(request.url, entry)
+            return cached_response(entry, request)
+
+        if response.status_code == 200:
+            self.cache.put(request.url, 200, response.headers, response.text)
+            response.from_cache = False
+
+        return response
+
+    def close(self):
+        self.inner.close()
@@ -9,7 +9,15 @@ DATA_DIR.mkdir(exist_ok=True)
 
 today = date.today()
 today_str = today.strftime("%Y%m%d")
-OUTPUT_CSV = DATA_DIR / "gdacs_daily_download" / f"gdacs_flood_db_{today_str}.csv"
+DB_FORMAT = "csv"  # or "parquet" (needs the parquet extra), or "sqlite"
+# The daily DB file; the name predates DB_FORMAT
+OUTPUT_CSV = DATA_DIR / "gdacs_daily_download" / f"gdacs_flood_db_{today_str}.{DB_FORMAT}"
+WINDOW_PROFILE_PATH = DATA_DIR / "window_profile.json"
+DOWNLOAD_STATE_PATH = DATA_DIR / "download_state.json"
+CACHE_DIR = DATA_DIR / "cache"
+HTTP_CACHE_DIR = CACHE_DIR / "http"
+JOURNAL_DIR = DATA_DIR / "journal"
+PARTITIONS_DIR = DATA_DIR / "partitions"
 
 
 BASE_URL = "https://www.gdacs.org/gdacsapi/api/events/geteventlist/SEARCH"
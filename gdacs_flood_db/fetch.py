@@ -1,6 +1,10 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 from .config import BASE_URL
+from .rate_limit import RateLimiter
+from .cache import ResponseCache, CachingAdapter
 
 logger = logging.getLogger(__name__)
 
@@ -63,3 +67,72 @@ def fetch_window(session, start, end, retries=3, timeout=30):
         },
     )
     return []
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """
+    Pooled HTTP transport that waits on a per-host rate limiter
+    before every request (retries included).
+    """
+
+    def __init__(self, rate_limiter: RateLimiter | None = None, **kwargs):
+        self.rate_limiter = rate_limiter
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(request.url)
+        return super().send(request, **kwargs)
+
+
+def configure_session(
+    session,
+    pool_size=10,
+    rate_limit=None,
+    cache: ResponseCache | None = None,
+    transport=None,
+):
+    """
+    Mount a connection pool sized for `pool_size` concurrent requests
+    and, optionally, a per-host limit of `rate_limit` requests/second
+    and an on-disk response cache in front of it.
+
+    `transport` wraps the network adapter before the cache is applied,
+    e.g. partial(RecordingAdapter, archive) or a stand-in server's
+    StandInServer.transport.
+    """
+    limiter = RateLimiter(rate_limit) if rate_limit else None
+    adapter = RateLimitedAdapter(
+        limiter,
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+    )
+    if transport is not None:
+        adapter = transport(adapter)
+    if cache is not None:
+        adapter = CachingAdapter(cache, adapter)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def fetch_windows(fetch, windows, max_workers=1):
+    """
+    Yield (start, end, events) for every window, in input order.
+
+    `fetch` is called as fetch(start, end). With max_workers > 1 up to
+    that many windows are in flight at once; results are still yielded
+    in the order of `windows`.
+    """
+    if max_workers <= 1:
+        for start, end in windows:
+            yield start, end, fetch(start, end)
+        return
+
+    windows = list(windows)
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="gdacs-fetch"
+    ) as pool:
+        results = pool.map(lambda w: fetch(*w), windows)
+        for (start, end), events in zip(windows, results):
+            yield start, end, events
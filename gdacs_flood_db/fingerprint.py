@@ -0,0 +1,119 @@
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+from .schema import FLOOD_FIELDS
+from .utils.detect_db_change import TRACKED_FIELDS, EventDiff, diff_events
+
+logger = logging.getLogger(__name__)
+
+# Row fingerprints are computed over the CSV text of each field, so a row
+# hashes the same whether it comes from normalize_flood_event or from a
+# DB file read back from disk. Integral floats hash as integers: a null
+# in one row turns a whole int column (eventid, alertscore) into floats
+# on read, which must not change the other rows' fingerprints.
+FINGERPRINT_COLUMN = "fingerprint"
+
+
+def fingerprint_path(db_path: Path) -> Path:
+    """
+    Fingerprint index stored alongside a DB CSV.
+    """
+    return db_path.with_name(f"{db_path.stem}.fingerprints.csv")
+
+
+def as_text(df: pd.DataFrame, fields: list[str]) -> pd.DataFrame:
+    """
+    Fields as the strings the CSV writer emits; missing values are "".
+    """
+    values = df[fields].astype(object)
+    for field in fields:
+        column = df[field]
+        if pd.api.types.is_float_dtype(column):
+            integral = (column % 1 == 0).to_numpy()
+            values.loc[integral, field] = column[integral].astype("int64").to_numpy(dtype=object)
+    return values.where(values.notna(), "").astype(str)
+
+
+def row_fingerprints(df: pd.DataFrame, fields: list[str] = FLOOD_FIELDS) -> pd.Series:
+    """
+    Stable 64-bit hash (hex) of each row's fields, indexed by GDACS_ID.
+    """
+    hashes = pd.util.hash_pandas_object(as_text(df, fields), index=False)
+    return pd.Series(
+        [f"{h:016x}" for h in hashes.to_numpy()],
+        index=pd.Index(df["GDACS_ID"], name="GDACS_ID"),
+        name=FINGERPRINT_COLUMN,
+    )
+
+
+def build_fingerprint_index(
+    df: pd.DataFrame,
+    fields: list[str] = FLOOD_FIELDS,
+    tracked: list[str] = TRACKED_FIELDS,
+) -> pd.DataFrame:
+    """
+    GDACS_ID -> fingerprint, plus the tracked fields' values so
+    field-level changes can be reported without the old DB.
+    """
+    index = as_text(df, tracked)
+    index.insert(0, FINGERPRINT_COLUMN, row_fingerprints(df, fields).to_numpy())
+    index.insert(0, "GDACS_ID", df["GDACS_ID"].to_numpy())
+    return index.drop_duplicates("GDACS_ID", keep="last").reset_index(drop=True)
+
+
+def load_fingerprint_index(path: Path) -> pd.DataFrame | None:
+    if not path.exists():
+        return None
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def save_fingerprint_index(index: pd.DataFrame, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    index.to_csv(path, index=False)
+
+
+def diff_fingerprints(
+    df_new: pd.DataFrame,
+    index: pd.DataFrame,
+    fields: list[str] = FLOOD_FIELDS,
+    tracked: list[str] = TRACKED_FIELDS,
+) -> EventDiff:
+    """
+    Diff a fresh DB against the fingerprint index of the previous one.
+
+    Only the fresh rows are hashed; tracked fields are compared just for
+    events whose fingerprint changed. Same events as diff_events against
+    the previous DB, with change_details values in their CSV text form;
+    changed lists every event whose fingerprint changed.
+    """
+    fresh = build_fingerprint_index(df_new, fields, tracked)
+    old = index.set_index("GDACS_ID")[FINGERPRINT_COLUMN]
+
+    previous = fresh["GDACS_ID"].map(old)
+    added = pd.Index(fresh.loc[previous.isna(), "GDACS_ID"], name="GDACS_ID")
+    removed = old.index[~old.index.isin(fresh["GDACS_ID"])]
+
+    is_changed = previous.notna() & (previous != fresh[FINGERPRINT_COLUMN])
+    candidates = fresh.loc[is_changed, "GDACS_ID"]
+    changed = pd.Index(candidates, name="GDACS_ID")
+    logger.info(
+        "Fingerprints: %d changed, %d added, %d removed of %d events",
+        len(candidates),
+        len(added),
+        len(removed),
+        len(fresh),
+    )
+
+    rows = df_new[df_new["GDACS_ID"].isin(candidates)].drop_duplicates("GDACS_ID", keep="last")
+    text_rows = as_text(rows, tracked)
+    text_rows.insert(0, "GDACS_ID", rows["GDACS_ID"].to_numpy())
+    changes = diff_events(text_rows, index[index["GDACS_ID"].isin(candidates)], tracked).updated
+    if changes.empty:
+        return EventDiff(pd.DataFrame(), added, removed, changed)
+
+    updated = rows.set_index("GDACS_ID").loc[changes["GDACS_ID"]]
+    updated["changed_fields"] = changes["changed_fields"].to_numpy()
+    updated["change_details"] = changes["change_details"].to_numpy()
+    return EventDiff(updated.reset_index(), added, removed, changed)
@@ -0,0 +1,93 @@
+import json
+import logging
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from .schema import FLOOD_FIELDS
+from .storage import ISO_FORMAT
+
+logger = logging.getLogger(__name__)
+
+
+def db_watermark(df: pd.DataFrame, today: date | None = None) -> dict:
+    """
+    Summarize how far a DB reaches: the latest event start and the
+    earliest start among events still open (todate not yet passed).
+    Either is None when no event has a parseable date for it, e.g. for
+    an empty DB.
+    """
+    if today is None:
+        today = date.today()
+
+    fromdate = pd.to_datetime(df["fromdate"], format=ISO_FORMAT, errors="coerce")
+    todate = pd.to_datetime(df["todate"], format=ISO_FORMAT, errors="coerce")
+    still_open = fromdate[todate >= pd.Timestamp(today)].dropna()
+
+    return {
+        "max_fromdate": (
+            fromdate.max().date().isoformat() if fromdate.notna().any() else None
+        ),
+        "open_fromdate": (
+            still_open.min().date().isoformat() if not still_open.empty else None
+        ),
+    }
+
+
+def load_state(state_path: Path) -> dict | None:
+    if not state_path.exists():
+        return None
+    with open(state_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state_path: Path, watermark: dict):
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(state_path, "w", encoding="utf-8") as f:
+        json.dump(watermark, f, indent=2)
+
+
+def incremental_start(watermark: dict, lookback_days: int) -> date | None:
+    """
+    First day to re-download: the watermark minus the look-back, or the
+    start of the oldest still-open event if that is earlier. None when
+    the watermark has no latest start, i.e. a full download is needed.
+    """
+    if not watermark.get("max_fromdate"):
+        return None
+    start = date.fromisoformat(watermark["max_fromdate"]) - timedelta(days=lookback_days)
+
+    if watermark.get("open_fromdate"):
+        start = min(start, date.fromisoformat(watermark["open_fromdate"]))
+
+    return start
+
+
+def merge_events(
+    existing: pd.DataFrame,
+    fresh: pd.DataFrame,
+    fields: list[str] = FLOOD_FIELDS,
+) -> pd.DataFrame:
+    """
+    Overwrite existing rows with their freshly downloaded version and
+    append events not seen before. Existing row order is kept.
+    """
+    if fresh.empty:
+        return existing[fields]
+
+    fresh = fresh.drop_duplicates("GDACS_ID", keep="last").set_index("GDACS_ID")
+    merged = existing.set_index("GDACS_ID")
+
+    is_known = fresh.index.isin(merged.index)
+    merged = merged.astype(object)
+    merged.loc[fresh.index[is_known], fresh.columns] = fresh[is_known].astype(object)
+    merged = pd.concat([merged, fresh[~is_known]])
+
+    logger.info(
+        "Merged %d refreshed and %d new events into %d existing",
+        is_known.sum(),
+        (~is_known).sum(),
+        len(existing),
+    )
+    return merged.reset_index()[fields]
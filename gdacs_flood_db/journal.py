@@ -0,0 +1,247 @@
+import io
+import json
+import logging
+import os
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from .fingerprint import as_text
+from .storage import migrate_geometry
+from .utils.detect_db_change import EventDiff
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILE = "journal.jsonl"
+SNAPSHOT_DIR = "snapshots"
+SNAPSHOT_EVERY_DAYS = 30
+
+# The journal holds one JSON line per event change and run:
+#
+#   {"run": "2026-02-04", "time": ..., "op": "insert", "GDACS_ID": ..., "row": {...}}
+#   {"run": ..., "time": ..., "op": "update", "GDACS_ID": ...,
+#    "changes": {field: {"old", "new"}}, "row": {...}}
+#   {"run": ..., "time": ..., "op": "remove", "GDACS_ID": ...}
+#
+# Values are stored as their CSV text. A snapshot is the full DB at the
+# time it was written; the DB at any later date is the nearest snapshot
+# with the journal entries written after it replayed on top. Entries
+# and snapshots are ordered by write time ("time", UTC, sortable as
+# text), not by run date, so several runs on one day replay correctly.
+# Entries and snapshots from before write times were recorded count as
+# written at the start and the end of their run date respectively.
+
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+SNAPSHOT_TIME_FORMAT = "%Y%m%dT%H%M%S%f"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _entry_time(entry: dict) -> str:
+    return entry.get("time") or f"{entry['run']}T00:00:00.000000Z"
+
+
+def _snapshot_time(path: Path) -> str:
+    stamp = path.name.removeprefix("snapshot_").removesuffix(".csv.gz")
+    day, _, written = stamp.partition("_")
+    if not written:
+        return f"{day[:4]}-{day[4:6]}-{day[6:]}T23:59:59.999999Z"
+    return datetime.strptime(written, SNAPSHOT_TIME_FORMAT).strftime(TIME_FORMAT)
+
+
+def _text(value) -> str:
+    if value is None or (pd.api.types.is_scalar(value) and pd.isna(value)):
+        return ""
+    return str(value)
+
+
+def _db_columns(df: pd.DataFrame) -> list[str]:
+    return [c for c in df.columns if not str(c).startswith("Unnamed")]
+
+
+class ChangeJournal:
+    """
+    Append-only log of per-run event inserts, updates and removals, with
+    periodic compacted snapshots for point-in-time reconstruction.
+    """
+
+    def __init__(self, journal_dir: Path):
+        self.dir = journal_dir
+        self.path = journal_dir / JOURNAL_FILE
+        self.snapshot_dir = journal_dir / SNAPSHOT_DIR
+
+    # -- writing --------------------------------------------------------------
+
+    def record(self, run_date: date, diff: EventDiff, df_new: pd.DataFrame) -> int:
+        """
+        Append the changes of one run: diff (from diff_events or
+        diff_fingerprints) between the previous DB and df_new.
+        Returns the number of entries written.
+        """
+        run = run_date.isoformat()
+        time = _now().strftime(TIME_FORMAT)
+        rows = as_text(df_new, _db_columns(df_new))
+        rows.index = df_new["GDACS_ID"].to_numpy()
+        rows = rows[~rows.index.duplicated(keep="last")]
+
+        entries = [
+            {
+                "run": run,
+                "time": time,
+                "op": "insert",
+                "GDACS_ID": gdacs_id,
+                "row": rows.loc[gdacs_id].to_dict(),
+            }
+            for gdacs_id in diff.added
+        ]
+        if not diff.updated.empty:
+            for gdacs_id, details in diff.updated[["GDACS_ID", "change_details"]].itertuples(
+                index=False
+            ):
+                changes = {
+                    field: {"old": _text(change["old"]), "new": _text(change["new"])}
+                    for field, change in details.items()
+                }
+                entries.append(
+                    {
+                        "run": run,
+                        "time": time,
+                        "op": "update",
+                        "GDACS_ID": gdacs_id,
+                        "changes": changes,
+                        "row": rows.loc[gdacs_id].to_dict(),
+                    }
+                )
+        # Rows changed outside the tracked fields: the new row, no field diff
+        reported = set(diff.added)
+        if not diff.updated.empty:
+            reported.update(diff.updated["GDACS_ID"])
+        entries.extend(
+            {
+                "run": run,
+                "time": time,
+                "op": "update",
+                "GDACS_ID": gdacs_id,
+                "changes": {},
+                "row": rows.loc[gdacs_id].to_dict(),
+            }
+            for gdacs_id in diff.upserted()
+            if gdacs_id not in reported
+        )
+        entries.extend(
+            {"run": run, "time": time, "op": "remove", "GDACS_ID": gdacs_id}
+            for gdacs_id in diff.removed
+        )
+
+        self.dir.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+
+        logger.info("Journaled %d changes for run %s", len(entries), run)
+        return len(entries)
+
+    def write_snapshot(self, df: pd.DataFrame, run_date: date) -> Path:
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        written = _now().strftime(SNAPSHOT_TIME_FORMAT)
+        path = self.snapshot_dir / f"snapshot_{run_date:%Y%m%d}_{written}.csv.gz"
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        df[_db_columns(df)].to_csv(tmp_path, index=False, compression="gzip")
+        os.replace(tmp_path, path)
+        logger.info("Snapshot written: %s", path)
+        return path
+
+    def maybe_snapshot(
+        self, df: pd.DataFrame, run_date: date, every_days: int = SNAPSHOT_EVERY_DAYS
+    ) -> Path | None:
+        """
+        Snapshot df when the latest snapshot is `every_days` or more old.
+        """
+        snapshots = self.snapshots()
+        if snapshots and (run_date - snapshots[-1][0]).days < every_days:
+            return None
+        return self.write_snapshot(df, run_date)
+
+    # -- reading --------------------------------------------------------------
+
+    def snapshots(self) -> list[tuple[date, Path]]:
+        """
+        (run date, path) of every snapshot, in the order written.
+        """
+        snapshots = []
+        for path in self.snapshot_dir.glob("snapshot_*.csv.gz"):
+            stamp = path.name.removeprefix("snapshot_")
+            day = date(int(stamp[:4]), int(stamp[4:6]), int(stamp[6:8]))
+            snapshots.append((day, _snapshot_time(path), path))
+        return [(day, path) for day, _, path in sorted(snapshots)]
+
+    def entries(
+        self,
+        since: date | None = None,
+        until: date | None = None,
+        after: str | None = None,
+    ):
+        """
+        Journal entries with since < run <= until, written after the
+        time `after` (TIME_FORMAT) if given.
+        """
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # partially written last line
+                run = date.fromisoformat(entry["run"])
+                if (
+                    (since is None or run > since)
+                    and (until is None or run <= until)
+                    and (after is None or _entry_time(entry) > after)
+                ):
+                    yield entry
+
+    def history(self, gdacs_id: str) -> list[dict]:
+        """
+        All journal entries of one event, oldest first.
+        """
+        return [entry for entry in self.entries() if entry["GDACS_ID"] == gdacs_id]
+
+    def reconstruct(self, as_of: date) -> pd.DataFrame:
+        """
+        The DB as of the end of `as_of`: the nearest earlier snapshot with
+        the journal replayed up to that date.
+        """
+        base = [(day, path) for day, path in self.snapshots() if day <= as_of]
+        if not base:
+            raise ValueError(f"No snapshot on or before {as_of}")
+        snapshot_date, snapshot_path = base[-1]
+
+        db = pd.read_csv(snapshot_path, dtype=str, keep_default_na=False)
+        columns = list(db.columns)
+        rows = dict(zip(db["GDACS_ID"], db.to_dict("records")))
+
+        replayed = 0
+        for entry in self.entries(until=as_of, after=_snapshot_time(snapshot_path)):
+            if entry["op"] == "remove":
+                rows.pop(entry["GDACS_ID"], None)
+            else:
+                rows[entry["GDACS_ID"]] = entry["row"]
+            replayed += 1
+
+        logger.info(
+            "Reconstructed DB as of %s from snapshot %s and %d journal entries",
+            as_of,
+            snapshot_date,
+            replayed,
+        )
+        # Journal rows may carry columns the snapshot predates (lon/lat)
+        for row in rows.values():
+            columns.extend(c for c in row if c not in columns)
+
+        # Round-trip through CSV so columns get the dtypes of a DB read from disk
+        text = pd.DataFrame(list(rows.values()), columns=columns)
+        return migrate_geometry(pd.read_csv(io.StringIO(text.to_csv(index=False))))
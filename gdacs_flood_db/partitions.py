@@ -0,0 +1,183 @@
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+from .storage import read_db, to_typed, write_db
+
+logger = logging.getLogger(__name__)
+
+# The flood DB as a hive-style partitioned dataset:
+#
+#   <root>/year=2020/continent=AF/part.csv
+#   <root>/_partitions.csv            GDACS_ID -> year, continent
+#
+# split by fromdate year and the continent prefix of equi7_grid_code.
+# Events without either, or with a fromdate not starting with a 4-digit
+# year, go to the NO_KEY partition of that level. The
+# manifest tells an update which partition an event used to live in, so
+# only partitions gaining or losing rows are rewritten.
+
+MANIFEST_NAME = "_partitions.csv"
+PART_NAME = "part"
+NO_KEY = "none"
+
+
+def partition_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    year and continent partition of every row, e.g. ("2020", "AF").
+    """
+    # Values without a 4-digit year (malformed dates kept as text) or a
+    # continent prefix go to NO_KEY rather than into an unreadable path
+    year = df["fromdate"].astype("string").str.extract(r"^(\d{4})", expand=False)
+    continent = df["equi7_grid_code"].astype("string").str.extract(r"^([A-Z]{2})", expand=False)
+    return pd.DataFrame(
+        {
+            "year": year.fillna(NO_KEY).to_numpy(dtype=object),
+            "continent": continent.fillna(NO_KEY).to_numpy(dtype=object),
+        },
+        index=df.index,
+    )
+
+
+def partition_path(root: Path, year: str, continent: str, suffix: str) -> Path:
+    return Path(root) / f"year={year}" / f"continent={continent}" / f"{PART_NAME}{suffix}"
+
+
+def _as_keys(values) -> set[str] | None:
+    if values is None:
+        return None
+    if isinstance(values, (str, int)):
+        values = [values]
+    return {str(v) for v in values}
+
+
+def list_partitions(root: Path) -> list[tuple[str, str, Path]]:
+    """
+    (year, continent, path) of every partition file under root.
+    """
+    partitions = []
+    for path in sorted(Path(root).glob(f"year=*/continent=*/{PART_NAME}.*")):
+        year = path.parent.parent.name.removeprefix("year=")
+        continent = path.parent.name.removeprefix("continent=")
+        partitions.append((year, continent, path))
+    return partitions
+
+
+# -----------------------------------------------------------------------------
+# Writing
+# -----------------------------------------------------------------------------
+
+
+def _remove_partition(path: Path):
+    path.unlink(missing_ok=True)
+    for directory in (path.parent, path.parent.parent):
+        if directory.exists() and not any(directory.iterdir()):
+            directory.rmdir()
+
+
+def _write_manifest(root: Path, manifest: pd.DataFrame):
+    Path(root).mkdir(parents=True, exist_ok=True)
+    tmp_path = Path(root) / f".{MANIFEST_NAME}.tmp"
+    manifest.to_csv(tmp_path, index=False)
+    tmp_path.replace(Path(root) / MANIFEST_NAME)
+
+
+def load_manifest(root: Path) -> pd.DataFrame | None:
+    path = Path(root) / MANIFEST_NAME
+    if not path.exists():
+        return None
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def write_partitioned(df: pd.DataFrame, root: Path, suffix: str = ".csv") -> int:
+    """
+    Write the whole DB as a partitioned dataset under root, replacing
+    any previous one. Returns the number of partitions written.
+    """
+    root = Path(root)
+    for *_, path in list_partitions(root):
+        _remove_partition(path)
+
+    keys = partition_keys(df)
+    groups = df.groupby([keys["year"], keys["continent"]], sort=True)
+    for (year, continent), rows in groups:
+        write_db(rows, partition_path(root, year, continent, suffix))
+
+    _write_manifest(root, pd.concat([df[["GDACS_ID"]], keys], axis=1))
+    logger.info("Wrote %d events in %d partitions under %s", len(df), groups.ngroups, root)
+    return groups.ngroups
+
+
+def update_partitions(df_new: pd.DataFrame, ids, root: Path, suffix: str = ".csv") -> int:
+    """
+    Bring the dataset in line with df_new, the full new DB, where only
+    the events `ids` were added, changed or removed. Only the partitions
+    those events move in or out of are rewritten. Returns their number.
+    """
+    root = Path(root)
+    manifest = load_manifest(root)
+    if manifest is None:
+        return write_partitioned(df_new, root, suffix)
+
+    ids = set(ids)
+    keys = partition_keys(df_new)
+    old = manifest[manifest["GDACS_ID"].isin(ids)]
+    new = keys[df_new["GDACS_ID"].isin(ids)]
+    touched = set(zip(old["year"], old["continent"])) | set(zip(new["year"], new["continent"]))
+
+    in_touched = pd.MultiIndex.from_frame(keys).isin(list(touched))
+    groups = dict(list(df_new[in_touched].groupby([keys["year"], keys["continent"]])))
+    for year, continent in sorted(touched):
+        path = partition_path(root, year, continent, suffix)
+        if (year, continent) in groups:
+            write_db(groups[(year, continent)], path)
+        else:
+            _remove_partition(path)
+
+    new_manifest = pd.concat([df_new[["GDACS_ID"]], keys], axis=1)
+    if new_manifest.shape != manifest.shape or not (
+        new_manifest.to_numpy() == manifest.to_numpy()
+    ).all():
+        _write_manifest(root, new_manifest)
+    logger.info("Rewrote %d of the partitions under %s", len(touched), root)
+    return len(touched)
+
+
+# -----------------------------------------------------------------------------
+# Reading
+# -----------------------------------------------------------------------------
+
+
+def read_partitioned(
+    root: Path,
+    continents=None,
+    years=None,
+    typed: bool = False,
+) -> pd.DataFrame:
+    """
+    Read the events of the matching partitions only, e.g.
+    read_partitioned(root, continents="AF", years=range(2018, 2021)).
+    continents are Equi7 prefixes ("AF", "AS", ...), years ints; None
+    matches all.
+    """
+    continents, years = _as_keys(continents), _as_keys(years)
+    paths = [
+        path
+        for year, continent, path in list_partitions(root)
+        if (years is None or year in years)
+        and (continents is None or continent in continents)
+    ]
+    logger.debug("Reading %d partitions under %s", len(paths), root)
+    if not paths:
+        return pd.DataFrame()
+    # Typed once after the concat, so categoricals share their categories
+    df = pd.concat([read_db(path) for path in paths], ignore_index=True)
+    return to_typed(df) if typed else df
+
+
+if __name__ == "__main__":
+    import sys
+
+    n = write_partitioned(read_db(Path(sys.argv[1])), Path(sys.argv[2]))
+    print(f"Partitions written: {n}")
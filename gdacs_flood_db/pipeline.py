@@ -1,45 +1,73 @@
-import csv
 import requests
 import logging
 from datetime import date
-from .config import OUTPUT_CSV
-from .fetch import fetch_window
-from .utils.download_db_utils import normalize_flood_event, month_windows
-from .schema import FLOOD_FIELDS as FIELDS
+from functools import partial
+from pathlib import Path
+import pandas as pd
+from .config import OUTPUT_CSV, WINDOW_PROFILE_PATH, DOWNLOAD_STATE_PATH
+from .fetch import fetch_window, fetch_windows, configure_session
+from .cache import ResponseCache
+from .utils.download_db_utils import normalize_flood_events, month_windows
+from .utils.equi7_grid_code import assign_equi7_tiles_df
+from .schema import EQUI7_TILE_FIELDS, flood_fields
+from .windows import WindowProfile, fetch_adaptive
+from .storage import read_db, write_db
+from .incremental import (
+    db_watermark,
+    load_state,
+    save_state,
+    incremental_start,
+    merge_events,
+)
 
 logger = logging.getLogger(__name__)
 
+FIRST_DATE = date(2015, 1, 1)  # start of a full download
 
-def download_all_floods(
-    start_date: date = date(2015, 1, 1),
+
+def iter_flood_events(
+    start_date: date = FIRST_DATE,
     end_date: date | None = None,
+    max_workers: int = 1,
+    rate_limit: float | None = None,
+    window_profile: Path | None = WINDOW_PROFILE_PATH,
+    cache: ResponseCache | None = None,
+    transport=None,
+    equi7_tiles: bool = False,
 ):
+    """
+    Yield normalized, deduplicated GDACS flood events between start_date
+    and end_date in chronological window order.
+
+    max_workers: number of monthly windows fetched concurrently.
+    rate_limit: maximum requests per second sent to the GDACS host.
+    window_profile: JSON file with the window sizes learned from
+        saturated windows (None to neither read nor persist them).
+    cache: on-disk response cache for the window requests.
+    transport: adapter wrapper for recording or replaying requests
+        (see gdacs_flood_db.replay).
+    equi7_tiles: also emit the EQUI7_TILE_FIELDS columns.
+    """
     if end_date is None:
         end_date = date.today()
 
     seen = set()
-    total = 0
-
-    with (
-        requests.Session() as session,
-        OUTPUT_CSV.open("w", newline="", encoding="utf-8") as f,
-    ):
+    profile = WindowProfile(window_profile)
 
-        writer = csv.DictWriter(f, fieldnames=FIELDS)
-        writer.writeheader()
+    with requests.Session() as session:
+        configure_session(
+            session,
+            pool_size=max_workers,
+            rate_limit=rate_limit,
+            cache=cache,
+            transport=transport,
+        )
 
-        for win_start, win_end in month_windows(start_date, end_date):
-            events = fetch_window(session, win_start, win_end)
-
-            if len(events) >= 100:
-
-                logger.warning(
-                    "Window %s to %s returned 100 events",
-                    win_start,
-                    win_end,
-                )
-                logger.info("Consider reducing the window size to avoid missing data")
+        windows = profile.plan(month_windows(start_date, end_date))
+        fetch = partial(fetch_adaptive, partial(fetch_window, session), profile=profile)
 
+        for win_start, win_end, events in fetch_windows(fetch, windows, max_workers):
+            unseen = []
             for feature in events:
                 event_id = feature.get("properties", {}).get("eventid")
 
@@ -47,8 +75,9 @@ def download_all_floods(
                     continue
 
                 seen.add(event_id)
-                writer.writerow(normalize_flood_event(feature))
-                total += 1
+                unseen.append(feature)
+
+            yield from normalize_flood_events(unseen, equi7_tiles=equi7_tiles)
 
             logger.info(
                 "Processed window %s to %s: %d events",
@@ -56,6 +85,80 @@ def download_all_floods(
                 win_end,
                 len(events),
             )
-    logger.info("Finished downloading flood events. Total unique events: %d", total)
+    profile.save()
+
+
+def download_all_floods(
+    start_date: date = FIRST_DATE,
+    end_date: date | None = None,
+    output_csv: Path | None = None,
+    equi7_tiles: bool = False,
+    **kwargs,
+):
+    """
+    Download all GDACS flood events between start_date and end_date
+    into output_csv (OUTPUT_CSV by default), in the storage format
+    given by its suffix. Keyword arguments are passed to
+    iter_flood_events.
+    """
+    if output_csv is None:
+        output_csv = OUTPUT_CSV
+
+    events = pd.DataFrame(
+        list(iter_flood_events(start_date, end_date, equi7_tiles=equi7_tiles, **kwargs)),
+        columns=flood_fields(equi7_tiles),
+    )
+    write_db(events, output_csv)
+
+    logger.info("Finished downloading flood events. Total unique events: %d", len(events))
+    logger.info("Output saved to %s", output_csv)
+
+
+def download_new_floods(
+    db_path: Path,
+    lookback_days: int = 30,
+    state_path: Path | None = DOWNLOAD_STATE_PATH,
+    equi7_tiles: bool = False,
+    **kwargs,
+):
+    """
+    Incremental download: fetch only the windows since the last run and
+    merge them into the DB at db_path. The merged DB is written to
+    OUTPUT_CSV.
+
+    The watermark (latest event start and oldest still-open event) is
+    read from state_path when available, otherwise from the DB itself.
+    lookback_days re-fetches that many days before the watermark to
+    pick up late edits. Keyword arguments are passed to
+    iter_flood_events.
+    """
+    existing = read_db(db_path)
+
+    watermark = load_state(state_path) if state_path is not None else None
+    if watermark is None:
+        watermark = db_watermark(existing)
+
+    start_date = incremental_start(watermark, lookback_days)
+    if start_date is None:
+        # Empty DB, or no parseable fromdate: nothing to resume from
+        logger.warning("No usable watermark in %s; downloading everything", db_path)
+        start_date = FIRST_DATE
+    logger.info("Incremental download from %s (watermark %s)", start_date, watermark)
+
+    fields = flood_fields(equi7_tiles)
+    fresh = pd.DataFrame(
+        list(iter_flood_events(start_date, equi7_tiles=equi7_tiles, **kwargs)),
+        columns=fields,
+    )
+
+    if equi7_tiles and not set(EQUI7_TILE_FIELDS).issubset(existing.columns):
+        existing = existing.join(assign_equi7_tiles_df(existing))
+
+    merged = merge_events(existing, fresh, fields)
+    write_db(merged, OUTPUT_CSV)
+
+    if state_path is not None:
+        save_state(state_path, db_watermark(merged))
+
+    logger.info("Finished incremental download. Total events: %d", len(merged))
     logger.info("Output saved to %s", OUTPUT_CSV)
-    # Also save a copy as the latest version for easy access
@@ -0,0 +1,243 @@
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import shapely
+from shapely import STRtree
+
+from .schema import TILE_FIELDS, as_list
+from .storage import ISO_FORMAT, read_db
+
+logger = logging.getLogger(__name__)
+
+# An in-memory query engine over a flood DB:
+#
+#   intervals      events grouped into duration classes (powers of two
+#                  of days). Within a class, starts are sorted and no
+#                  event lasts longer than the class maximum, so the
+#                  events overlapping [a, b] all start in
+#                  [a - max duration, b]: two binary searches, then a
+#                  check of the ends over candidates that mostly match.
+#   points         STRtree over the event points
+#   posting lists  sorted row positions per iso3, country, Equi7 code
+#                  and tile
+#
+# A combined query starts from the most selective index and checks the
+# remaining filters on those candidates only. Results are sorted row
+# positions into the frame the index was built from.
+#
+# Times are seconds since the epoch. Events without a fromdate never
+# match a date filter; events without a todate are still ongoing.
+
+DAY = 86_400
+NO_START = np.iinfo(np.int64).min  # NaT as seconds
+OPEN_END = np.iinfo(np.int64).max
+POSTING_FIELDS = ["iso3", "country", "equi7_grid_code", "equi7_t6", "equi7_t3", "equi7_t1"]
+
+
+def _seconds(values: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Seconds since the epoch of ISO date strings or timestamps, and a mask
+    of the values present.
+    """
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        values = pd.to_datetime(values, format=ISO_FORMAT, errors="coerce")
+    return values.to_numpy().astype("datetime64[s]").astype(np.int64), values.notna().to_numpy()
+
+
+def _day_seconds(day) -> int:
+    return int(pd.Timestamp(day).normalize().timestamp())
+
+
+class IntervalIndex:
+    """
+    Sorted start arrays per duration class, answering which intervals
+    overlap a window.
+    """
+
+    def __init__(self, start: np.ndarray, end: np.ndarray, valid: np.ndarray):
+        rows = np.flatnonzero(valid)
+        duration = np.maximum(end[rows] - start[rows], 0)
+        is_open = end[rows] == OPEN_END
+        # Class k holds durations up to 2**k days; open intervals go last
+        days = np.ceil(duration / DAY).astype(np.int64)
+        classes = np.where(is_open, 64, np.ceil(np.log2(days + 1)).astype(np.int64))
+
+        self.classes = []
+        for k in np.unique(classes):
+            members = rows[classes == k]
+            members = members[np.argsort(start[members], kind="stable")]
+            max_duration = (
+                OPEN_END if k == 64 else int(np.max(end[members] - start[members], initial=0))
+            )
+            self.classes.append((start[members], end[members], members, max_duration))
+
+    def _ranges(self, a: int, b: int):
+        for starts, ends, members, max_duration in self.classes:
+            lo = np.searchsorted(starts, max(a - max_duration, NO_START), side="left")
+            hi = np.searchsorted(starts, b, side="right")
+            yield ends[lo:hi], members[lo:hi]
+
+    def candidates(self, a: int, b: int) -> int:
+        """
+        Upper bound of the number of intervals overlapping [a, b], from
+        binary searches only.
+        """
+        return sum(len(members) for _, members in self._ranges(a, b))
+
+    def overlapping(self, a: int, b: int) -> np.ndarray:
+        """
+        Positions of the intervals with start <= b and end >= a, sorted.
+        """
+        hits = [members[ends >= a] for ends, members in self._ranges(a, b)]
+        return np.sort(np.concatenate(hits)) if hits else np.empty(0, dtype=np.int64)
+
+
+class FloodIndex:
+    """
+    Temporal, spatial and attribute indexes over the events of a flood
+    DB frame, for combined queries without scanning it.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        n = len(df)
+
+        self.start, has_start = _seconds(df["fromdate"])
+        end, has_end = _seconds(df["todate"])
+        self.end = np.where(has_end, end, OPEN_END)
+        self.intervals = IntervalIndex(self.start, self.end, has_start)
+
+        self.lon = df["lon"].to_numpy(dtype=float)
+        self.lat = df["lat"].to_numpy(dtype=float)
+        self.located = np.flatnonzero(~(np.isnan(self.lon) | np.isnan(self.lat)))
+        self.tree = STRtree(shapely.points(self.lon[self.located], self.lat[self.located]))
+
+        self.codes, self.postings = {}, {}
+        for field in POSTING_FIELDS:
+            if field not in df:
+                continue
+            values = df[field].to_numpy(dtype=object)
+            present = pd.notna(values)
+            categories, inverse = np.unique(values[present].astype(str), return_inverse=True)
+            codes = np.full(n, -1, dtype=np.int64)
+            codes[present] = inverse
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(categories) + 1))
+            self.codes[field] = (dict(zip(categories, range(len(categories)))), codes)
+            self.postings[field] = {
+                category: order[bounds[i] : bounds[i + 1]]
+                for i, category in enumerate(categories)
+                if bounds[i] < bounds[i + 1]
+            }
+
+        logger.info("Indexed %d events", n)
+
+    @classmethod
+    def from_db(cls, path: Path) -> "FloodIndex":
+        return cls(read_db(path))
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    # -- single indexes -------------------------------------------------------
+
+    def active_on(self, day) -> np.ndarray:
+        """
+        Events active at any time on `day`.
+        """
+        return self.overlapping(day, day)
+
+    def overlapping(self, since, until) -> np.ndarray:
+        """
+        Events overlapping the days since..until, both inclusive.
+        """
+        return self.intervals.overlapping(_day_seconds(since), _day_seconds(until) + DAY - 1)
+
+    def within(self, bbox: tuple[float, float, float, float]) -> np.ndarray:
+        """
+        Events whose point lies in (min_lon, min_lat, max_lon, max_lat).
+        """
+        hits = self.tree.query(shapely.box(*bbox))
+        return np.sort(self.located[hits])
+
+    def posting(self, field: str, values) -> np.ndarray:
+        postings = self.postings.get(field)
+        if postings is None:
+            raise ValueError(f"No {field} column to filter on")
+        lists = [postings[v] for v in as_list(values) if v in postings]
+        if not lists:
+            return np.empty(0, dtype=np.int64)
+        return lists[0] if len(lists) == 1 else np.sort(np.concatenate(lists))
+
+    # -- combined queries -----------------------------------------------------
+
+    def _attribute_filters(self, country, iso3, tile) -> list[tuple[str, list]]:
+        filters = []
+        if country is not None:
+            filters.append(("country", as_list(country)))
+        if iso3 is not None:
+            filters.append(("iso3", as_list(iso3)))
+        if tile is not None:
+            by_field: dict[str, list] = {}
+            for name in as_list(tile):
+                by_field.setdefault(TILE_FIELDS.get(name[-2:], "equi7_grid_code"), []).append(name)
+            if len(by_field) > 1:
+                raise ValueError("Tiles of one tiling per query")
+            filters.extend(by_field.items())
+        return filters
+
+    def select(
+        self,
+        country=None,
+        iso3=None,
+        since=None,
+        until=None,
+        bbox: tuple[float, float, float, float] | None = None,
+        tile=None,
+    ) -> np.ndarray:
+        """
+        Sorted row positions of the events matching every given filter;
+        same filters as FloodStore.query.
+        """
+        attributes = self._attribute_filters(country, iso3, tile)
+        dated = since is not None or until is not None
+        a = _day_seconds(since) if since is not None else NO_START
+        b = _day_seconds(until) + DAY - 1 if until is not None else OPEN_END - 1
+
+        # Candidates from the most selective of the posting lists and the
+        # interval index; the STRtree only when the bbox is the sole filter
+        lists = [self.posting(field, values) for field, values in attributes]
+        shortest = min(lists, key=len) if lists else None
+        if dated and (shortest is None or self.intervals.candidates(a, b) < len(shortest)):
+            rows = self.intervals.overlapping(a, b)
+        elif shortest is not None:
+            rows = shortest
+        elif bbox is not None:
+            return self.within(bbox)
+        else:
+            return np.arange(len(self.df))
+
+        # The other filters are checked on the candidates only
+        if dated:
+            start, end = self.start[rows], self.end[rows]
+            rows = rows[(start != NO_START) & (start <= b) & (end >= a)]
+
+        if bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = bbox
+            lon, lat = self.lon[rows], self.lat[rows]
+            rows = rows[(lon >= min_lon) & (lon <= max_lon) & (lat >= min_lat) & (lat <= max_lat)]
+
+        for field, values in attributes:
+            lookup, codes = self.codes[field]
+            wanted = [lookup[v] for v in values if v in lookup]
+            rows = rows[np.isin(codes[rows], wanted)]
+
+        return rows
+
+    def query(self, **filters) -> pd.DataFrame:
+        """
+        The matching events as rows of the indexed frame.
+        """
+        return self.df.iloc[self.select(**filters)]
@@ -0,0 +1,252 @@
+import gzip
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+
+from requests.adapters import BaseAdapter
+
+from .windows import GDACS_EVENT_CAP
+
+logger = logging.getLogger(__name__)
+
+GDACS_HOSTS = ("www.gdacs.org", "gdacs.org")
+EVENT_LIST_PATH = "/gdacsapi/api/events/geteventlist/SEARCH"
+
+
+def request_key(url: str) -> str:
+    """
+    Host-independent key for a request: path plus sorted query.
+    """
+    parsed = urlparse(url)
+    query = urlencode(sorted(parse_qsl(parsed.query)))
+    return f"{parsed.path}?{query}"
+
+
+class FixtureArchive:
+    """
+    Recorded responses, stored as gzip-compressed JSON lines.
+    """
+
+    def __init__(self, entries: dict[str, dict] | None = None):
+        self.entries = entries if entries is not None else {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path) -> "FixtureArchive":
+        entries = {}
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                entries[entry["key"]] = entry
+        return cls(entries)
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry) + "\n")
+
+    def add(self, url: str, status: int, content_type: str | None, body: str):
+        key = request_key(url)
+        with self._lock:
+            self.entries[key] = {
+                "key": key,
+                "status": status,
+                "content_type": content_type,
+                "body": body,
+            }
+
+    def lookup(self, url: str) -> dict | None:
+        return self.entries.get(request_key(url))
+
+    def events(self) -> list[dict]:
+        """
+        All recorded event-list features, deduplicated by eventid and
+        sorted by fromdate.
+        """
+        features = {}
+        for key, entry in self.entries.items():
+            if not key.startswith(EVENT_LIST_PATH) or entry["status"] != 200:
+                continue
+            for feature in json.loads(entry["body"]).get("features", []):
+                features[feature["properties"]["eventid"]] = feature
+        return sorted(features.values(), key=lambda f: f["properties"]["fromdate"])
+
+
+class RecordingAdapter(BaseAdapter):
+    """
+    Transport adapter that passes requests through to `inner` and records
+    every successful GET response into `archive`.
+    """
+
+    def __init__(self, archive: FixtureArchive, inner: BaseAdapter):
+        super().__init__()
+        self.archive = archive
+        self.inner = inner
+
+    def send(self, request, **kwargs):
+        response = self.inner.send(request, **kwargs)
+        if request.method == "GET" and response.status_code == 200:
+            self.archive.add(
+                request.url,
+                response.status_code,
+                response.headers.get("Content-Type"),
+                response.text,
+            )
+        return response
+
+    def close(self):
+        self.inner.close()
+
+
+class RedirectAdapter(BaseAdapter):
+    """
+    Transport adapter that sends requests for GDACS hosts to `base_url`.
+    """
+
+    def __init__(self, base_url: str, inner: BaseAdapter):
+        super().__init__()
+        self.base = urlparse(base_url)
+        self.inner = inner
+
+    def send(self, request, **kwargs):
+        parsed = urlparse(request.url)
+        if parsed.netloc in GDACS_HOSTS:
+            request.url = urlunparse(
+                parsed._replace(scheme=self.base.scheme, netloc=self.base.netloc)
+            )
+        return self.inner.send(request, **kwargs)
+
+    def close(self):
+        self.inner.close()
+
+
+def _parse_when(value: str) -> datetime:
+    return datetime.fromisoformat(value.rstrip("Z"))
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    server: "StandInServer"
+
+    def do_GET(self):
+        srv = self.server
+        srv.count_request()
+
+        if srv.latency:
+            time.sleep(srv.latency)
+
+        if srv.should_fail():
+            self._send(503, "text/plain", "Service Unavailable")
+            return
+
+        path = urlparse(self.path).path
+        if path == EVENT_LIST_PATH:
+            self._send(200, "application/json", srv.search(self.path))
+            return
+
+        entry = srv.archive.lookup(self.path)
+        if entry is None:
+            self._send(404, "text/plain", "Not Found")
+        else:
+            self._send(entry["status"], entry["content_type"], entry["body"])
+
+    def _send(self, status: int, content_type: str | None, body: str):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type or "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Local HTTP stand-in for the GDACS API backed by a FixtureArchive.
+
+    Event-list searches are answered from all recorded events that
+    overlap the requested window, truncated at `event_cap` like the real
+    API. Other paths (getgeometry, ...) are replayed verbatim.
+
+    latency: seconds added to every response.
+    error_rate: probability of answering 503.
+    burst_every / burst_length: after every `burst_every` requests, the
+        next `burst_length` requests fail with 503.
+
+    Use as a context manager; `transport` plugs into configure_session
+    to route www.gdacs.org requests here.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        archive: FixtureArchive,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        burst_every: int = 0,
+        burst_length: int = 0,
+        event_cap: int = GDACS_EVENT_CAP,
+        seed: int = 0,
+    ):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.archive = archive
+        self.latency = latency
+        self.error_rate = error_rate
+        self.burst_every = burst_every
+        self.burst_length = burst_length
+        self.event_cap = event_cap
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._events = archive.events()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def transport(self, inner: BaseAdapter) -> BaseAdapter:
+        return RedirectAdapter(self.base_url, inner)
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            if self.burst_every:
+                cycle = self.burst_every + self.burst_length
+                if (self.requests - 1) % cycle >= self.burst_every:
+                    return True
+            return self._random.random() < self.error_rate
+
+    def search(self, path: str) -> str:
+        params = dict(parse_qsl(urlparse(path).query))
+        start = _parse_when(params["fromdate"])
+        end = _parse_when(params["todate"])
+
+        features = [
+            f
+            for f in self._events
+            if _parse_when(f["properties"]["fromdate"]) <= end
+            and _parse_when(f["properties"]["todate"]) >= start
+        ]
+        return json.dumps({"features": features[: self.event_cap]})
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
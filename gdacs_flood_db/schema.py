@@ -11,5 +11,35 @@ FLOOD_FIELDS = [
     "geometry_url",
     "report_url",
     "details_url",
-    "geometry",
+    "lon",
+    "lat",
 ]
+
+# DBs written before lon/lat held the GeoJSON point as str(dict)
+LEGACY_GEOMETRY_FIELD = "geometry"
+
+# Optional multi-resolution Equi7 tiling columns, emitted after
+# equi7_grid_code when requested
+EQUI7_TILE_FIELDS = [
+    "equi7_continent",
+    "equi7_t6",
+    "equi7_t3",
+    "equi7_t1",
+]
+# Column holding the tile names of each tiling; anything else (Equi7
+# codes such as "AF020M") is looked up in equi7_grid_code
+TILE_FIELDS = {"T6": "equi7_t6", "T3": "equi7_t3", "T1": "equi7_t1"}
+
+
+def flood_fields(equi7_tiles: bool = False) -> list[str]:
+    if not equi7_tiles:
+        return FLOOD_FIELDS
+    at = FLOOD_FIELDS.index("equi7_grid_code") + 1
+    return FLOOD_FIELDS[:at] + EQUI7_TILE_FIELDS + FLOOD_FIELDS[at:]
+
+
+def as_list(value) -> list:
+    """
+    Filter values as a list; a single string is one value.
+    """
+    return [value] if isinstance(value, str) else list(value)
@@ -0,0 +1,333 @@
+import logging
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+import pandas as pd
+
+from .schema import EQUI7_TILE_FIELDS, FLOOD_FIELDS, TILE_FIELDS, as_list
+from .storage import ISO_FORMAT, to_text
+from .utils.detect_db_change import EventDiff
+
+logger = logging.getLogger(__name__)
+
+# The flood DB as one SQLite file:
+#
+#   events         one row per GDACS_ID, columns as in the DB written to
+#                  it; `id` is a stable integer key (an INTEGER PRIMARY
+#                  KEY survives VACUUM, a plain rowid does not)
+#   events_rtree   R*Tree of the event points, keyed by events.id and
+#                  kept in sync by triggers
+#
+# Dates are stored as their ISO text, which sorts chronologically, so
+# the fromdate/todate indexes serve date range queries. Columns without
+# a declared type keep values as written, so a read returns the dtypes
+# of the CSV DB. Columns a later write brings along are added to the
+# table.
+
+TABLE = "events"
+RTREE = "events_rtree"
+COLUMN_TYPES = {
+    "GDACS_ID": "TEXT NOT NULL UNIQUE",
+    "eventid": "INTEGER",
+    "lon": "REAL",
+    "lat": "REAL",
+}
+INDEXED_FIELDS = ["fromdate", "todate", "iso3", "country", "equi7_grid_code"]
+
+RTREE_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {RTREE} USING rtree(
+        id, min_lon, max_lon, min_lat, max_lat
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_rtree_insert AFTER INSERT ON {TABLE}
+    WHEN NEW.lon IS NOT NULL AND NEW.lat IS NOT NULL BEGIN
+        INSERT INTO {RTREE} VALUES (NEW.id, NEW.lon, NEW.lon, NEW.lat, NEW.lat);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_rtree_update AFTER UPDATE OF lon, lat ON {TABLE}
+    BEGIN
+        DELETE FROM {RTREE} WHERE id = OLD.id;
+        INSERT INTO {RTREE} SELECT NEW.id, NEW.lon, NEW.lon, NEW.lat, NEW.lat
+        WHERE NEW.lon IS NOT NULL AND NEW.lat IS NOT NULL;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_rtree_delete AFTER DELETE ON {TABLE}
+    BEGIN
+        DELETE FROM {RTREE} WHERE id = OLD.id;
+    END""",
+]
+
+
+def _column_sql(column: str) -> str:
+    return f'"{column}" {COLUMN_TYPES.get(column, "")}'.rstrip()
+
+
+def _day_start(day) -> str:
+    return pd.Timestamp(day).normalize().strftime(ISO_FORMAT)
+
+
+def _records(df: pd.DataFrame, columns: list[str]) -> list[tuple]:
+    """
+    Rows as tuples of Python scalars, with None for missing values.
+    """
+    values = df[columns].astype(object)
+    return list(values.where(values.notna(), None).itertuples(index=False, name=None))
+
+
+class FloodStore:
+    """
+    Flood DB in SQLite with indexes on dates, country and Equi7 code,
+    an R*Tree over the event points, and transactional upserts.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- schema ---------------------------------------------------------------
+
+    def columns(self) -> list[str]:
+        rows = self.conn.execute(f"PRAGMA table_info({TABLE})").fetchall()
+        return [row[1] for row in rows if row[1] != "id"]
+
+    def _create_table(self, columns: list[str]):
+        """
+        (Re)create an empty events table with the given columns.
+        """
+        self.conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        self.conn.execute(f"DROP TABLE IF EXISTS {RTREE}")
+        self.conn.execute(
+            f"CREATE TABLE {TABLE} (id INTEGER PRIMARY KEY, "
+            f"{', '.join(_column_sql(c) for c in columns)})"
+        )
+
+    def _ensure_columns(self, columns: list[str]):
+        existing = self.columns()
+        if not existing:
+            self._create_table(columns)
+            self._ensure_indexes()
+            return
+        missing = [c for c in columns if c not in existing]
+        for column in missing:
+            self.conn.execute(f"ALTER TABLE {TABLE} ADD COLUMN {_column_sql(column)}")
+        if missing:
+            self._ensure_indexes()
+
+    def _ensure_indexes(self):
+        existing = set(self.columns())
+        for field in INDEXED_FIELDS + EQUI7_TILE_FIELDS:
+            if field in existing:
+                self.conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS {TABLE}_{field} ON {TABLE} ("{field}")'
+                )
+        if {"lon", "lat"} <= existing:
+            for statement in RTREE_SCHEMA:
+                self.conn.execute(statement)
+
+    # -- writing --------------------------------------------------------------
+
+    def _upsert(self, df: pd.DataFrame) -> int:
+        rows = to_text(df).drop_duplicates("GDACS_ID", keep="last")
+        columns = list(rows.columns)
+        quoted = ", ".join(f'"{c}"' for c in columns)
+        updates = ", ".join(f'"{c}" = excluded."{c}"' for c in columns if c != "GDACS_ID")
+        self._ensure_columns(columns)
+        self.conn.executemany(
+            f"INSERT INTO {TABLE} ({quoted}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT(GDACS_ID) DO UPDATE SET {updates}",
+            _records(rows, columns),
+        )
+        return len(rows)
+
+    def _delete(self, ids) -> int:
+        cursor = self.conn.executemany(
+            f"DELETE FROM {TABLE} WHERE GDACS_ID = ?", [(i,) for i in ids]
+        )
+        return cursor.rowcount
+
+    def upsert(self, df: pd.DataFrame) -> int:
+        """
+        Insert new events and overwrite existing ones by GDACS_ID, in one
+        transaction. Returns the number of rows written.
+        """
+        if df.empty:
+            return 0
+        with self.conn:
+            return self._upsert(df)
+
+    def delete(self, ids) -> int:
+        with self.conn:
+            return self._delete(ids)
+
+    def apply_diff(self, diff: EventDiff, df_new: pd.DataFrame) -> int:
+        """
+        Persist one daily diff: upsert the added and changed events of
+        df_new (any field, not only the tracked ones) and delete the
+        removed ones, all in one transaction.
+        """
+        rows = df_new[df_new["GDACS_ID"].isin(diff.upserted())]
+
+        with self.conn:
+            written = self._upsert(rows) if not rows.empty else 0
+            removed = self._delete(diff.removed)
+        logger.info("Store updated: %d events upserted, %d removed", written, removed)
+        return written + removed
+
+    def load(self, df: pd.DataFrame):
+        """
+        Bulk load: replace the store's content with df. Indexes are built
+        once after the insert rather than updated row by row.
+        """
+        rows = to_text(df)
+        columns = list(rows.columns)
+        quoted = ", ".join(f'"{c}"' for c in columns)
+        with self.conn:
+            self._create_table(columns)
+            self.conn.executemany(
+                f"INSERT INTO {TABLE} ({quoted}) VALUES ({', '.join('?' * len(columns))})",
+                _records(rows, columns),
+            )
+            self._ensure_indexes()
+            if {"lon", "lat"} <= set(columns):
+                self.conn.execute(
+                    f"INSERT INTO {RTREE} SELECT id, lon, lon, lat, lat FROM {TABLE} "
+                    "WHERE lon IS NOT NULL AND lat IS NOT NULL"
+                )
+        logger.info("Loaded %d events into %s", len(rows), self.path)
+
+    # -- reading --------------------------------------------------------------
+
+    def __len__(self) -> int:
+        if not self.columns():
+            return 0
+        return self.conn.execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0]
+
+    def _select(self, where: list[str], params: list, joins: str = "") -> pd.DataFrame:
+        columns = self.columns()
+        if not columns:
+            return pd.DataFrame(columns=FLOOD_FIELDS)
+        selected = ", ".join(f'e."{c}"' for c in columns)
+        sql = f"SELECT {selected} FROM {TABLE} e {joins}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY e.id"
+        with closing(self.conn.execute(sql, params)) as cursor:
+            df = pd.DataFrame(cursor.fetchall(), columns=columns)
+        for field in ("lon", "lat"):
+            if field in df:
+                df[field] = df[field].astype(float)
+        return df
+
+    def read(self) -> pd.DataFrame:
+        """
+        All events, in the text form read_db returns for a CSV DB.
+        """
+        return self._select([], [])
+
+    def get(self, ids) -> pd.DataFrame:
+        ids = as_list(ids)
+        return self._select([f"e.GDACS_ID IN ({', '.join('?' * len(ids))})"], ids)
+
+    def query(
+        self,
+        country=None,
+        iso3=None,
+        since=None,
+        until=None,
+        bbox: tuple[float, float, float, float] | None = None,
+        tile=None,
+    ) -> pd.DataFrame:
+        """
+        Events matching every given filter:
+
+        country, iso3  one value or a list
+        since, until   events overlapping these days (inclusive)
+        bbox           (min_lon, min_lat, max_lon, max_lat), via the R*Tree
+        tile           Equi7 code ("AF020M") or T6/T3/T1 tile names
+                       ("AF_E036N090T6"), one value or a list
+        """
+        where, params, joins = [], [], ""
+
+        for field, values in (("country", country), ("iso3", iso3)):
+            if values is not None:
+                values = as_list(values)
+                where.append(f"e.{field} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+
+        if since is not None:
+            where.append("(e.todate >= ? OR e.todate IS NULL)")
+            params.append(_day_start(since))
+        if until is not None:
+            where.append("e.fromdate < ?")
+            params.append(_day_start(pd.Timestamp(until) + pd.Timedelta(days=1)))
+
+        if bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = bbox
+            # The R*Tree holds 32-bit bounds rounded outward; the exact
+            # coordinates settle points on the bbox edge
+            joins = f"JOIN {RTREE} r ON r.id = e.id"
+            where.append(
+                "r.max_lon >= ? AND r.min_lon <= ? AND r.max_lat >= ? AND r.min_lat <= ?"
+                " AND e.lon BETWEEN ? AND ? AND e.lat BETWEEN ? AND ?"
+            )
+            params.extend([min_lon, max_lon, min_lat, max_lat])
+            params.extend([min_lon, max_lon, min_lat, max_lat])
+
+        if tile is not None:
+            by_field: dict[str, list[str]] = {}
+            for name in as_list(tile):
+                field = TILE_FIELDS.get(name[-2:], "equi7_grid_code")
+                by_field.setdefault(field, []).append(name)
+            clauses = []
+            for field, names in by_field.items():
+                if field not in self.columns():
+                    raise ValueError(f"No {field} column in {self.path} to filter tiles on")
+                clauses.append(f"e.{field} IN ({', '.join('?' * len(names))})")
+                params.extend(names)
+            where.append("(" + " OR ".join(clauses) + ")")
+
+        return self._select(where, params, joins)
+
+
+# -----------------------------------------------------------------------------
+# Storage backend
+# -----------------------------------------------------------------------------
+
+
+def read_store(path: Path) -> pd.DataFrame:
+    with FloodStore(path) as store:
+        return store.read()
+
+
+def write_store(df: pd.DataFrame, path: Path):
+    with FloodStore(path) as store:
+        store.load(df)
+
+
+def bulk_load_csv(csv_path: Path, store_path: Path, chunk_size: int = 100_000) -> int:
+    """
+    Load a CSV DB into a new or existing store, chunk by chunk, upserting
+    on GDACS_ID. Returns the number of events in the store.
+    """
+    from .storage import migrate_geometry
+
+    with FloodStore(store_path) as store:
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_size):
+            chunk = chunk.loc[:, ~chunk.columns.str.startswith("Unnamed")]
+            store.upsert(migrate_geometry(chunk))
+        return len(store)
+
+
+if __name__ == "__main__":
+    import sys
+
+    csv_path, store_path = (Path(arg) for arg in sys.argv[1:3])
+    print(f"Events in {store_path}: {bulk_load_csv(csv_path, store_path)}")
@@ -0,0 +1,298 @@
+import logging
+import os
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from .schema import LEGACY_GEOMETRY_FIELD
+from .utils.equi7_grid_code import geometry_lonlat
+
+logger = logging.getLogger(__name__)
+
+# A single read/write API for the flood DB. The backend is picked by file
+# suffix: CSV keeps every column as text, Parquet stores typed columns
+# (timestamps, categoricals) plus a point geometry column as GeoParquet,
+# and SQLite (sqlite_store) adds indexed queries and in-place upserts.
+#
+# read_db returns the text form every consumer has always seen (ISO
+# date strings, float lon/lat) unless typed=True. Conversion to the typed
+# form is lossless: a date column is only typed when every value formats
+# back to its original text, otherwise it stays a string column.
+#
+# DBs from before lon/lat replaced the str(dict) geometry column are
+# migrated on read and write.
+
+ISO_FORMAT = "%Y-%m-%dT%H:%M:%S"
+TIMESTAMP_FIELDS = ["fromdate", "todate"]
+CATEGORICAL_FIELDS = [
+    "alertlevel",
+    "country",
+    "iso3",
+    "equi7_grid_code",
+    "equi7_continent",
+]
+CRS = "EPSG:4326"
+
+
+# -----------------------------------------------------------------------------
+# Legacy geometry column
+# -----------------------------------------------------------------------------
+
+
+def migrate_geometry(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replace the legacy str(dict) geometry column with float lon/lat
+    columns in one vectorized pass. The geometry column is kept, with a
+    warning, when some value is not a point.
+    """
+    if LEGACY_GEOMETRY_FIELD not in df or isinstance(df, _geodataframe_type()):
+        return df
+
+    geometry = df[LEGACY_GEOMETRY_FIELD]
+    lon, lat = geometry_lonlat(geometry)
+    # The coordinate pattern also matches the first vertex of a polygon
+    not_point = ~geometry.astype(str).str.contains("Point", regex=False).to_numpy()
+    lon = np.where(not_point, np.nan, lon)
+    lat = np.where(not_point, np.nan, lat)
+    if "lon" in df and "lat" in df:
+        # Rows written after the switch already have lon/lat
+        lon = np.where(df["lon"].isna(), lon, df["lon"].to_numpy(dtype=float))
+        lat = np.where(df["lat"].isna(), lat, df["lat"].to_numpy(dtype=float))
+
+    unparsed = geometry.notna().to_numpy() & (np.isnan(lon) | np.isnan(lat))
+    columns = [c for c in df.columns if c not in ("lon", "lat")]
+    at = columns.index(LEGACY_GEOMETRY_FIELD)
+    if unparsed.any():
+        logger.warning(
+            "Keeping %s: %d values are not points", LEGACY_GEOMETRY_FIELD, unparsed.sum()
+        )
+        columns = columns[: at + 1] + ["lon", "lat"] + columns[at + 1 :]
+    else:
+        columns = columns[:at] + ["lon", "lat"] + columns[at + 1 :]
+
+    return df.assign(lon=lon, lat=lat)[columns]
+
+
+# -----------------------------------------------------------------------------
+# Text <-> typed columns
+# -----------------------------------------------------------------------------
+
+
+def iso_text(timestamps: pd.Series) -> pd.Series:
+    """
+    ISO_FORMAT strings of a datetime column; much faster than
+    .dt.strftime, which formats every value in Python.
+    """
+    seconds = timestamps.to_numpy().astype("datetime64[s]")
+    text = pd.Series(seconds.astype(str), index=timestamps.index, dtype=object)
+    return text.where(timestamps.notna())
+
+
+def _same_text(original: pd.Series, formatted: pd.Series) -> bool:
+    original = original.astype(object).where(original.notna())
+    return bool((original.isna() == formatted.isna()).all()) and bool(
+        (original.dropna().astype(str) == formatted.dropna()).all()
+    )
+
+
+def to_typed(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Typed copy of a DB frame: timestamp and categorical columns, and a
+    GeoDataFrame with a point geometry column built from lon/lat.
+    """
+    typed = migrate_geometry(df).copy()
+
+    for field in TIMESTAMP_FIELDS:
+        if field not in typed or pd.api.types.is_datetime64_any_dtype(typed[field]):
+            continue
+        parsed = pd.to_datetime(typed[field], format=ISO_FORMAT, errors="coerce")
+        if _same_text(typed[field], iso_text(parsed)):
+            typed[field] = parsed
+        else:
+            logger.warning("Keeping %s as text: not all values are %s", field, ISO_FORMAT)
+
+    for field in CATEGORICAL_FIELDS:
+        if field in typed:
+            typed[field] = typed[field].astype("category")
+
+    # A legacy geometry column that did not migrate stays as text
+    if (
+        "lon" in typed
+        and "lat" in typed
+        and LEGACY_GEOMETRY_FIELD not in typed
+        and not isinstance(typed, _geodataframe_type())
+    ):
+        typed = to_geodataframe(typed)
+
+    return typed
+
+
+def to_geodataframe(df: pd.DataFrame):
+    """
+    GeoDataFrame with points from the lon/lat columns, in one call.
+    """
+    import geopandas as gpd
+
+    lon = df["lon"].to_numpy(dtype=float)
+    lat = df["lat"].to_numpy(dtype=float)
+    points = gpd.points_from_xy(lon, lat, crs=CRS)
+    points[np.isnan(lon) | np.isnan(lat)] = None
+    return gpd.GeoDataFrame(df, geometry=points)
+
+
+def to_text(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Inverse of to_typed: ISO date strings, object columns and float
+    lon/lat, as read from a CSV DB.
+    """
+    text = pd.DataFrame(df).copy()
+
+    if isinstance(df, _geodataframe_type()):
+        points = df.geometry.to_numpy()
+        if "lon" not in text:
+            text["lon"] = shapely.get_x(points)
+            text["lat"] = shapely.get_y(points)
+        text = text.drop(columns=df.geometry.name)
+
+    for field in text.columns:
+        column = text[field]
+        if pd.api.types.is_datetime64_any_dtype(column):
+            text[field] = iso_text(column)
+        elif isinstance(column.dtype, pd.CategoricalDtype):
+            text[field] = column.astype(object).where(column.notna())
+
+    return pd.DataFrame(text)
+
+
+def _geodataframe_type():
+    try:
+        from geopandas import GeoDataFrame
+    except ImportError:  # pragma: no cover
+        return ()
+    return GeoDataFrame
+
+
+# -----------------------------------------------------------------------------
+# Backends
+# -----------------------------------------------------------------------------
+
+
+class Backend(NamedTuple):
+    read: Callable[[Path], pd.DataFrame]  # returns text or typed frames
+    write: Callable[[pd.DataFrame, Path], None]
+    typed: bool  # whether read returns the typed form
+
+
+def _read_csv(path: Path) -> pd.DataFrame:
+    df = pd.read_csv(path)
+    # Older copies of latest_gdacs_flood_db.csv carry an unnamed index column
+    return df.loc[:, ~df.columns.str.startswith("Unnamed")]
+
+
+def _write_csv(df: pd.DataFrame, path: Path):
+    to_text(df).to_csv(path, index=False)
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "Parquet storage needs pyarrow: pip install 'gdacs-flood-db[parquet]'"
+        ) from e
+
+
+def _read_parquet(path: Path) -> pd.DataFrame:
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    if b"geo" in (pq.read_schema(path).metadata or {}):
+        import geopandas as gpd
+
+        return gpd.read_parquet(path)
+    return pd.read_parquet(path)
+
+
+def _write_parquet(df: pd.DataFrame, path: Path):
+    _require_pyarrow()
+    # A GeoDataFrame is written as GeoParquet
+    to_typed(df).to_parquet(path, index=False)
+
+
+def _read_sqlite(path: Path) -> pd.DataFrame:
+    from .sqlite_store import read_store
+
+    return read_store(path)
+
+
+def _write_sqlite(df: pd.DataFrame, path: Path):
+    from .sqlite_store import write_store
+
+    write_store(df, path)
+
+
+BACKENDS: dict[str, Backend] = {
+    ".csv": Backend(_read_csv, _write_csv, typed=False),
+    ".parquet": Backend(_read_parquet, _write_parquet, typed=True),
+    ".sqlite": Backend(_read_sqlite, _write_sqlite, typed=False),
+}
+
+
+def register_backend(suffix: str, backend: Backend):
+    BACKENDS[suffix] = backend
+
+
+def backend_for(path: Path) -> Backend:
+    try:
+        return BACKENDS[Path(path).suffix]
+    except KeyError:
+        raise ValueError(
+            f"No storage backend for {path}; known suffixes: {', '.join(BACKENDS)}"
+        ) from None
+
+
+# -----------------------------------------------------------------------------
+# API
+# -----------------------------------------------------------------------------
+
+
+def read_db(path: Path, typed: bool = False) -> pd.DataFrame:
+    """
+    Read a flood DB in any registered format; text columns by default,
+    timestamps / categoricals / point geometry with typed=True.
+    """
+    backend = backend_for(path)
+    df = migrate_geometry(backend.read(Path(path)))
+    if typed:
+        return df if backend.typed else to_typed(df)
+    return to_text(df) if backend.typed else df
+
+
+def write_db(df: pd.DataFrame, path: Path):
+    """
+    Write a flood DB (text or typed frame) atomically in the format
+    given by the path's suffix.
+    """
+    path = Path(path)
+    backend = backend_for(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.stem}.{os.getpid()}.tmp{path.suffix}")
+    backend.write(migrate_geometry(df), tmp_path)
+    os.replace(tmp_path, path)
+
+
+def convert_db(src: Path, dst: Path | None = None):
+    """
+    Rewrite a flood DB, e.g. CSV -> Parquet. Without dst it is rewritten
+    in place, migrating a legacy geometry column to lon/lat.
+    """
+    write_db(read_db(src, typed=True), src if dst is None else dst)
+
+
+if __name__ == "__main__":
+    import sys
+
+    convert_db(*(Path(arg) for arg in sys.argv[1:3]))
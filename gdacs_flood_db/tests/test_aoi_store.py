@@ -0,0 +1,98 @@
+import json
+
+from gdacs_flood_db.utils.aoi_store import AoiStore, iter_aois, migrate_json_dir
+
+
+def aoi(eventid, lon=10.0, lat=5.0):
+    polygon = [[lon, lat], [lon + 1, lat], [lon + 1, lat + 1], [lon, lat]]
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Polygon", "coordinates": [polygon]},
+                "properties": {"eventid": eventid},
+            }
+        ],
+    }
+
+
+def test_random_access_and_iteration(tmp_path):
+    with AoiStore.in_dir(tmp_path) as store:
+        for i in range(50):
+            store.put(f"FL-{i}", aoi(i, lon=i))
+        store.put("FL-3", aoi(3, lon=-3))  # re-downloaded AOI supersedes
+
+    with AoiStore.in_dir(tmp_path) as store:
+        assert len(store) == 50
+        assert store.get("FL-7") == aoi(7, lon=7)
+        assert store.get("FL-3") == aoi(3, lon=-3)
+        items = dict(store)
+        assert items["FL-3"] == aoi(3, lon=-3)
+        assert len(items) == 50
+
+        size = store.path.stat().st_size
+        store.compact()
+        assert store.path.stat().st_size < size
+        assert dict(store) == items
+
+    with AoiStore.in_dir(tmp_path) as store:
+        assert dict(store) == items
+
+
+def test_recovers_records_missing_from_index(tmp_path):
+    store = AoiStore.in_dir(tmp_path)
+    store.put("FL-1", aoi(1))
+    store.flush()
+    store.put("FL-2", aoi(2))
+    store._file.write(b"\x05\x00\xff\x00")  # partially written record
+    store._file.close()  # crash: index not rewritten
+
+    with AoiStore.in_dir(tmp_path) as store:
+        assert store.ids() == ["FL-1", "FL-2"]
+        assert store.get("FL-2") == aoi(2)
+        store.put("FL-3", aoi(3))
+        assert store.get("FL-3") == aoi(3)
+
+
+def test_compaction_crash_leaves_a_usable_store(tmp_path):
+    with AoiStore.in_dir(tmp_path) as store:
+        for i in range(10):
+            store.put(f"FL-{i}", aoi(i, lon=i))
+        store.flush()
+        old_index = store.index_path.read_bytes()
+        store.put("FL-0", aoi(0, lon=-1))
+        store.compact()
+
+    # Crash between the two renames: new pack, index of the old one
+    store.index_path.write_bytes(old_index)
+    with AoiStore.in_dir(tmp_path) as store:
+        assert len(store) == 10
+        assert store.get("FL-0") == aoi(0, lon=-1)
+        assert dict(store) == {f"FL-{i}": aoi(i, lon=-1 if i == 0 else i) for i in range(10)}
+
+
+def test_migrate_and_export(tmp_path):
+    aoi_dir = tmp_path / "aois"
+    aoi_dir.mkdir()
+    for i in range(3):
+        (aoi_dir / f"FL-{i}.json").write_text(json.dumps(aoi(i), indent=2))
+    (aoi_dir / "FL-9.json").write_text('{"type": "Feat')
+
+    with AoiStore.in_dir(aoi_dir) as store:
+        store.put("FL-5", aoi(5))
+        assert migrate_json_dir(aoi_dir, store) == 3
+        assert migrate_json_dir(aoi_dir, store, remove=True) == 0
+        assert sorted(store.ids()) == ["FL-0", "FL-1", "FL-2", "FL-5"]
+        # Packed files are gone, the unreadable one stays for inspection
+        assert [p.name for p in aoi_dir.glob("*.json")] == ["FL-9.json"]
+
+        n = store.export_geojson(tmp_path / "aois.geojson", ids=["FL-1", "FL-5"])
+
+    assert n == 2
+    with open(tmp_path / "aois.geojson", encoding="utf-8") as f:
+        exported = json.load(f)
+    assert {f["properties"]["GDACS_ID"] for f in exported["features"]} == {"FL-1", "FL-5"}
+
+    (aoi_dir / "FL-8.json").write_text(json.dumps(aoi(8)))
+    assert sorted(dict(iter_aois(aoi_dir))) == ["FL-0", "FL-1", "FL-2", "FL-5", "FL-8"]
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from gdacs_flood_db.utils.aoi_tiles import AoiTileIndex, build_aoi_tile_index
+
+
+def write_aoi(aoi_dir, gdacs_id, polygon):
+    data = {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": polygon[0]}},
+            {"type": "Feature", "geometry": {"type": "Polygon", "coordinates": [polygon]}},
+        ],
+    }
+    with open(aoi_dir / f"{gdacs_id}.json", "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def square(lon, lat, size):
+    return [[lon, lat], [lon + size, lat], [lon + size, lat + size], [lon, lat + size], [lon, lat]]
+
+
+def test_aoi_tile_index(tmp_path):
+    aoi_dir = tmp_path / "aois"
+    aoi_dir.mkdir()
+    write_aoi(aoi_dir, "FL-1", square(35.0, -19.0, 0.2))  # Malawi / Mozambique
+    write_aoi(aoi_dir, "FL-2", square(35.05, -18.95, 0.1))  # inside FL-1
+    write_aoi(aoi_dir, "FL-3", square(26.0, 41.0, 3.0))  # large, Greece / Turkey
+
+    index = build_aoi_tile_index(aoi_dir, tmp_path / "index")
+
+    tiles_1 = index.tiles_for_event("FL-1")
+    assert {tile[-2:] for tile, _ in tiles_1} == {"T3", "T6"}
+    # Overlap areas of one tiling add up to the AOI area (22.2 km x 21.0 km)
+    t3_area = sum(km2 for _, km2 in index.tiles_for_event("FL-1", "T3"))
+    assert t3_area == pytest.approx(22.2 * 21.0, rel=0.02)
+
+    # Nested AOIs share tiles, a 3 degree AOI spans several T3 tiles
+    tile, _ = index.tiles_for_event("FL-2", "T3")[0]
+    assert set(index.events_for_tile(tile)) >= {"FL-1", "FL-2"}
+    assert len(index.tiles_for_event("FL-3", "T3")) > 1
+    assert all(t.startswith("EU_") or t.startswith("AS_") for t, _ in index.tiles_for_event("FL-3"))
+
+    # Tile -> events lookups come from the saved inverted index alone
+    reloaded = AoiTileIndex.load(tmp_path / "index")
+    (tmp_path / "index" / "coverage.csv").rename(tmp_path / "coverage.csv")
+    assert set(reloaded.events_for_tile(tile)) >= {"FL-1", "FL-2"}
+    (tmp_path / "coverage.csv").rename(tmp_path / "index" / "coverage.csv")
+    assert reloaded.tiles_for_event("FL-3") == index.tiles_for_event("FL-3")
+    with open(tmp_path / "index" / "tile_index.json", encoding="utf-8") as f:
+        assert "FL-1" in json.load(f)[tiles_1[0][0]]
@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from gdacs_flood_db.cache import ResponseCache, window_ttl
+from gdacs_flood_db.fetch import configure_session, fetch_window
+
+ETAG = '"v1"'
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    hits = []
+
+    def do_GET(self):
+        self.hits.append(self.headers.get("If-None-Match"))
+
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = json.dumps({"features": [{"properties": {"eventid": 1}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    ETagHandler.hits = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ETagHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    monkeypatch.setattr(
+        "gdacs_flood_db.fetch.BASE_URL", f"http://127.0.0.1:{httpd.server_port}/SEARCH"
+    )
+    yield ETagHandler.hits
+    httpd.shutdown()
+
+
+def cached_session(cache):
+    return configure_session(requests.Session(), pool_size=1, cache=cache)
+
+
+def test_window_ttl_depends_on_window_age():
+    today = date(2026, 2, 10)
+    url = "https://www.gdacs.org/SEARCH?fromdate={}&todate={}"
+
+    assert window_ttl(url.format("2016-01-01", "2016-02-01"), today).days == 30
+    assert window_ttl(url.format("2025-12-01", "2026-01-01"), today).days == 1
+    assert window_ttl(url.format("2026-02-01", "2026-02-10"), today) == timedelta(hours=1)
+    assert window_ttl("https://www.gdacs.org/getgeometry?eventid=1", today).days == 1
+    assert window_ttl(url.format("2016-01-01", "01/02/2016"), today).days == 1
+
+
+def test_closed_window_is_served_from_cache(server, tmp_path):
+    cache = ResponseCache(tmp_path)
+    start, end = date(2016, 1, 1), date(2016, 2, 1)
+
+    with cached_session(cache) as session:
+        first = fetch_window(session, start, end)
+        second = fetch_window(session, start, end)
+
+    assert first == second == [{"properties": {"eventid": 1}}]
+    assert len(server) == 1
+
+
+def test_stale_entry_is_revalidated_with_etag(server, tmp_path):
+    cache = ResponseCache(tmp_path, ttl=lambda url: timedelta(0))
+    start, end = date(2016, 1, 1), date(2016, 2, 1)
+
+    with cached_session(cache) as session:
+        fetch_window(session, start, end)
+        events = fetch_window(session, start, end)
+
+    assert events == [{"properties": {"eventid": 1}}]
+    assert server == [None, ETAG]
+
+
+def test_lru_eviction_bounds_cache_size(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=2000)
+    body = os.urandom(600).hex()  # incompressible
+
+    cache.put("https://example.com/a", 200, {}, body)
+    time.sleep(0.01)
+    cache.put("https://example.com/b", 200, {}, body)
+    time.sleep(0.01)
+    cache.get("https://example.com/a")  # a is now more recent than b
+    time.sleep(0.01)
+    cache.put("https://example.com/c", 200, {}, body)
+
+    assert cache.get("https://example.com/a") is not None
+    assert cache.get("https://example.com/b") is None
+    assert cache.get("https://example.com/c") is not None
+    assert sum(p.stat().st_size for p in tmp_path.iterdir()) <= 2000
@@ -0,0 +1,68 @@
+import numpy as np
+
+from gdacs_flood_db.utils.country_resolver import fill_countries, resolve_countries
+from gdacs_flood_db.utils.download_db_utils import normalize_flood_events
+
+POINTS = {
+    "Lilongwe": (33.78, -13.96),
+    "La Paz": (-68.15, -16.5),
+    "Paris": (2.35, 48.85),  # ISO_A3 is -99 for France in Natural Earth
+    "off Lisbon": (-9.6, 38.7),  # outside the coarse 1:110m coastline
+    "mid-Atlantic": (-30.0, 0.0),
+    "no point": (np.nan, np.nan),
+}
+
+
+def test_resolve_countries():
+    lon, lat = zip(*POINTS.values())
+    resolved = resolve_countries(lon, lat)
+    assert resolved["iso3"].tolist() == ["MWI", "BOL", "FRA", "PRT", None, None]
+    assert resolved["country"][0] == "Malawi"
+    assert resolved["continent"][1] == "South America"
+
+    exact = resolve_countries(lon, lat, nearest_max_distance=None)
+    assert exact["iso3"].tolist() == ["MWI", "BOL", "FRA", None, None, None]
+
+
+def test_fill_countries():
+    lon, lat = zip(*[POINTS[p] for p in ("Lilongwe", "La Paz", "Paris", "mid-Atlantic", "Lilongwe")])
+    country = ["Malawi", None, "Ireland|France", "Atlantis", "Mozambique"]
+    iso3 = [None, None, None, None, "MOZ"]
+    candidates = [[], [], [], [], [("Mozambique", "MOZ"), ("Malawi", "MWI")]]
+
+    country, iso3 = fill_countries(country, iso3, lon, lat, candidates)
+    # GDACS names are kept unless missing or a list; unresolved rows untouched
+    assert country.tolist() == ["Malawi", "Bolivia", "France", "Atlantis", "Malawi"]
+    assert iso3.tolist() == ["MWI", "BOL", "FRA", None, "MWI"]
+
+
+def make_feature(eventid, lon, lat, affected):
+    return {
+        "properties": {
+            "eventtype": "FL",
+            "eventid": eventid,
+            "country": affected[0]["countryname"] if affected else "Bolivia",
+            "affectedcountries": affected,
+            "url": {},
+        },
+        "geometry": {"type": "Point", "coordinates": [lon, lat]},
+    }
+
+
+def test_normalization_fills_countries():
+    features = [
+        make_feature(1, *POINTS["La Paz"], []),
+        make_feature(
+            2,
+            *POINTS["Lilongwe"],
+            [
+                {"countryname": "Mozambique", "iso3": "MOZ"},
+                {"countryname": "Malawi", "iso3": "MWI"},
+            ],
+        ),
+    ]
+    rows = normalize_flood_events(features)
+    assert [(r["country"], r["iso3"]) for r in rows] == [("Bolivia", "BOL"), ("Malawi", "MWI")]
+
+    rows = normalize_flood_events(features, resolve_countries=False)
+    assert [(r["country"], r["iso3"]) for r in rows] == [("Bolivia", None), ("Mozambique", "MOZ")]
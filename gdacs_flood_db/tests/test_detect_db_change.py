@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from gdacs_flood_db.utils.detect_db_change import (
+    TRACKED_FIELDS,
+    detect_updated_events,
+    diff_events,
+)
+
+
+def reference_updated_events(df_new, df_old):
+    """The original per-ID, per-field loop, as reference."""
+    old = df_old.set_index("GDACS_ID")
+    new = df_new.set_index("GDACS_ID")
+    rows = []
+    for gdacs_id in new.index.intersection(old.index):
+        changes = {}
+        for field in TRACKED_FIELDS:
+            old_val = old.at[gdacs_id, field]
+            new_val = new.at[gdacs_id, field]
+            if pd.isna(old_val) and pd.isna(new_val):
+                continue
+            if old_val != new_val:
+                changes[field] = {"old": old_val, "new": new_val}
+        if changes:
+            row = new.loc[gdacs_id].copy()
+            row["changed_fields"] = list(changes)
+            row["change_details"] = changes
+            rows.append(row)
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).rename_axis("GDACS_ID").reset_index()
+
+
+def synthetic_db(n, rng):
+    dates = pd.date_range("2015-01-01", periods=n, freq="6h").strftime("%Y-%m-%d %H:%M:%S")
+    return pd.DataFrame(
+        {
+            "GDACS_ID": [f"FL-{i}" for i in range(n)],
+            "fromdate": dates,
+            "todate": dates,
+            "geometry_url": [
+                f"https://gdacs.org/geometry?eventid={i}&episodeid=1" for i in range(n)
+            ],
+            "alertlevel": rng.choice(["Green", "Orange", None], n),
+        }
+    )
+
+
+def test_matches_reference_loop():
+    rng = np.random.default_rng(0)
+    old = synthetic_db(500, rng)
+    new = old.copy()
+
+    new.loc[rng.choice(500, 40), "todate"] = "2026-01-01 00:00:00"
+    new.loc[rng.choice(500, 20), "geometry_url"] = "https://gdacs.org/geometry?episodeid=2"
+    new.loc[rng.choice(500, 10), "fromdate"] = np.nan
+    old.loc[rng.choice(500, 10), "todate"] = np.nan
+    both_na = rng.choice(500, 5)
+    old.loc[both_na, "geometry_url"] = np.nan
+    new.loc[both_na, "geometry_url"] = np.nan
+    new.loc[rng.choice(500, 30), "alertlevel"] = "Red"  # not tracked
+
+    new = pd.concat([new.iloc[50:], synthetic_db(520, rng).iloc[500:]])  # drop 50, add 20
+    new = new.sample(frac=1, random_state=1, ignore_index=True)
+
+    expected = reference_updated_events(new, old)
+    updated = detect_updated_events(new, old)
+    assert len(updated) > 0
+    pd.testing.assert_frame_equal(updated, expected, check_dtype=False)
+
+    diff = diff_events(new, old)
+    assert sorted(diff.added) == [f"FL-{i}" for i in range(500, 520)]
+    assert sorted(diff.removed) == sorted(old["GDACS_ID"].iloc[:50])
+
+
+def test_no_changes():
+    rng = np.random.default_rng(0)
+    db = synthetic_db(10, rng)
+    diff = diff_events(db.copy(), db)
+    assert diff.updated.empty
+    assert diff.added.empty and diff.removed.empty
@@ -0,0 +1,168 @@
+import json
+
+import pandas as pd
+import pytest
+
+from gdacs_flood_db.replay import FixtureArchive, StandInServer
+from gdacs_flood_db.utils import download_aois
+from gdacs_flood_db.utils.aoi_store import AoiStore
+from gdacs_flood_db.utils.detect_db_change import detect_updated_events
+
+N_EVENTS = 12
+
+
+def aoi_url(eventid: int, episodeid: int = 1) -> str:
+    return (
+        "https://www.gdacs.org/gdacsapi/api/polygons/getgeometry"
+        f"?eventtype=FL&eventid={eventid}&episodeid={episodeid}"
+    )
+
+
+def aoi_body(eventid: int, episodeid: int = 1) -> dict:
+    return {
+        "type": "FeatureCollection",
+        "features": [],
+        "eventid": eventid,
+        "episodeid": episodeid,
+    }
+
+
+@pytest.fixture
+def archive():
+    archive = FixtureArchive()
+    for i in range(N_EVENTS):
+        for episodeid in (1, 2):
+            archive.add(
+                aoi_url(i, episodeid),
+                200,
+                "application/json",
+                json.dumps(aoi_body(i, episodeid)),
+            )
+    return archive
+
+
+@pytest.fixture
+def events():
+    return pd.DataFrame(
+        {
+            "GDACS_ID": [f"FL-{i}" for i in range(N_EVENTS)],
+            "geometry_url": [aoi_url(i) for i in range(N_EVENTS)],
+        }
+    )
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(download_aois, "BACKOFF_BASE", 0.001)
+
+
+def run(server, events, aoi_dir, workers=4):
+    session = download_aois.make_session(
+        use_cache=False, transport=server.transport, workers=workers
+    )
+    return download_aois.download_all_aois(events, aoi_dir, session, workers)
+
+
+def test_concurrent_download_with_5xx_bursts(archive, events, tmp_path):
+    with StandInServer(archive, burst_every=3, burst_length=2) as server:
+        counts = run(server, events, tmp_path)
+
+    assert counts == {
+        "total": N_EVENTS,
+        "downloaded": N_EVENTS,
+        "refreshed": 0,
+        "skipped": 0,
+        "failed": 0,
+    }
+    with AoiStore.in_dir(tmp_path) as store:
+        assert len(store) == N_EVENTS
+        for i in range(N_EVENTS):
+            assert store.get(f"FL-{i}") == aoi_body(i)
+
+
+def test_resume_from_manifest(archive, events, tmp_path):
+    # An interrupted run: one event packed, one per-event file from the
+    # old downloader, one truncated file left behind by it, one failure
+    with AoiStore.in_dir(tmp_path) as store:
+        store.put("FL-0", aoi_body(0))
+    (tmp_path / "FL-1.json").write_text(json.dumps(aoi_body(1)))
+    (tmp_path / "FL-2.json").write_text('{"type": "Featu')
+    with open(tmp_path / download_aois.MANIFEST_NAME, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"GDACS_ID": "FL-0", "status": "ok"}) + "\n")
+        f.write(json.dumps({"GDACS_ID": "FL-3", "status": "failed"}) + "\n")
+
+    with StandInServer(archive) as server:
+        counts = run(server, events, tmp_path)
+
+    # FL-0 (packed) and FL-1 (valid legacy file, packed on start) are skipped
+    assert counts["skipped"] == 2
+    assert counts["downloaded"] == N_EVENTS - 2
+    assert server.requests == N_EVENTS - 2
+    with AoiStore.in_dir(tmp_path) as store:
+        assert store.get("FL-1") == aoi_body(1)
+        assert store.get("FL-2") == aoi_body(2)
+    # The packed legacy file is deleted; the truncated one is left alone
+    assert [p.name for p in tmp_path.glob("*.json")] == ["FL-2.json"]
+
+    manifest = download_aois.load_manifest(tmp_path / download_aois.MANIFEST_NAME)
+    assert all(manifest[f"FL-{i}"]["status"] == "ok" for i in range(N_EVENTS) if i != 1)
+
+    with StandInServer(archive) as server:
+        counts = run(server, events, tmp_path)
+    assert counts["skipped"] == N_EVENTS
+    assert server.requests == 0
+
+    download_aois.save_aoi("FL-99", aoi_body(99), tmp_path)
+    with AoiStore.in_dir(tmp_path) as store:
+        assert store.get("FL-99") == aoi_body(99)
+
+
+def test_failures_are_recorded(archive, events, tmp_path):
+    events.loc[0, "geometry_url"] = aoi_url(999)  # not in the archive: 404
+
+    with StandInServer(archive) as server:
+        counts = run(server, events, tmp_path)
+
+    assert counts["failed"] == 1
+    manifest = download_aois.load_manifest(tmp_path / download_aois.MANIFEST_NAME)
+    assert manifest["FL-0"]["status"] == "failed"
+    with AoiStore.in_dir(tmp_path) as store:
+        assert "FL-0" not in store
+
+
+def test_sync_refetches_changed_episodes_only(archive, events, tmp_path):
+    events["fromdate"] = "2024-01-01"
+    events["todate"] = "2024-01-05"
+    with StandInServer(archive) as server:
+        run(server, events, tmp_path)
+
+    updated = events.copy()
+    updated.loc[1, "geometry_url"] = aoi_url(1, episodeid=2)
+    updated.loc[2, "todate"] = "2024-01-09"  # no new polygon
+    new_events = pd.DataFrame({"GDACS_ID": ["FL-99"], "geometry_url": [aoi_url(0, 2)]})
+    changed = detect_updated_events(updated, events)
+    assert len(changed) == 2
+
+    with StandInServer(archive) as server:
+        session = download_aois.make_session(use_cache=False, transport=server.transport)
+        counts = download_aois.sync_changed_aois(changed, new_events, tmp_path, session)
+
+    assert server.requests == 2
+    assert counts["downloaded"] == 2
+    assert counts["refreshed"] == 1
+    with AoiStore.in_dir(tmp_path) as store:
+        assert store.get("FL-1") == aoi_body(1, 2)
+        assert store.versions("FL-1") == ["1"]
+        assert store.get("FL-1@1") == aoi_body(1, 1)
+        assert store.get("FL-99") == aoi_body(0, 2)
+        assert len(store) == N_EVENTS + 1
+
+    # Later full runs see the new episode as current
+    with StandInServer(archive) as server:
+        counts = run(server, updated, tmp_path)
+    assert server.requests == 0
+
+
+def test_download_aoi_needs_an_attempt():
+    with pytest.raises(ValueError):
+        download_aois.download_aoi("https://www.gdacs.org/getgeometry", retries=0)
@@ -0,0 +1,140 @@
+import ast
+from pathlib import Path
+
+import numpy as np
+import geopandas as gpd
+import pandas as pd
+import shapely
+from shapely.geometry import Point
+
+from gdacs_flood_db.utils import equi7_grid_code as equi7
+
+DB_PATH = Path(equi7.DATA_DIR) / "gdacs_flood_db.csv"
+
+
+def sjoin_code(lon, lat):
+    """The original per-point sjoin lookup, as reference."""
+    point_gdf = gpd.GeoDataFrame(geometry=[Point(lon, lat)], crs="EPSG:4326")
+    for continent in equi7.CONTINENTS:
+        grid_gdf = getattr(equi7, f"{continent}020M")
+        row = gpd.sjoin(point_gdf, grid_gdf, how="left", predicate="intersects").iloc[0]
+        if pd.notna(row["SHORTNAME"]):
+            return row["SHORTNAME"].split("_")[1] + "020M"
+    return None
+
+
+def db_points(n=200):
+    df = pd.read_csv(DB_PATH).sample(n, random_state=0)
+    return [tuple(ast.literal_eval(g)["coordinates"]) for g in df["geometry"]]
+
+
+def test_matches_sjoin_lookup():
+    for lon, lat in db_points():
+        assert equi7.get_equ7_code_lonlat(lon, lat) == sjoin_code(lon, lat)
+
+
+def test_border_points_are_deterministic():
+    index = equi7.get_tile_index()
+    # Corners of tiles are shared by up to four tiles and, on zone edges,
+    # by tiles of two continents
+    for tile in [0, len(equi7.AF020M), len(index.geometries) - 1]:
+        for lon, lat in list(index.geometries[tile].exterior.coords)[:3]:
+            assert equi7.get_equ7_code_lonlat(lon, lat) == sjoin_code(lon, lat)
+
+
+def test_points_outside_all_tiles():
+    assert equi7.get_equ7_code_lonlat(0.0, -85.0) is None  # Antarctica
+    assert equi7.get_equ7_code_lonlat(None, None) is None
+    assert equi7.get_equ7_code_lonlat(float("nan"), 10.0) is None
+
+
+def test_batch_assignment_matches_point_lookup():
+    df = pd.read_csv(DB_PATH).head(500)
+    expected = [
+        equi7.get_equ7_code_lonlat(*ast.literal_eval(g)["coordinates"])
+        for g in df["geometry"]
+    ]
+
+    codes = equi7.assign_equi7_codes_df(df, chunk_size=64)
+    assert codes.tolist() == expected
+    assert codes.tolist() == df["equi7_grid_code"].tolist()
+
+    codes = equi7.assign_equi7_codes([35.356, float("nan"), 0.0], [-18.795, 1.0, -85.0])
+    assert codes.tolist() == ["AF020M", None, None]
+
+
+def test_grid_cache_is_rebuilt_when_source_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(equi7, "EQUI7_CACHE_DIR", tmp_path)
+    equi7.load_grid_arrays.cache_clear()
+
+    geometries, tiles = equi7.load_grid_arrays("EU", "T3")
+    cache_file = tmp_path / "EQUI7_V14_EU_GEOG_TILE_T3.npz"
+    assert cache_file.exists()
+
+    equi7.load_grid_arrays.cache_clear()
+    cached_geometries, cached_tiles = equi7.load_grid_arrays("EU", "T3")
+    assert (cached_tiles == tiles).all()
+    assert all(a.equals_exact(b, 0) for a, b in zip(cached_geometries, geometries))
+
+    built = cache_file.stat().st_mtime_ns
+    monkeypatch.setattr(equi7, "source_fingerprint", lambda path: "changed")
+    equi7.load_grid_arrays.cache_clear()
+    equi7.load_grid_arrays("EU", "T3")
+    assert cache_file.stat().st_mtime_ns != built
+
+    equi7.load_grid_arrays.cache_clear()
+
+
+def test_lookup_raster_agrees_with_exact_geometry(tmp_path):
+    from gdacs_flood_db.utils.equi7_lookup_grid import assign_equi7_codes_raster
+
+    rng = np.random.default_rng(0)
+    lon = rng.uniform(-180, 180, 50_000)
+    lat = rng.uniform(-90, 90, 50_000)
+
+    # Tile corners lie exactly on borders
+    corners = shapely.get_coordinates(equi7.get_tile_index().geometries[::50])
+    lon = np.concatenate([lon, corners[:, 0], [np.nan]])
+    lat = np.concatenate([lat, corners[:, 1], [10.0]])
+
+    raster = assign_equi7_codes_raster(lon, lat, resolution=1.0, cache_dir=tmp_path)
+    exact = equi7.assign_equi7_codes(lon, lat)
+    assert raster.tolist() == exact.tolist()
+    assert (tmp_path / "equi7_lookup_1.npy").exists()
+
+
+def test_parent_tile_names():
+    assert equi7.parent_tile("E038N093T1", "T3") == "E036N093T3"
+    assert equi7.parent_tile("E038N093T1", "T6") == "E036N090T6"
+    assert equi7.parent_tile("E036N093T3", "T6") == "E036N090T6"
+
+
+def test_hierarchical_tiles_in_one_query():
+    from gdacs_flood_db.schema import flood_fields
+    from gdacs_flood_db.utils.download_db_utils import normalize_flood_events
+
+    df = pd.read_csv(DB_PATH).head(300)
+    tiles = equi7.assign_equi7_tiles_df(df)
+
+    # Same continent as the Equi7 code
+    assert equi7.equi7_codes_of(tiles["equi7_continent"]).tolist() == df["equi7_grid_code"].tolist()
+    assert tiles["equi7_t1"].notna().sum() > 250
+
+    # Every derived tile name is a tile of its layer containing the point
+    lon, lat = equi7.geometry_lonlat(df["geometry"])
+    for tiling in ("T6", "T3", "T1"):
+        layers = {c: dict(zip(*equi7.load_grid_arrays(c, tiling)[::-1])) for c in equi7.CONTINENTS}
+        for name, x, y in zip(tiles[f"equi7_{tiling.lower()}"], lon, lat):
+            if pd.isna(name):
+                continue
+            continent, tile = name.split("_")
+            assert shapely.intersects_xy(layers[continent][tile], x, y), (tiling, name)
+
+    feature = {
+        "properties": {"eventtype": "FL", "eventid": 1},
+        "geometry": {"type": "Point", "coordinates": [35.356, -18.795]},
+    }
+    row = normalize_flood_events([feature], equi7_tiles=True)[0]
+    assert list(row) == flood_fields(equi7_tiles=True)
+    assert row["equi7_continent"] == "AF"
+    assert row["equi7_t1"].startswith("AF_") and row["equi7_t1"].endswith("T1")
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from gdacs_flood_db.fingerprint import (
+    build_fingerprint_index,
+    diff_fingerprints,
+    fingerprint_path,
+    load_fingerprint_index,
+    row_fingerprints,
+    save_fingerprint_index,
+)
+from gdacs_flood_db.schema import FLOOD_FIELDS
+from gdacs_flood_db.utils.detect_db_change import diff_events
+
+
+def synthetic_db(n):
+    ids = np.arange(n)
+    db = pd.DataFrame({field: [f"{field}-{i}" for i in ids] for field in FLOOD_FIELDS})
+    db["GDACS_ID"] = [f"FL-{i}" for i in ids]
+    db["eventid"] = ids
+    db["alertscore"] = np.where(ids % 7 == 0, np.nan, 1.0)
+    db["fromdate"] = "2024-01-01 00:00:00"
+    return db
+
+
+def test_fingerprints_survive_csv_round_trip(tmp_path):
+    db = synthetic_db(50)
+    db_path = tmp_path / "latest_gdacs_flood_db.csv"
+    db.to_csv(db_path)  # with the unnamed index column, like the daily update
+
+    reread = pd.read_csv(db_path)
+    pd.testing.assert_series_equal(row_fingerprints(reread), row_fingerprints(db))
+
+    changed = db.copy()
+    changed.loc[3, "alertlevel"] = "Red"
+    assert (row_fingerprints(changed) != row_fingerprints(db)).sum() == 1
+
+    index = build_fingerprint_index(db)
+    save_fingerprint_index(index, fingerprint_path(db_path))
+    pd.testing.assert_frame_equal(load_fingerprint_index(fingerprint_path(db_path)), index)
+
+
+def test_null_in_one_row_keeps_other_fingerprints(tmp_path):
+    db = synthetic_db(3)
+    db["alertscore"] = [2, 1, 3]
+    db_path = tmp_path / "db.csv"
+    db.to_csv(db_path, index=False)
+    before = row_fingerprints(pd.read_csv(db_path))
+
+    db.loc[1, "alertscore"] = None  # the column reads back as float
+    db.to_csv(db_path, index=False)
+    after = row_fingerprints(pd.read_csv(db_path))
+
+    assert (before != after).tolist() == [False, True, False]
+
+
+def test_diff_matches_full_comparison():
+    old = synthetic_db(200)
+    index = build_fingerprint_index(old)
+
+    new = old.copy()
+    new.loc[[1, 5, 9], "todate"] = "2024-02-01 00:00:00"
+    new.loc[5, "geometry_url"] = "https://www.gdacs.org/geometry?episodeid=2"
+    new.loc[[7, 11], "alertlevel"] = "Orange"  # untracked field
+    new.loc[13, "fromdate"] = np.nan
+    new = pd.concat([new.drop(index=[2, 3]), synthetic_db(205).iloc[200:]])
+
+    diff = diff_fingerprints(new, index)
+    expected = diff_events(new, old)
+
+    assert list(diff.updated["GDACS_ID"]) == list(expected.updated["GDACS_ID"])
+    assert list(diff.updated["changed_fields"]) == list(expected.updated["changed_fields"])
+    assert diff.updated.loc[0, "change_details"]["todate"] == {
+        "old": "todate-1",
+        "new": "2024-02-01 00:00:00",
+    }
+    pd.testing.assert_frame_equal(
+        diff.updated[FLOOD_FIELDS].reset_index(drop=True),
+        new[new["GDACS_ID"].isin(expected.updated["GDACS_ID"])][FLOOD_FIELDS].reset_index(
+            drop=True
+        ),
+    )
+    assert list(diff.added) == list(expected.added)
+    assert list(diff.removed) == list(expected.removed)
+    # Untracked changes are not "updated" but still need rewriting
+    assert sorted(diff.changed) == sorted(expected.changed) == ["FL-1", "FL-11", "FL-13", "FL-5", "FL-7", "FL-9"]
+
+    assert diff_fingerprints(old, index).updated.empty
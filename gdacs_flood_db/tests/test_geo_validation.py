@@ -0,0 +1,204 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gdacs_flood_db.storage import read_db, write_db
+from gdacs_flood_db.utils.geo_validation import (
+    RULES,
+    mask_reasons,
+    register_rule,
+    validate_db,
+    validate_frame,
+    validate_row,
+)
+
+URL = "https://www.gdacs.org/gdacsapi/api/polygons/getgeometry?eventtype=FL&eventid=4219&episodeid=4"
+DATES = [
+    "2015-01-01T00:00:00",
+    "2015-1-5T0:00:00",  # strptime accepts unpadded fields
+    "2015-02-30T00:00:00",
+    "2015-01-01",
+    "2015-01-01T00:00:00Z",
+    "",
+    None,
+]
+URLS = [
+    URL,
+    URL.replace("https", "HTTP"),
+    "https://www.gdacs.org/getgeometry?episodeid=4&eventid=4219&eventtype=FL",
+    URL.replace("gdacs.org", "example.org"),
+    URL.replace("getgeometry", "getgeometry2"),
+    URL.replace("eventtype=FL", "eventtype=TC"),
+    URL.replace("eventtype=FL", "eventtype=FLX"),
+    URL.replace("eventid=4219", "eventid="),
+    URL.replace("&episodeid=4", ""),
+    URL.split("?")[0],
+    "ftp://www.gdacs.org/getgeometry?eventtype=FL&eventid=1&episodeid=1",
+    URL.replace("eventtype=FL", "eventtype=TC&eventtype=FL"),  # first value counts
+    URL.replace("eventtype=FL", "eventtype=F%4C"),
+    "",
+    None,
+]
+
+
+def events(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "GDACS_ID": [f"FL-{i}" for i in range(n)],
+            "equi7_grid_code": rng.choice(np.array(["AF020M", ""], dtype=object), n, p=[0.9, 0.1]),
+            "country": "Testland",
+            "fromdate": rng.choice(np.array(DATES, dtype=object), n),
+            "todate": rng.choice(np.array(DATES, dtype=object), n),
+            "geometry_url": rng.choice(np.array(URLS, dtype=object), n),
+            "alertlevel": "Green",
+        }
+    )
+
+
+def test_matches_row_validation():
+    df = events()
+    expected = df.apply(validate_row, axis=1).tolist()
+    mask = validate_frame(df)
+    assert mask.dtype == np.uint8
+    assert mask_reasons(mask) == expected
+
+
+def test_missing_grid_code_needs_review():
+    df = events(4)
+    df["equi7_grid_code"] = [None, "", np.nan, "EU020M"]
+    assert (validate_frame(df) & 1).tolist() == [1, 1, 1, 0]
+    assert mask_reasons(validate_frame(df)) == df.apply(validate_row, axis=1).tolist()
+
+
+def test_register_rule():
+    try:
+        bit = register_rule("negative_eventid", lambda df: (df["eventid"] < 0).to_numpy())
+        df = events(3)
+        df["eventid"] = [1, -1, 2]
+        assert (validate_frame(df) >> bit & 1).tolist() == [0, 1, 0]
+        with pytest.raises(ValueError):
+            register_rule("negative_eventid", lambda df: df["eventid"].isna().to_numpy())
+    finally:
+        RULES[:] = [rule for rule in RULES if rule.rule_id != "negative_eventid"]
+
+
+def test_review_outputs(tmp_path):
+    db_path = tmp_path / "db.csv"
+    write_db(events(), db_path)  # empty codes read back as NaN
+
+    review_df = validate_db(db_path, logging.getLogger(__name__))
+
+    expected = read_db(db_path)
+    expected["validation_errors"] = expected.apply(validate_row, axis=1)
+    expected = expected[expected["validation_errors"].str.len() > 0]
+    pd.testing.assert_frame_equal(review_df, expected)
+    saved = pd.read_csv(tmp_path / "db_needs_review.csv")
+    assert saved["validation_errors"].tolist() == [str(v) for v in expected["validation_errors"]]
+    assert (tmp_path / "db_review_work.csv").exists()
+
+
+def test_cached_validation_checks_changed_rows_only(tmp_path, monkeypatch):
+    from gdacs_flood_db.utils import geo_validation
+
+    validated = []
+
+    def counting(df, rules=RULES):
+        validated.append(len(df))
+        return validate_frame(df, rules)
+
+    monkeypatch.setattr(geo_validation, "validate_frame", counting)
+    log = logging.getLogger(__name__)
+    db_path = tmp_path / "db.csv"
+    df = events()
+    df["equi7_grid_code"] = "AF020M"
+    write_db(df, db_path)
+
+    first = validate_db(db_path, log)
+    assert validate_db(db_path, log).equals(first)
+    assert validated == [300]
+
+    df.loc[0, "geometry_url"] = None
+    df.loc[1, "geometry_url"] = URL
+    df.loc[1, "fromdate"] = df.loc[1, "todate"] = DATES[0]
+    df = pd.concat([df, events(301).iloc[300:]], ignore_index=True)
+    write_db(df, db_path)
+
+    review_df = validate_db(db_path, log)
+    assert validated == [300, 3]
+    pd.testing.assert_frame_equal(review_df, validate_db(db_path, log, cache=False))
+    assert "FL-0" in set(review_df["GDACS_ID"]) and "FL-1" not in set(review_df["GDACS_ID"])
+
+    # A new rule set revalidates everything
+    try:
+        register_rule("negative_eventid", lambda df: np.zeros(len(df), dtype=bool))
+        validate_db(db_path, log)
+        assert validated[-1] == 301
+    finally:
+        RULES[:] = [rule for rule in RULES if rule.rule_id != "negative_eventid"]
+
+
+def test_cache_keeps_high_mask_bits(tmp_path):
+    from gdacs_flood_db.utils.geo_validation import Rule, validate_cached
+
+    df = events(3)
+    fingerprints = np.array(["a", "b", "c"])
+    never = Rule("never", lambda df: np.zeros(len(df), dtype=bool))
+    last = Rule("last", lambda df: (df["GDACS_ID"] == "FL-0").to_numpy())
+    rules = [never._replace(rule_id=f"never-{i}") for i in range(63)] + [last]
+    cache_path = tmp_path / "db.validation.npz"
+
+    first = validate_cached(df, fingerprints, cache_path, rules)
+    second = validate_cached(df, fingerprints, cache_path, rules[:63] + [never])
+    assert first.tolist() == second.tolist() == [1 << 63, 0, 0]
+
+
+def test_validate_db_reuses_callers_frame_and_index(tmp_path, monkeypatch):
+    from gdacs_flood_db.fingerprint import build_fingerprint_index
+    from gdacs_flood_db.schema import FLOOD_FIELDS
+    from gdacs_flood_db.utils import geo_validation
+
+    log = logging.getLogger(__name__)
+    db_path = tmp_path / "db.csv"
+    df = events().reindex(columns=FLOOD_FIELDS)
+    df["equi7_grid_code"] = "AF020M"
+    write_db(df, db_path)
+    expected = validate_db(db_path, log, cache=False)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the DB is not re-read or re-hashed")
+
+    monkeypatch.setattr(geo_validation, "read_db", fail)
+    monkeypatch.setattr(geo_validation, "row_fingerprints", fail)
+    df = read_db(db_path)
+    review_df = validate_db(db_path, log, fingerprints=build_fingerprint_index(df), df=df)
+    pd.testing.assert_frame_equal(review_df, expected)
+
+
+def test_fingerprints_from_index(tmp_path, monkeypatch):
+    from gdacs_flood_db.fingerprint import build_fingerprint_index, fingerprint_path, save_fingerprint_index
+    from gdacs_flood_db.schema import flood_fields
+    from gdacs_flood_db.utils import geo_validation
+
+    db_path = tmp_path / "db.csv"
+    # A DB with the Equi7 tile columns, which the index does not hash
+    df = events(10).reindex(columns=flood_fields(equi7_tiles=True))
+    df["equi7_t6"] = "AF_E036N090T6"
+    write_db(df, db_path)
+    index = build_fingerprint_index(df.iloc[:8])
+    save_fingerprint_index(index, fingerprint_path(db_path))
+
+    hashed = []
+    row_fingerprints = geo_validation.row_fingerprints
+
+    def counting(df, fields):
+        hashed.append(len(df))
+        return row_fingerprints(df, fields)
+
+    monkeypatch.setattr(geo_validation, "row_fingerprints", counting)
+    fingerprints = geo_validation.db_fingerprints(read_db(db_path), db_path)
+    assert hashed == [2]
+    # Indexed and hashed rows get the same key
+    assert fingerprints.tolist() == build_fingerprint_index(df)["fingerprint"].tolist()
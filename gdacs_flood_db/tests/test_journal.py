@@ -0,0 +1,102 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gdacs_flood_db.fingerprint import build_fingerprint_index, diff_fingerprints
+from gdacs_flood_db.journal import ChangeJournal
+from gdacs_flood_db.schema import FLOOD_FIELDS
+from gdacs_flood_db.utils.detect_db_change import diff_events
+
+
+def synthetic_db(n):
+    ids = np.arange(n)
+    db = pd.DataFrame({field: [f"{field}-{i}" for i in ids] for field in FLOOD_FIELDS})
+    db["GDACS_ID"] = [f"FL-{i}" for i in ids]
+    db["eventid"] = ids
+    db["alertscore"] = np.where(ids % 3 == 0, np.nan, 2.0)
+    return db
+
+
+def db_versions():
+    day1 = synthetic_db(20)
+
+    day2 = pd.concat([day1, synthetic_db(23).iloc[20:]], ignore_index=True)
+    day2.loc[4, "todate"] = "2024-03-01"
+    day2.loc[4, "alertlevel"] = "Red"
+
+    day3 = day2.drop(index=[7]).reset_index(drop=True)
+    day3.loc[day3["GDACS_ID"] == "FL-4", "geometry_url"] = "episode-2"
+    day3.loc[day3["GDACS_ID"] == "FL-21", "todate"] = np.nan
+    return day1, day2, day3
+
+
+def test_reconstruct_and_history(tmp_path):
+    day1, day2, day3 = db_versions()
+    dates = [date(2026, 2, 1), date(2026, 2, 2), date(2026, 2, 3)]
+
+    journal = ChangeJournal(tmp_path / "journal")
+    journal.write_snapshot(day1, dates[0])
+    journal.record(dates[1], diff_events(day2, day1), day2)
+    # Later runs diff against the fingerprint index, like the daily update
+    journal.record(dates[2], diff_fingerprints(day3, build_fingerprint_index(day2)), day3)
+
+    for as_of, expected in zip(dates, [day1, day2, day3]):
+        pd.testing.assert_frame_equal(journal.reconstruct(as_of), expected, check_dtype=False)
+
+    history = journal.history("FL-4")
+    assert [entry["op"] for entry in history] == ["update", "update"]
+    assert history[0]["changes"] == {"todate": {"old": "todate-4", "new": "2024-03-01"}}
+    assert history[1]["changes"]["geometry_url"]["new"] == "episode-2"
+    assert [entry["op"] for entry in journal.history("FL-7")] == ["remove"]
+    assert [entry["op"] for entry in journal.history("FL-21")] == ["insert", "update"]
+
+    with pytest.raises(ValueError):
+        journal.reconstruct(date(2026, 1, 31))
+
+
+def test_periodic_snapshots(tmp_path):
+    day1, day2, day3 = db_versions()
+    journal = ChangeJournal(tmp_path / "journal")
+
+    assert journal.maybe_snapshot(day1, date(2026, 1, 1), every_days=30) is not None
+    journal.record(date(2026, 1, 10), diff_events(day2, day1), day2)
+    assert journal.maybe_snapshot(day2, date(2026, 1, 10), every_days=30) is None
+    journal.record(date(2026, 2, 5), diff_events(day3, day2), day3)
+    assert journal.maybe_snapshot(day3, date(2026, 2, 5), every_days=30) is not None
+
+    # Replay starts from the nearest snapshot; journal entries before it
+    # are not needed
+    journal.path.write_text("")
+    pd.testing.assert_frame_equal(
+        journal.reconstruct(date(2026, 3, 1)), day3, check_dtype=False
+    )
+
+
+def test_same_day_runs_and_snapshots(tmp_path):
+    day1, day2, day3 = db_versions()
+    day = date(2026, 2, 1)
+    journal = ChangeJournal(tmp_path / "journal")
+
+    # A snapshot, then two more runs on the same day
+    journal.write_snapshot(day1, day)
+    journal.record(day, diff_events(day2, day1), day2)
+    pd.testing.assert_frame_equal(journal.reconstruct(day), day2, check_dtype=False)
+
+    # A snapshot written before the day's last run is replayed over
+    journal.write_snapshot(day2, day)
+    journal.record(day, diff_events(day3, day2), day3)
+    pd.testing.assert_frame_equal(journal.reconstruct(day), day3, check_dtype=False)
+
+
+def test_untracked_changes_are_journaled(tmp_path):
+    day1 = synthetic_db(5)
+    day2 = day1.copy()
+    day2.loc[2, "alertlevel"] = "Red"  # no tracked field changes
+    journal = ChangeJournal(tmp_path / "journal")
+    journal.write_snapshot(day1, date(2026, 2, 1))
+    journal.record(date(2026, 2, 2), diff_fingerprints(day2, build_fingerprint_index(day1)), day2)
+
+    assert journal.history("FL-2")[0]["changes"] == {}
+    pd.testing.assert_frame_equal(journal.reconstruct(date(2026, 2, 2)), day2, check_dtype=False)
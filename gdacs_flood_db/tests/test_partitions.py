@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from gdacs_flood_db.partitions import (
+    list_partitions,
+    read_partitioned,
+    update_partitions,
+    write_partitioned,
+)
+from gdacs_flood_db.schema import FLOOD_FIELDS
+
+
+def synthetic_db(n):
+    ids = np.arange(n)
+    db = pd.DataFrame({field: [f"{field}-{i}" for i in ids] for field in FLOOD_FIELDS})
+    db["GDACS_ID"] = [f"FL-{i}" for i in ids]
+    db["eventid"] = ids
+    db["equi7_grid_code"] = np.array(["AF020M", "AS020M", "EU020M", None], dtype=object)[ids % 4]
+    db["fromdate"] = [f"{2015 + i % 5}-03-01T00:00:00" for i in ids]
+    db["lon"] = ids * 1.5
+    db["lat"] = -ids * 0.5
+    return db
+
+
+def by_id(df):
+    return df.sort_values("GDACS_ID", ignore_index=True)
+
+
+def test_write_and_prune(tmp_path):
+    db = synthetic_db(100)
+    assert write_partitioned(db, tmp_path) == 20
+
+    pd.testing.assert_frame_equal(by_id(read_partitioned(tmp_path)), by_id(db), check_dtype=False)
+
+    selected = read_partitioned(tmp_path, continents="AF", years=range(2016, 2018))
+    expected = db[(db["equi7_grid_code"] == "AF020M") & db["fromdate"].str[:4].isin(["2016", "2017"])]
+    pd.testing.assert_frame_equal(by_id(selected), by_id(expected), check_dtype=False)
+
+    assert len(read_partitioned(tmp_path, continents="none", years=2015)) == 5
+    assert read_partitioned(tmp_path, continents="OC").empty
+
+
+def test_update_rewrites_touched_partitions_only(tmp_path):
+    old = synthetic_db(100)
+    write_partitioned(old, tmp_path)
+    mtimes = {path: path.stat().st_mtime_ns for *_, path in list_partitions(tmp_path)}
+
+    new = pd.concat([old, synthetic_db(101).iloc[100:]], ignore_index=True)  # AF 2015
+    new.loc[new["GDACS_ID"] == "FL-1", "fromdate"] = "2019-01-01T00:00:00"  # AS 2016 -> 2019
+    new = new[new["GDACS_ID"] != "FL-2"]  # EU 2017
+
+    # Only events of EU 2017 are removed, so its partition disappears
+    new = new[~((new["equi7_grid_code"] == "EU020M") & new["fromdate"].str.startswith("2017"))]
+    gone = set(old["GDACS_ID"]) - set(new["GDACS_ID"])
+
+    rewritten = update_partitions(new, ["FL-100", "FL-1", *gone], tmp_path)
+    assert rewritten == 4
+
+    pd.testing.assert_frame_equal(by_id(read_partitioned(tmp_path)), by_id(new), check_dtype=False)
+    partitions = {(year, continent) for year, continent, _ in list_partitions(tmp_path)}
+    assert ("2017", "EU") not in partitions
+    assert not (tmp_path / "year=2017" / "continent=EU").exists()
+
+    untouched = [
+        path
+        for year, continent, path in list_partitions(tmp_path)
+        if (year, continent) not in {("2015", "AF"), ("2016", "AS"), ("2019", "AS")}
+    ]
+    assert all(path.stat().st_mtime_ns == mtimes[path] for path in untouched)
+
+
+def test_malformed_dates_go_to_no_key(tmp_path):
+    db = synthetic_db(8)
+    db.loc[1, "fromdate"] = "15/01/2020"
+    db.loc[2, "fromdate"] = None
+    db.loc[3, "equi7_grid_code"] = "-"
+    write_partitioned(db, tmp_path)
+
+    pd.testing.assert_frame_equal(by_id(read_partitioned(tmp_path)), by_id(db), check_dtype=False)
+    assert sorted(read_partitioned(tmp_path, years="none")["GDACS_ID"]) == ["FL-1", "FL-2"]
+    assert sorted(read_partitioned(tmp_path, continents="none")["GDACS_ID"]) == ["FL-3", "FL-7"]
@@ -2,9 +2,11 @@ import csv
 from datetime import date
 from unittest.mock import patch, MagicMock
 
+import pandas as pd
 import pytest
 
-from gdacs_flood_db.pipeline import download_all_floods
+from gdacs_flood_db.incremental import db_watermark, incremental_start
+from gdacs_flood_db.pipeline import download_all_floods, download_new_floods
 from gdacs_flood_db.utils.download_db_utils import normalize_flood_event
 from gdacs_flood_db.schema import FLOOD_FIELDS
 
@@ -79,5 +81,84 @@ def test_download_all_floods(mock_month_windows, mock_session_class, mock_fetch_
     mock_fetch_window.assert_called_once_with(mock_session, start, end)
 
 
+
+def make_event(eventid, fromdate, todate, episode=1):
+    props = dict(TEST_EVENT["properties"], eventid=eventid, fromdate=fromdate, todate=todate)
+    props["url"] = {"geometry": f"https://example.com/geometry?episodeid={episode}"}
+    return {"properties": props}
+
+
+@patch("gdacs_flood_db.pipeline.fetch_window")
+@patch("gdacs_flood_db.pipeline.requests.Session")
+def test_download_new_floods(mock_session_class, mock_fetch_window, tmp_path):
+    db_path = tmp_path / "latest_gdacs_flood_db.csv"
+    state_path = tmp_path / "download_state.json"
+    output = tmp_path / "merged.csv"
+
+    old = [
+        normalize_flood_event(make_event(1, "2015-03-01T00:00:00", "2015-03-10T00:00:00")),
+        normalize_flood_event(make_event(2, "2026-01-20T00:00:00", "2026-01-25T00:00:00")),
+    ]
+    with open(db_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FLOOD_FIELDS)
+        writer.writeheader()
+        writer.writerows(old)
+
+    mock_fetch_window.return_value = [
+        make_event(2, "2026-01-20T00:00:00", "2026-02-03T00:00:00", episode=2),
+        make_event(3, "2026-02-01T00:00:00", "2026-02-02T00:00:00"),
+    ]
+
+    with patch("gdacs_flood_db.pipeline.OUTPUT_CSV", output):
+        download_new_floods(
+            db_path,
+            lookback_days=10,
+            state_path=state_path,
+            end_date=date(2026, 2, 5),
+            window_profile=None,
+        )
+
+    # Only the windows after the watermark minus the look-back are fetched
+    windows = [c.args[1:] for c in mock_fetch_window.call_args_list]
+    assert windows == [
+        (date(2026, 1, 10), date(2026, 2, 1)),
+        (date(2026, 2, 1), date(2026, 2, 5)),
+    ]
+
+    with open(output, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+
+    assert [r["GDACS_ID"] for r in rows] == ["Flood-1", "Flood-2", "Flood-3"]
+    assert rows[1]["todate"] == "2026-02-03T00:00:00"
+    assert rows[1]["geometry_url"].endswith("episodeid=2")
+    assert state_path.exists()
+
+
+def test_watermark_without_dates():
+    empty = pd.DataFrame(columns=FLOOD_FIELDS)
+    unparseable = pd.DataFrame({"fromdate": ["unknown", None], "todate": ["unknown", "2030-01-01"]})
+    for df in (empty, unparseable):
+        watermark = db_watermark(df, today=date(2026, 1, 1))
+        assert watermark == {"max_fromdate": None, "open_fromdate": None}
+        assert incremental_start(watermark, lookback_days=30) is None
+
+
+@patch("gdacs_flood_db.pipeline.fetch_window")
+@patch("gdacs_flood_db.pipeline.requests.Session")
+def test_download_new_floods_from_empty_db(mock_session_class, mock_fetch_window, tmp_path):
+    db_path = tmp_path / "latest_gdacs_flood_db.csv"
+    pd.DataFrame(columns=FLOOD_FIELDS).to_csv(db_path, index=False)
+    mock_fetch_window.return_value = [make_event(3, "2015-01-10T00:00:00", "2015-01-12T00:00:00")]
+
+    with patch("gdacs_flood_db.pipeline.OUTPUT_CSV", tmp_path / "merged.csv"):
+        download_new_floods(
+            db_path, state_path=None, end_date=date(2015, 1, 20), window_profile=None
+        )
+
+    # Falls back to a full download
+    assert mock_fetch_window.call_args_list[0].args[1] == date(2015, 1, 1)
+    assert pd.read_csv(tmp_path / "merged.csv")["GDACS_ID"].tolist() == ["Flood-3"]
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
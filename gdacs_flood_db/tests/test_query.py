@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from gdacs_flood_db.query import FloodIndex
+
+
+def synthetic_db(n, seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2015-01-01") + pd.to_timedelta(rng.integers(0, 3650, n), unit="D")
+    # Mostly short floods, a few lasting months
+    days = np.where(rng.random(n) < 0.05, rng.integers(60, 400, n), rng.integers(0, 20, n))
+    end = start + pd.to_timedelta(days, unit="D") + pd.Timedelta(hours=23, minutes=59, seconds=59)
+    db = pd.DataFrame(
+        {
+            "GDACS_ID": [f"FL-{i}" for i in range(n)],
+            "equi7_grid_code": rng.choice(["AF020M", "AS020M", "EU020M", None], n),
+            "country": rng.choice(["Malawi", "Bolivia", "India"], n),
+            "iso3": rng.choice(["MWI", "BOL", "IND", None], n),
+            "fromdate": start.strftime("%Y-%m-%dT%H:%M:%S"),
+            "todate": end.strftime("%Y-%m-%dT%H:%M:%S"),
+            "lon": rng.uniform(-180, 180, n),
+            "lat": rng.uniform(-60, 70, n),
+        }
+    )
+    db.loc[rng.random(n) < 0.03, "todate"] = None  # ongoing
+    db.loc[rng.random(n) < 0.01, "fromdate"] = None
+    db.loc[rng.random(n) < 0.02, ["lon", "lat"]] = np.nan
+    return db
+
+
+def scan(db, country=None, iso3=None, since=None, until=None, bbox=None, tile=None):
+    """
+    The same query as a full scan of the text columns.
+    """
+    mask = pd.Series(True, index=db.index)
+    if country is not None:
+        mask &= db["country"].isin([country] if isinstance(country, str) else country)
+    if iso3 is not None:
+        mask &= db["iso3"].isin([iso3] if isinstance(iso3, str) else iso3)
+    if tile is not None:
+        mask &= db["equi7_grid_code"].isin([tile] if isinstance(tile, str) else tile)
+    if since is not None:
+        mask &= db["fromdate"].notna() & (db["todate"].isna() | (db["todate"] >= f"{since}T00:00:00"))
+    if until is not None:
+        mask &= db["fromdate"] <= f"{until}T23:59:59"
+    if bbox is not None:
+        mask &= db["lon"].between(bbox[0], bbox[2]) & db["lat"].between(bbox[1], bbox[3])
+    return np.flatnonzero(mask.to_numpy())
+
+
+QUERIES = [
+    {"since": "2018-06-01", "until": "2018-06-01"},
+    {"since": "2016-01-01", "until": "2016-03-31"},
+    {"since": "2024-12-01"},
+    {"until": "2015-01-10"},
+    {"bbox": (-20.0, -30.0, 40.0, 10.0)},
+    {"iso3": "MWI"},
+    {"iso3": ["MWI", "BOL"], "tile": "AF020M"},
+    {"country": "India", "since": "2020-01-01", "until": "2020-12-31", "bbox": (0, 0, 180, 70)},
+    {"tile": ["AS020M", "EU020M"], "since": "2019-05-05", "until": "2019-05-05"},
+    {"iso3": "XXX"},
+    {},
+]
+
+
+@pytest.mark.parametrize("filters", QUERIES)
+def test_matches_scan(filters):
+    db = synthetic_db(5000)
+    index = FloodIndex(db)
+    np.testing.assert_array_equal(index.select(**filters), scan(db, **filters))
+
+
+def test_active_on_and_query():
+    db = synthetic_db(2000, seed=1)
+    index = FloodIndex(db)
+    np.testing.assert_array_equal(
+        index.active_on("2017-02-03"), scan(db, since="2017-02-03", until="2017-02-03")
+    )
+    rows = index.query(iso3="BOL", since="2017-01-01", until="2017-12-31")
+    assert (rows["iso3"] == "BOL").all()
+    assert rows.index.tolist() == scan(db, iso3="BOL", since="2017-01-01", until="2017-12-31").tolist()
+
+    with pytest.raises(ValueError):
+        index.select(tile="AF_E036N090T6")
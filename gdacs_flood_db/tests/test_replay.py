@@ -0,0 +1,98 @@
+import csv
+import json
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from gdacs_flood_db.pipeline import download_all_floods
+from gdacs_flood_db.replay import (
+    EVENT_LIST_PATH,
+    FixtureArchive,
+    RecordingAdapter,
+    StandInServer,
+)
+
+
+def make_feature(eventid: int) -> dict:
+    when = (datetime(2024, 3, 1) + timedelta(hours=6 * eventid)).isoformat()
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [26.597, 41.457]},
+        "properties": {
+            "eventtype": "FL",
+            "eventid": eventid,
+            "alertlevel": "Green",
+            "alertscore": 1,
+            "fromdate": when,
+            "todate": when,
+            "affectedcountries": [{"iso3": "GRC", "countryname": "Greece"}],
+            "url": {
+                "geometry": (
+                    "https://www.gdacs.org/gdacsapi/api/polygons/getgeometry"
+                    f"?eventtype=FL&eventid={eventid}&episodeid=1"
+                ),
+            },
+        },
+    }
+
+
+def source_archive(n_events: int = 5) -> FixtureArchive:
+    archive = FixtureArchive()
+    features = [make_feature(i) for i in range(n_events)]
+    archive.add(
+        f"https://www.gdacs.org{EVENT_LIST_PATH}?eventlist=FL",
+        200,
+        "application/json",
+        json.dumps({"features": features}),
+    )
+    return archive
+
+
+def download(tmp_path, name, end_date=date(2024, 4, 1), **kwargs) -> list[dict]:
+    output = tmp_path / f"{name}.csv"
+    with patch("gdacs_flood_db.pipeline.OUTPUT_CSV", output):
+        download_all_floods(
+            start_date=date(2024, 3, 1),
+            end_date=end_date,
+            window_profile=None,
+            **kwargs,
+        )
+    with open(output, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_record_then_replay_offline(tmp_path):
+    recorded = FixtureArchive()
+
+    with StandInServer(source_archive()) as live:
+        transport = lambda inner: RecordingAdapter(recorded, live.transport(inner))
+        live_rows = download(tmp_path, "live", transport=transport)
+
+    recorded.save(tmp_path / "fixtures.jsonl.gz")
+    archive = FixtureArchive.load(tmp_path / "fixtures.jsonl.gz")
+    assert len(archive.events()) == 5
+
+    with StandInServer(archive) as replay:
+        replay_rows = download(tmp_path, "replay", transport=replay.transport)
+
+    assert replay.requests == 1
+    assert replay_rows == live_rows
+    assert [r["GDACS_ID"] for r in replay_rows] == [f"FL-{i}" for i in range(5)]
+
+
+def test_event_cap_forces_window_split(tmp_path):
+    with StandInServer(source_archive(120)) as server:
+        rows = download(tmp_path, "capped", transport=server.transport)
+
+    assert len(rows) == 120
+    assert server.requests == 3
+
+
+def test_5xx_bursts_are_retried(tmp_path):
+    # Requests 2 and 3 fail: the April window succeeds on its third attempt
+    with StandInServer(source_archive(), burst_every=1, burst_length=2) as server:
+        rows = download(
+            tmp_path, "bursty", end_date=date(2024, 5, 1), transport=server.transport
+        )
+
+    assert len(rows) == 5
+    assert server.requests == 4
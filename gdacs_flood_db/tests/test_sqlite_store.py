@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from gdacs_flood_db.schema import FLOOD_FIELDS
+from gdacs_flood_db.sqlite_store import FloodStore, bulk_load_csv
+from gdacs_flood_db.storage import read_db, write_db
+from gdacs_flood_db.fingerprint import build_fingerprint_index, diff_fingerprints
+from gdacs_flood_db.utils.detect_db_change import diff_events
+from gdacs_flood_db.utils.update_db import apply_overrides_to_store
+
+
+def synthetic_db(n):
+    ids = np.arange(n)
+    db = pd.DataFrame({field: [f"{field}-{i}" for i in ids] for field in FLOOD_FIELDS})
+    db["GDACS_ID"] = [f"FL-{i}" for i in ids]
+    db["eventid"] = ids
+    db["country"] = np.where(ids % 2, "Malawi", "Bolivia")
+    db["iso3"] = np.where(ids % 2, "MWI", "BOL")
+    db["equi7_grid_code"] = np.where(ids % 2, "AF020M", "SA020M")
+    db["alertscore"] = np.where(ids % 3 == 0, np.nan, 2.0)
+    db["fromdate"] = [f"{2015 + i % 10}-03-01T00:00:00" for i in ids]
+    db["todate"] = [f"{2015 + i % 10}-04-15T23:59:59" for i in ids]
+    db["lon"] = np.where(ids == 5, np.nan, ids % 36 * 10.0 - 175)
+    db["lat"] = np.where(ids == 5, np.nan, ids % 17 * 10.0 - 80)
+    return db
+
+
+def test_round_trip_and_backend(tmp_path):
+    db = synthetic_db(50)
+    write_db(db, tmp_path / "db.sqlite")
+    pd.testing.assert_frame_equal(read_db(tmp_path / "db.sqlite"), db, check_dtype=False)
+
+    db.to_csv(tmp_path / "db.csv", index=False)
+    assert bulk_load_csv(tmp_path / "db.csv", tmp_path / "bulk.sqlite", chunk_size=20) == 50
+    with FloodStore(tmp_path / "bulk.sqlite") as store:
+        pd.testing.assert_frame_equal(store.read(), db, check_dtype=False)
+
+
+def test_query(tmp_path):
+    db = synthetic_db(200)
+    with FloodStore(tmp_path / "db.sqlite") as store:
+        store.load(db)
+
+        def ids(df):
+            return sorted(df["GDACS_ID"])
+
+        assert ids(store.query(iso3="MWI")) == ids(db[db["iso3"] == "MWI"])
+        assert ids(store.query(country=["Malawi", "Bolivia"])) == ids(db)
+
+        # Events overlapping April 2020
+        in_2020 = db["fromdate"].str.startswith("2020")
+        assert ids(store.query(since="2020-04-01", until="2020-04-30")) == ids(db[in_2020])
+        assert store.query(since="2020-04-16", until="2020-04-30").empty
+        assert ids(store.query(until="2020-03-01", since="2020-03-01")) == ids(db[in_2020])
+
+        bbox = (-100.0, -50.0, 5.0, 20.0)
+        inside = db["lon"].between(bbox[0], bbox[2]) & db["lat"].between(bbox[1], bbox[3])
+        assert ids(store.query(bbox=bbox)) == ids(db[inside])
+
+        combined = store.query(iso3="BOL", tile="SA020M", bbox=bbox, since="2018-01-01")
+        expected = inside & (db["iso3"] == "BOL") & (db["fromdate"] >= "2018")
+        assert ids(combined) == ids(db[expected])
+
+        with pytest.raises(ValueError):
+            store.query(tile="AF_E036N090T6")
+
+
+def test_apply_diff_upserts_only_changes(tmp_path):
+    old = synthetic_db(30)
+    new = pd.concat([old, synthetic_db(32).iloc[30:]], ignore_index=True)
+    new = new[new["GDACS_ID"] != "FL-7"].reset_index(drop=True)
+    new.loc[new["GDACS_ID"] == "FL-3", ["todate", "lon", "lat"]] = ["2030-01-01T00:00:00", 1.5, 2.5]
+
+    with FloodStore(tmp_path / "db.sqlite") as store:
+        store.load(old)
+        assert store.apply_diff(diff_events(new, old), new) == 4
+        pd.testing.assert_frame_equal(
+            store.read().sort_values("GDACS_ID", ignore_index=True),
+            new.sort_values("GDACS_ID", ignore_index=True),
+            check_dtype=False,
+        )
+        # The R*Tree follows the moved point
+        assert store.query(bbox=(1, 2, 2, 3))["GDACS_ID"].tolist() == ["FL-3"]
+        assert store.query(bbox=(-145, -50, -145, -50)).empty
+        assert store.get(["FL-7"]).empty
+
+
+def test_apply_diff_keeps_untracked_changes(tmp_path):
+    old = synthetic_db(20)
+    new = old.copy()
+    new.loc[new["GDACS_ID"] == "FL-4", "alertlevel"] = "Red"
+    new.loc[new["GDACS_ID"] == "FL-6", "iso3"] = "MOZ"
+
+    diffs = [diff_fingerprints(new, build_fingerprint_index(old)), diff_events(new, old)]
+    for i, diff in enumerate(diffs):
+        assert diff.updated.empty
+        with FloodStore(tmp_path / f"db{i}.sqlite") as store:
+            store.load(old)
+            assert store.apply_diff(diff, new) == 2
+            assert store.get("FL-4").iloc[0]["alertlevel"] == "Red"
+            assert store.get("FL-6").iloc[0]["iso3"] == "MOZ"
+
+
+def test_overrides_and_new_columns(tmp_path):
+    db = synthetic_db(10)
+    db["continent"] = db["continent_lonlat"] = "Africa"
+    overrides = pd.DataFrame(
+        {"GDACS_ID": ["FL-2"], "Country": ["Malawi"], "Continent": [None], "ISO3": ["MWI"]}
+    )
+    with FloodStore(tmp_path / "db.sqlite") as store:
+        store.load(db.drop(columns=["continent", "continent_lonlat"]))
+        store.upsert(db.iloc[:3])  # brings the extra columns along
+        assert apply_overrides_to_store(store, overrides) == 1
+
+        row = store.get("FL-2").iloc[0]
+        assert (row["country"], row["iso3"], row["continent_lonlat"]) == ("Malawi", "MWI", "Africa")
+        assert len(store) == 10
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from gdacs_flood_db.storage import (
+    convert_db,
+    migrate_geometry,
+    read_db,
+    to_text,
+    to_typed,
+    write_db,
+)
+
+ROWS = {
+    "GDACS_ID": ["FL-1", "FL-2", "FL-3"],
+    "equi7_grid_code": ["AF020M", None, "EU020M"],
+    "country": ["Malawi", "Bolivia", "Malawi"],
+    "iso3": ["MWI", "BOL", "MWI"],
+    "eventid": [1, 2, 3],
+    "alertlevel": ["Orange", "Green", "Green"],
+    "alertscore": [2, 1, 1],
+    "fromdate": ["2015-01-01T00:00:00", "2015-01-05T00:00:00", None],
+    "todate": ["2015-02-09T23:59:59", "2015-02-09T23:59:59", "2015-03-01T00:00:00"],
+    "geometry_url": ["u1", "u2", "u3"],
+    "lon": [35.356, 45.672178100000004, np.nan],
+    "lat": [-18.795, 41.737352, np.nan],
+}
+
+LEGACY_GEOMETRY = [
+    "{'type': 'Point', 'coordinates': [35.356, -18.795]}",
+    "{'type': 'Point', 'coordinates': [45.672178100000004, 41.737352]}",
+    None,
+]
+
+
+def legacy_frame() -> pd.DataFrame:
+    df = pd.DataFrame(ROWS).drop(columns=["lon", "lat"])
+    df["geometry"] = LEGACY_GEOMETRY
+    return df
+
+
+def test_typed_round_trip():
+    df = pd.DataFrame(ROWS)
+    typed = to_typed(df)
+
+    assert pd.api.types.is_datetime64_any_dtype(typed["fromdate"])
+    assert isinstance(typed["alertlevel"].dtype, pd.CategoricalDtype)
+    assert typed.geometry.x.iloc[1] == 45.672178100000004
+    assert typed.geometry.iloc[2] is None
+    assert typed["lon"].iloc[0] == 35.356
+    pd.testing.assert_frame_equal(to_text(typed), df, check_dtype=False)
+
+
+def test_untypable_columns_stay_text():
+    df = pd.DataFrame(ROWS)
+    df.loc[0, "fromdate"] = "2015-01-01"  # needs review, must survive as is
+
+    typed = to_typed(df)
+    assert typed["fromdate"].tolist() == df["fromdate"].tolist()
+    pd.testing.assert_frame_equal(to_text(typed), df, check_dtype=False)
+
+
+def test_migrate_legacy_geometry():
+    migrated = migrate_geometry(legacy_frame())
+    pd.testing.assert_frame_equal(migrated, pd.DataFrame(ROWS))
+
+    # Non-point geometries are kept next to the parsed coordinates
+    legacy = legacy_frame()
+    legacy.loc[1, "geometry"] = "{'type': 'Polygon', 'coordinates': [[[0, 0], [1, 0], [0, 1]]]}"
+    migrated = migrate_geometry(legacy)
+    assert migrated["geometry"].tolist() == legacy["geometry"].tolist()
+    assert migrated["lon"].iloc[0] == 35.356
+    assert np.isnan(migrated["lon"].iloc[1])
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_read_write(tmp_path, suffix):
+    if suffix == ".parquet":
+        pytest.importorskip("pyarrow")
+    df = pd.DataFrame(ROWS)
+    path = tmp_path / f"db{suffix}"
+    write_db(df, path)
+
+    pd.testing.assert_frame_equal(read_db(path), df, check_dtype=False)
+    typed = read_db(path, typed=True)
+    assert typed["fromdate"].iloc[1] == pd.Timestamp("2015-01-05")
+    assert typed.crs == "EPSG:4326"
+
+
+def test_convert_legacy_csv(tmp_path):
+    pytest.importorskip("pyarrow")
+    df = pd.DataFrame(ROWS)
+    # With the old unnamed index column and str(dict) geometry
+    legacy_frame().to_csv(tmp_path / "latest.csv")
+    pd.testing.assert_frame_equal(read_db(tmp_path / "latest.csv"), df, check_dtype=False)
+
+    convert_db(tmp_path / "latest.csv", tmp_path / "latest.parquet")
+    pd.testing.assert_frame_equal(read_db(tmp_path / "latest.parquet"), df, check_dtype=False)
+
+    convert_db(tmp_path / "latest.csv")
+    assert "geometry" not in pd.read_csv(tmp_path / "latest.csv").columns
+
+    with pytest.raises(ValueError):
+        read_db(tmp_path / "latest.xlsx")
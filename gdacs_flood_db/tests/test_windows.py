@@ -0,0 +1,66 @@
+from datetime import date, datetime, timedelta
+
+from gdacs_flood_db.utils.download_db_utils import month_windows
+from gdacs_flood_db.windows import (
+    GDACS_EVENT_CAP,
+    WindowProfile,
+    bisect_window,
+    fetch_adaptive,
+)
+
+# One event every 4 hours: 180 events in June, above the 100-event cap
+EVENT_TIMES = [
+    datetime(2024, 6, 1) + timedelta(hours=4 * i) for i in range(180)
+]
+
+
+class CappedFetch:
+    """Fake GDACS endpoint that truncates at GDACS_EVENT_CAP."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, start, end):
+        self.calls.append((start, end))
+        start = datetime(start.year, start.month, start.day, getattr(start, "hour", 0))
+        end = datetime(end.year, end.month, end.day, getattr(end, "hour", 0))
+        hits = [{"properties": {"eventid": t.isoformat()}} for t in EVENT_TIMES if start <= t < end]
+        return hits[:GDACS_EVENT_CAP]
+
+
+def run(profile):
+    fetch = CappedFetch()
+    events = []
+    for start, end in profile.plan(month_windows(date(2024, 6, 1), date(2024, 7, 1))):
+        events.extend(fetch_adaptive(fetch, start, end, profile=profile))
+    return fetch, events
+
+
+def test_bisect_window_goes_from_days_to_hours():
+    assert bisect_window(date(2024, 6, 1), date(2024, 7, 1)) == [
+        (date(2024, 6, 1), date(2024, 6, 16)),
+        (date(2024, 6, 16), date(2024, 7, 1)),
+    ]
+    assert bisect_window(date(2024, 6, 1), date(2024, 6, 2)) == [
+        (datetime(2024, 6, 1), datetime(2024, 6, 1, 12)),
+        (datetime(2024, 6, 1, 12), datetime(2024, 6, 2)),
+    ]
+    assert bisect_window(datetime(2024, 6, 1), datetime(2024, 6, 1, 1)) is None
+
+
+def test_saturated_window_is_split_and_profile_reused(tmp_path):
+    path = tmp_path / "window_profile.json"
+
+    profile = WindowProfile(path)
+    first_fetch, events = run(profile)
+    profile.save()
+
+    ids = [e["properties"]["eventid"] for e in events]
+    assert ids == [t.isoformat() for t in EVENT_TIMES]
+    assert len(first_fetch.calls) == 3  # month, then two halves
+
+    # A fresh run starts from the learned size and wastes no request
+    second_fetch, events = run(WindowProfile(path))
+    assert [e["properties"]["eventid"] for e in events] == ids
+    assert len(second_fetch.calls) == 2
+    assert WindowProfile(path).spans == {"2024-JJA": 15 * 24}
@@ -0,0 +1,330 @@
+from pathlib import Path
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+# -----------------------------------------------------------------------------
+# Configuration
+# -----------------------------------------------------------------------------
+# All AOIs live in one append-only pack file. Each record is
+#
+#     <id length: u16> <payload length: u32> <GDACS_ID> <zlib(compact JSON)>
+#
+# so the pack can always be rescanned; the JSON index next to it maps
+# GDACS_ID -> (offset, length) of the latest record for that event and is
+# only an accelerator. The index records the inode of the pack it
+# describes: compaction swaps in a new pack file, so an index left from
+# before the swap (a crash between the two renames) is detected and the
+# pack rescanned. A re-downloaded AOI is appended and supersedes the
+# older record until the pack is compacted. Superseded episodes worth
+# keeping are stored under versioned keys "<GDACS_ID>@<version>".
+
+logger = logging.getLogger(__name__)
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+AOI_DIR = DATA_DIR / "aois"
+
+STORE_NAME = "aois.pack"
+INDEX_SUFFIX = ".index"  # JSON, but kept out of the *.json AOI file glob
+RECORD_HEADER = struct.Struct("<HI")
+COMPRESSION_LEVEL = 6
+VERSION_SEP = "@"
+
+# -----------------------------------------------------------------------------
+# Store
+# -----------------------------------------------------------------------------
+
+
+def encode_aoi(data: dict) -> bytes:
+    return zlib.compress(
+        json.dumps(data, separators=(",", ":")).encode("utf-8"), COMPRESSION_LEVEL
+    )
+
+
+def decode_aoi(payload: bytes) -> dict:
+    return json.loads(zlib.decompress(payload))
+
+
+def version_key(gdacs_id: str, version) -> str:
+    return f"{gdacs_id}{VERSION_SEP}{version}"
+
+
+def is_version_key(key: str) -> bool:
+    return VERSION_SEP in key
+
+
+class AoiStore:
+    """
+    Packed, compressed AOI store with random access by GDACS_ID.
+
+    Writes are thread-safe. The index is written by flush() / close();
+    records appended after the last flush are recovered by rescanning the
+    tail of the pack on open, and a partially written last record is cut.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + INDEX_SUFFIX)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[int, int]] = {}
+        self._dirty = False
+
+        end = self._load_index()
+        self._file = open(self.path, "ab")
+        self._recover(end)
+
+    @classmethod
+    def in_dir(cls, aoi_dir: Path = AOI_DIR) -> "AoiStore":
+        return cls(Path(aoi_dir) / STORE_NAME)
+
+    # -- index ----------------------------------------------------------------
+
+    def _load_index(self) -> int:
+        if not (self.index_path.exists() and self.path.exists()):
+            return 0
+        with open(self.index_path, encoding="utf-8") as f:
+            index = json.load(f)
+        stat = self.path.stat()
+        if index.get("inode") != stat.st_ino:
+            logger.warning("AOI index %s belongs to another pack, rescanning", self.index_path)
+            return 0
+        if index["end"] > stat.st_size:
+            logger.warning("AOI index %s is ahead of its pack, rescanning", self.index_path)
+            return 0
+        self._entries = {k: tuple(v) for k, v in index["entries"].items()}
+        return index["end"]
+
+    def _recover(self, start: int):
+        """
+        Index the records between `start` and the end of the pack.
+        """
+        size = self.path.stat().st_size
+        if start == size:
+            return
+        if start == 0:
+            self._entries = {}
+
+        offset = start
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            while offset + RECORD_HEADER.size <= size:
+                id_len, length = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+                data_offset = offset + RECORD_HEADER.size + id_len
+                if data_offset + length > size:
+                    break
+                gdacs_id = f.read(id_len).decode("utf-8")
+                f.seek(length, os.SEEK_CUR)
+                self._entries[gdacs_id] = (data_offset, length)
+                offset = data_offset + length
+
+        if offset < size:
+            logger.warning("Truncating partial record at the end of %s", self.path)
+            self._file.truncate(offset)
+            self._file.seek(offset)
+        self._dirty = True
+
+    def flush(self, sync: bool = False):
+        """
+        Write the index; with sync the records are fsynced first, so
+        they survive a crash (before deleting their source files).
+        """
+        with self._lock:
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+            if not self._dirty:
+                return
+            tmp_path = self.index_path.with_name(f".{self.index_path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "inode": os.fstat(self._file.fileno()).st_ino,
+                        "end": self._file.tell(),
+                        "entries": self._entries,
+                    },
+                    f,
+                )
+            os.replace(tmp_path, self.index_path)
+            self._dirty = False
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- access ---------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.ids())
+
+    def __contains__(self, gdacs_id: str) -> bool:
+        return gdacs_id in self._entries
+
+    def ids(self, versions: bool = False) -> list[str]:
+        """
+        Stored keys; versioned keys of older episodes only on request.
+        """
+        return [key for key in self._entries if versions or not is_version_key(key)]
+
+    def versions(self, gdacs_id: str) -> list[str]:
+        prefix = gdacs_id + VERSION_SEP
+        return [key[len(prefix) :] for key in self._entries if key.startswith(prefix)]
+
+    def put(self, gdacs_id: str, data: dict):
+        key = gdacs_id.encode("utf-8")
+        payload = encode_aoi(data)
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(RECORD_HEADER.pack(len(key), len(payload)) + key + payload)
+            self._file.flush()
+            self._entries[gdacs_id] = (offset + RECORD_HEADER.size + len(key), len(payload))
+            self._dirty = True
+
+    def get(self, gdacs_id: str) -> dict:
+        offset, length = self._entries[gdacs_id]
+        with open(self.path, "rb") as f:
+            return decode_aoi(os.pread(f.fileno(), length, offset))
+
+    def __iter__(self):
+        return self.items()
+
+    def items(self, versions: bool = False):
+        """
+        Yield (GDACS_ID, data) for every AOI in one sequential pass over
+        the memory-mapped pack.
+        """
+        self._file.flush()
+        entries = sorted(
+            (offset, length, key)
+            for key, (offset, length) in self._entries.items()
+            if versions or not is_version_key(key)
+        )
+        if not entries:
+            return
+
+        with (
+            open(self.path, "rb") as f,
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as packed,
+        ):
+            for offset, length, gdacs_id in entries:
+                yield gdacs_id, decode_aoi(packed[offset : offset + length])
+
+    # -- maintenance ----------------------------------------------------------
+
+    def compact(self):
+        """
+        Rewrite the pack without superseded records.
+        """
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        with AoiStore(tmp_path) as compacted:
+            for key, data in self.items(versions=True):
+                compacted.put(key, data)
+
+        with self._lock:
+            self._file.close()
+            os.replace(tmp_path, self.path)
+            os.replace(compacted.index_path, self.index_path)
+            self._entries = compacted._entries
+            self._file = open(self.path, "ab")
+            self._dirty = False
+
+    def export_geojson(self, output_path: Path, ids=None):
+        """
+        Write AOIs as one GeoJSON FeatureCollection, tagging every feature
+        with its GDACS_ID.
+        """
+        ids = set(ids) if ids is not None else None
+        features = []
+        for gdacs_id, data in self:
+            if ids is not None and gdacs_id not in ids:
+                continue
+            for feature in data.get("features", []):
+                properties = dict(feature.get("properties") or {}, GDACS_ID=gdacs_id)
+                features.append({**feature, "properties": properties})
+
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump({"type": "FeatureCollection", "features": features}, f)
+        return len(features)
+
+
+# -----------------------------------------------------------------------------
+# Legacy per-event JSON files
+# -----------------------------------------------------------------------------
+
+
+def read_aoi_file(path: Path) -> dict | None:
+    """
+    A per-event AOI file, or None when it is truncated or unreadable.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except ValueError:
+        return None
+
+
+def migrate_json_dir(aoi_dir: Path, store: AoiStore, remove: bool = False) -> int:
+    """
+    Pack the per-event <GDACS_ID>.json files of aoi_dir into store,
+    skipping events it already holds and files that do not parse.
+    With remove, files whose AOI is in the store are deleted once the
+    store is synced to disk; unreadable files are left in place.
+    Returns the number of AOIs added.
+    """
+    added = 0
+    packed = []
+    for path in sorted(Path(aoi_dir).glob("*.json")):
+        if path.stem not in store:
+            data = read_aoi_file(path)
+            if data is None:
+                logger.warning("Skipping unreadable AOI file %s", path)
+                continue
+            store.put(path.stem, data)
+            added += 1
+        packed.append(path)
+
+    store.flush(sync=remove)
+    if remove:
+        for path in packed:
+            path.unlink()
+    if added:
+        logger.info("Packed %d AOI files from %s", added, aoi_dir)
+    if remove and packed:
+        logger.info("Removed %d packed AOI files", len(packed))
+    return added
+
+
+def iter_aois(aoi_dir: Path = AOI_DIR):
+    """
+    Yield (GDACS_ID, data) for every AOI under aoi_dir: the packed store
+    first, then per-event files not yet packed.
+    """
+    aoi_dir = Path(aoi_dir)
+    packed = set()
+    if (aoi_dir / STORE_NAME).exists():
+        with AoiStore.in_dir(aoi_dir) as store:
+            packed = set(store.ids())
+            yield from store
+
+    for path in sorted(aoi_dir.glob("*.json")):
+        if path.stem not in packed:
+            data = read_aoi_file(path)
+            if data is not None:
+                yield path.stem, data
+
+
+if __name__ == "__main__":
+    with AoiStore.in_dir(AOI_DIR) as store:
+        added = migrate_json_dir(AOI_DIR, store)
+        print(f"Packed AOI files: {added}")
+        print(f"AOIs in store   : {len(store)}")
@@ -0,0 +1,202 @@
+from pathlib import Path
+from collections import defaultdict
+import json
+import logging
+import numpy as np
+import pandas as pd
+import shapely
+from shapely import STRtree
+from shapely.geometry import shape
+from gdacs_flood_db.utils.aoi_store import iter_aois
+from gdacs_flood_db.utils.equi7_grid_code import CONTINENTS, load_grid_arrays
+
+# -----------------------------------------------------------------------------
+# Configuration
+# -----------------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+AOI_DIR = DATA_DIR / "aois"
+AOI_TILES_DIR = DATA_DIR / "aoi_tiles"
+
+TILINGS = ("T3", "T6")
+EQUAL_AREA_CRS = "EPSG:6933"  # for overlap areas in km2
+
+COVERAGE_FILE = "coverage.csv"
+TILE_INDEX_FILE = "tile_index.json"
+
+# -----------------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------------
+
+
+def aoi_geometry(data: dict):
+    """
+    Union of the polygon features of a getgeometry FeatureCollection,
+    or None when it has no polygon.
+    """
+    polygons = [
+        shape(feature["geometry"])
+        for feature in data.get("features", [])
+        if (feature.get("geometry") or {}).get("type") in ("Polygon", "MultiPolygon")
+    ]
+    if not polygons:
+        return None
+    return shapely.make_valid(shapely.union_all(polygons))
+
+
+def iter_aoi_geometries(aoi_dir: Path = AOI_DIR):
+    """
+    Yield (GDACS_ID, geometry) for every AOI with a polygon in aoi_dir.
+    """
+    for gdacs_id, data in iter_aois(aoi_dir):
+        geometry = aoi_geometry(data)
+        if geometry is not None:
+            yield gdacs_id, geometry
+
+
+def tile_layer(tiling: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Geometries and continent-prefixed names (e.g. "AF_E036N090T6") of all
+    continents' tiles at `tiling`.
+    """
+    geometries, names = [], []
+    for continent in CONTINENTS:
+        layer_geometries, layer_tiles = load_grid_arrays(continent, tiling)
+        geometries.append(layer_geometries)
+        names.append(continent + "_" + layer_tiles.astype(object))
+    return np.concatenate(geometries), np.concatenate(names)
+
+
+def area_km2(geometries: np.ndarray) -> np.ndarray:
+    from pyproj import Transformer
+
+    transformer = Transformer.from_crs("EPSG:4326", EQUAL_AREA_CRS, always_xy=True)
+    projected = shapely.transform(
+        geometries, lambda xy: np.column_stack(transformer.transform(xy[:, 0], xy[:, 1]))
+    )
+    return shapely.area(projected) / 1e6
+
+
+def compute_coverage(aois, tilings=TILINGS) -> pd.DataFrame:
+    """
+    Intersect AOI polygons with the tile layers.
+
+    aois: iterable of (GDACS_ID, geometry).
+    Returns one row per overlapping (event, tile) with the overlap area.
+    """
+    ids, geometries = [], []
+    for gdacs_id, geometry in aois:
+        ids.append(gdacs_id)
+        geometries.append(geometry)
+
+    ids = np.array(ids, dtype=object)
+    geometries = np.array(geometries, dtype=object)
+    shapely.prepare(geometries)
+
+    frames = []
+    for tiling in tilings:
+        tiles, names = tile_layer(tiling)
+        tree = STRtree(tiles)
+        aoi_idx, tile_idx = tree.query(geometries, predicate="intersects")
+
+        overlap = shapely.intersection(geometries[aoi_idx], tiles[tile_idx])
+        frames.append(
+            pd.DataFrame(
+                {
+                    "GDACS_ID": ids[aoi_idx],
+                    "tiling": tiling,
+                    "tile": names[tile_idx],
+                    "overlap_km2": area_km2(overlap).round(3),
+                }
+            )
+        )
+        logger.info("Intersected %d AOIs with %s tiles", len(ids), tiling)
+
+    coverage = pd.concat(frames, ignore_index=True)
+    return coverage[coverage["overlap_km2"] > 0].sort_values(
+        ["GDACS_ID", "tiling", "tile"], ignore_index=True
+    )
+
+
+# -----------------------------------------------------------------------------
+# Index
+# -----------------------------------------------------------------------------
+
+
+class AoiTileIndex:
+    """
+    Event -> tiles and tile -> events lookups over an AOI coverage table.
+
+    A loaded index answers tile -> events from the saved inverted index
+    (TILE_INDEX_FILE) and reads the coverage table only on the first
+    event -> tiles lookup.
+    """
+
+    def __init__(
+        self,
+        coverage: pd.DataFrame | None = None,
+        by_tile: dict[str, list[str]] | None = None,
+        coverage_path: Path | None = None,
+    ):
+        self._coverage = coverage
+        self._coverage_path = coverage_path
+        self._by_event = None
+        if by_tile is None:
+            by_tile = defaultdict(list)
+            for gdacs_id, tile in self.coverage[["GDACS_ID", "tile"]].itertuples(index=False):
+                by_tile[tile].append(gdacs_id)
+        self._by_tile = by_tile
+
+    @property
+    def coverage(self) -> pd.DataFrame:
+        if self._coverage is None:
+            self._coverage = pd.read_csv(self._coverage_path)
+        return self._coverage
+
+    def tiles_for_event(self, gdacs_id: str, tiling: str | None = None) -> list[tuple[str, float]]:
+        """
+        (tile, overlap_km2) pairs for an event, optionally for one tiling.
+        """
+        if self._by_event is None:
+            self._by_event = defaultdict(list)
+            for event, tile, km2 in self.coverage[["GDACS_ID", "tile", "overlap_km2"]].itertuples(
+                index=False
+            ):
+                self._by_event[event].append((tile, km2))
+        tiles = self._by_event.get(gdacs_id, [])
+        if tiling is None:
+            return list(tiles)
+        return [(tile, km2) for tile, km2 in tiles if tile.endswith(tiling)]
+
+    def events_for_tile(self, tile: str) -> list[str]:
+        return list(self._by_tile.get(tile, []))
+
+    def save(self, out_dir: Path = AOI_TILES_DIR):
+        out_dir.mkdir(parents=True, exist_ok=True)
+        self.coverage.to_csv(out_dir / COVERAGE_FILE, index=False)
+        with open(out_dir / TILE_INDEX_FILE, "w", encoding="utf-8") as f:
+            json.dump(dict(sorted(self._by_tile.items())), f)
+
+    @classmethod
+    def load(cls, out_dir: Path = AOI_TILES_DIR) -> "AoiTileIndex":
+        with open(out_dir / TILE_INDEX_FILE, encoding="utf-8") as f:
+            by_tile = json.load(f)
+        return cls(by_tile=by_tile, coverage_path=out_dir / COVERAGE_FILE)
+
+
+def build_aoi_tile_index(
+    aoi_dir: Path = AOI_DIR,
+    out_dir: Path = AOI_TILES_DIR,
+    tilings=TILINGS,
+) -> AoiTileIndex:
+    index = AoiTileIndex(compute_coverage(iter_aoi_geometries(aoi_dir), tilings))
+    index.save(out_dir)
+    logger.info(f"AOI tile index written to: {out_dir}")
+    return index
+
+
+if __name__ == "__main__":
+    index = build_aoi_tile_index()
+    print(f"Events indexed: {index.coverage['GDACS_ID'].nunique()}")
+    print(f"Tiles touched  : {index.coverage['tile'].nunique()}")
@@ -0,0 +1,194 @@
+from pathlib import Path
+from functools import cache
+import logging
+import numpy as np
+import shapely
+from shapely import STRtree
+
+# -----------------------------------------------------------------------------
+# Configuration
+# -----------------------------------------------------------------------------
+# Point -> country resolution against the Natural Earth admin 0 layer that
+# ships in data/admin_0_countries. The 1:110m coastlines are coarse, so
+# points on the coast often fall just outside every polygon; those can be
+# snapped to the nearest country within NEAREST_MAX_DISTANCE degrees.
+
+logger = logging.getLogger(__name__)
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+COUNTRIES_PATH = DATA_DIR / "admin_0_countries" / "ne_110m_admin_0_countries.shp"
+
+NEAREST_MAX_DISTANCE = 1.0  # degrees; None disables the nearest fallback
+NO_ISO3 = "-99"  # Natural Earth's placeholder for missing codes
+LIST_SEPARATORS = (",", "|")  # GDACS country strings naming several countries
+
+# -----------------------------------------------------------------------------
+# Index
+# -----------------------------------------------------------------------------
+
+
+@cache
+def load_countries() -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (geometries, names, ISO3 codes, continents) of the admin 0 layer.
+    """
+    import geopandas as gpd
+
+    layer = gpd.read_file(COUNTRIES_PATH).to_crs("EPSG:4326")
+    # ISO_A3 is -99 for a few countries (France, Norway) that have an
+    # ISO_A3_EH; territories without either keep Natural Earth's ADM0_A3
+    iso3 = layer["ISO_A3_EH"].where(layer["ISO_A3_EH"] != NO_ISO3, layer["ADM0_A3"])
+    return (
+        layer.geometry.values.to_numpy(),
+        layer["ADMIN"].to_numpy(dtype=object),
+        iso3.to_numpy(dtype=object),
+        layer["CONTINENT"].to_numpy(dtype=object),
+    )
+
+
+class CountryIndex:
+    """
+    Country polygons behind an STRtree, resolving arrays of points to
+    country name, ISO3 and continent.
+    """
+
+    def __init__(self, geometries, names, iso3, continents):
+        self.geometries = geometries
+        self.names = names
+        self.iso3 = iso3
+        self.continents = continents
+        shapely.prepare(self.geometries)
+        self.tree = STRtree(self.geometries)
+
+    def query_countries(self, lon, lat, nearest_max_distance=NEAREST_MAX_DISTANCE) -> np.ndarray:
+        """
+        Index of the country containing each point, or with
+        nearest_max_distance the closest country within that distance;
+        -1 where none.
+        """
+        lon = np.asarray(lon, dtype=float)
+        lat = np.asarray(lat, dtype=float)
+        result = np.full(len(lon), -1, dtype=np.int64)
+
+        valid = np.flatnonzero(~(np.isnan(lon) | np.isnan(lat)))
+        points = shapely.points(lon[valid], lat[valid])
+        point_idx, country_idx = self.tree.query(points, predicate="intersects")
+        # A point on a shared border resolves to the first country in layer order
+        first = np.full(len(valid), len(self.geometries), dtype=np.int64)
+        np.minimum.at(first, point_idx, country_idx)
+        found = first < len(self.geometries)
+        result[valid[found]] = first[found]
+
+        if nearest_max_distance is not None and not found.all():
+            missing = np.flatnonzero(~found)
+            point_idx, country_idx = self.tree.query_nearest(
+                points[missing], max_distance=nearest_max_distance, all_matches=False
+            )
+            result[valid[missing[point_idx]]] = country_idx
+
+        return result
+
+    def lookup_many(self, lon, lat, nearest_max_distance=NEAREST_MAX_DISTANCE) -> dict[str, np.ndarray]:
+        """
+        Columns country, iso3 and continent (None where unresolved) for
+        arrays of lon/lat.
+        """
+        idx = self.query_countries(lon, lat, nearest_max_distance)
+        found = idx >= 0
+        result = {}
+        for field, values in (
+            ("country", self.names),
+            ("iso3", self.iso3),
+            ("continent", self.continents),
+        ):
+            column = np.full(len(idx), None, dtype=object)
+            column[found] = values[idx[found]]
+            result[field] = column
+        return result
+
+
+@cache
+def get_country_index() -> CountryIndex:
+    return CountryIndex(*load_countries())
+
+
+def resolve_countries(lon, lat, nearest_max_distance=NEAREST_MAX_DISTANCE) -> dict[str, np.ndarray]:
+    """
+    Country name, ISO3 and continent for arrays of lon/lat, in one
+    vectorized spatial query.
+    """
+    return get_country_index().lookup_many(lon, lat, nearest_max_distance)
+
+
+# -----------------------------------------------------------------------------
+# Filling GDACS country fields
+# -----------------------------------------------------------------------------
+
+
+def fill_countries(
+    country,
+    iso3,
+    lon,
+    lat,
+    candidates=None,
+    nearest_max_distance=NEAREST_MAX_DISTANCE,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fill missing or ambiguous GDACS country fields from the event points.
+
+    - no ISO3: the resolved ISO3, and the resolved name too when GDACS
+      gave none or a list of several countries
+    - several affected countries (candidates: per event, a list of
+      (name, ISO3) from GDACS): the one containing the point, if listed
+
+    GDACS values are kept wherever the point does not resolve. Returns
+    the new (country, iso3) arrays.
+    """
+    country = np.array(country, dtype=object)
+    iso3 = np.array(iso3, dtype=object)
+    missing_iso3 = np.array([not isinstance(v, str) or not v for v in iso3])
+    ambiguous = (
+        np.array([len(c or ()) > 1 for c in candidates])
+        if candidates is not None
+        else np.zeros(len(iso3), dtype=bool)
+    )
+    todo = np.flatnonzero(missing_iso3 | ambiguous)
+    if not len(todo):
+        return country, iso3
+
+    resolved = resolve_countries(
+        np.asarray(lon, dtype=float)[todo],
+        np.asarray(lat, dtype=float)[todo],
+        nearest_max_distance,
+    )
+    filled = picked = 0
+    for i, name, code in zip(todo, resolved["country"], resolved["iso3"]):
+        if code is None:
+            continue
+        if missing_iso3[i]:
+            name_given = isinstance(country[i], str) and bool(country[i])
+            if not name_given or any(sep in country[i] for sep in LIST_SEPARATORS):
+                country[i] = name
+            iso3[i] = code
+            filled += 1
+        elif code != iso3[i]:
+            for candidate_name, candidate_iso3 in candidates[i]:
+                if candidate_iso3 == code:
+                    country[i], iso3[i] = candidate_name, candidate_iso3
+                    picked += 1
+                    break
+
+    logger.info(
+        "Countries resolved from event points: %d filled, %d of several picked",
+        filled,
+        picked,
+    )
+    return country, iso3
+
+
+if __name__ == "__main__":
+    from gdacs_flood_db.storage import read_db
+
+    df = read_db(DATA_DIR / "gdacs_flood_db.csv")
+    country, iso3 = fill_countries(df["country"], df["iso3"], df["lon"], df["lat"])
+    print(f"Events without ISO3: {df['iso3'].isna().sum()}")
+    print(f"Still without ISO3 : {sum(v is None or v != v for v in iso3)}")
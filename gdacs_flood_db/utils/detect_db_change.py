@@ -1,9 +1,83 @@
 from pathlib import Path
+from typing import NamedTuple
+import numpy as np
 import pandas as pd
 
 TRACKED_FIELDS = ["fromdate", "todate", "geometry_url"]
 
 
+class EventDiff(NamedTuple):
+    updated: pd.DataFrame  # detect_updated_events output
+    added: pd.Index  # GDACS_IDs only in the new DB
+    removed: pd.Index  # GDACS_IDs only in the old DB
+    changed: pd.Index | None = None  # shared GDACS_IDs whose row changed in any field
+
+    def upserted(self) -> pd.Index:
+        """
+        GDACS_IDs whose rows must be (re)written from the new DB: added
+        events and every changed one, tracked fields or not.
+        """
+        changed = self.changed
+        if changed is None:
+            changed = pd.Index(self.updated["GDACS_ID"] if not self.updated.empty else [])
+        return pd.Index(self.added).append(pd.Index(changed)).unique()
+
+
+def _by_id(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.set_index("GDACS_ID")
+    return df[~df.index.duplicated(keep="last")]
+
+
+def diff_events(
+    df_new: pd.DataFrame,
+    df_old: pd.DataFrame,
+    fields: list[str] = TRACKED_FIELDS,
+) -> EventDiff:
+    """
+    Compare two DB versions in one aligned, columnar pass: events whose
+    tracked fields changed, plus added and removed GDACS_IDs.
+    """
+    old = _by_id(df_old)
+    new = _by_id(df_new)
+
+    in_old = new.index.isin(old.index)
+    added = new.index[~in_old]
+    removed = old.index[~old.index.isin(new.index)]
+
+    shared = new.index[in_old]
+    columns = [c for c in new.columns if c in old.columns]
+    new_all = new.loc[shared, columns].to_numpy(dtype=object)
+    old_all = old.loc[shared, columns].to_numpy(dtype=object)
+
+    # NaN on both sides is no change; NaN on one side is
+    both_na = pd.isna(new_all) & pd.isna(old_all)
+    changed_all = (new_all != old_all) & ~both_na
+    changed_rows = pd.Index(shared[changed_all.any(axis=1)], name="GDACS_ID")
+
+    tracked = [columns.index(f) for f in fields]
+    new_values, old_values, changed = new_all[:, tracked], old_all[:, tracked], changed_all[:, tracked]
+
+    rows = np.flatnonzero(changed.any(axis=1))
+    if not len(rows):
+        return EventDiff(pd.DataFrame(), added, removed, changed_rows)
+
+    changed_fields, change_details = [], []
+    for row in rows:
+        cols = np.flatnonzero(changed[row])
+        changed_fields.append([fields[c] for c in cols])
+        change_details.append(
+            {
+                fields[c]: {"old": old_values[row, c], "new": new_values[row, c]}
+                for c in cols
+            }
+        )
+
+    updated = new.loc[shared[rows]].copy()
+    updated["changed_fields"] = pd.Series(changed_fields, updated.index, dtype=object)
+    updated["change_details"] = pd.Series(change_details, updated.index, dtype=object)
+    return EventDiff(updated.rename_axis("GDACS_ID").reset_index(), added, removed, changed_rows)
+
+
 def detect_updated_events(
     df_new: pd.DataFrame,
     df_old: pd.DataFrame,
@@ -12,40 +86,7 @@ def detect_updated_events(
     Detect existing GDACS events whose tracked fields changed.
     Returns rows from df_new that should overwrite old records.
     """
-
-    # Index by GDACS_ID for safe alignment
-    old = df_old.set_index("GDACS_ID")
-    new = df_new.set_index("GDACS_ID")
-
-    updated_rows = []
-
-    for gdacs_id in new.index.intersection(old.index):
-        changes = {}
-
-        for field in TRACKED_FIELDS:
-            old_val = old.at[gdacs_id, field]
-            new_val = new.at[gdacs_id, field]
-
-            # Handle NaNs safely
-            if pd.isna(old_val) and pd.isna(new_val):
-                continue
-
-            if old_val != new_val:
-                changes[field] = {
-                    "old": old_val,
-                    "new": new_val,
-                }
-
-        if changes:
-            row = new.loc[gdacs_id].copy()
-            row["changed_fields"] = list(changes.keys())
-            row["change_details"] = changes
-            updated_rows.append(row)
-
-    if not updated_rows:
-        return pd.DataFrame()
-
-    return pd.DataFrame(updated_rows).reset_index()
+    return diff_events(df_new, df_old).updated
 
 
 if __name__ == "__main__":
@@ -54,10 +95,13 @@ if __name__ == "__main__":
     BASE_DB = DATA_DIR / "gdacs_flood_db.csv"
     NEW_DB = DATA_DIR / "gdacs_flood_db_20260204.csv"  # Example new DB
 
-    df_new = pd.read_csv(NEW_DB)
-    df_old = pd.read_csv(BASE_DB)
+    from gdacs_flood_db.storage import read_db
+
+    df_new = read_db(NEW_DB)
+    df_old = read_db(BASE_DB)
 
-    changed_events = detect_updated_events(df_new, df_old)
-    print(f"Changed existing events: {len(changed_events)}")
-    if not changed_events.empty:
-        print(changed_events)
+    diff = diff_events(df_new, df_old)
+    print(f"Changed existing events: {len(diff.updated)}")
+    print(f"Added events: {len(diff.added)}, removed events: {len(diff.removed)}")
+    if not diff.updated.empty:
+        print(diff.updated)
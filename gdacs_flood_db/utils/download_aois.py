@@ -1,8 +1,17 @@
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
 import pandas as pd
 import requests
 import json
+import random
 import time
+from urllib.parse import parse_qs, urlparse
+from gdacs_flood_db.cache import ResponseCache
+from gdacs_flood_db.config import HTTP_CACHE_DIR
+from gdacs_flood_db.fetch import configure_session
+from gdacs_flood_db.storage import read_db
+from gdacs_flood_db.utils.aoi_store import AoiStore, migrate_json_dir, version_key
 
 # -----------------------------------------------------------------------------
 # Configuration
@@ -11,9 +20,14 @@ import time
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
 DB_PATH = DATA_DIR / "gdacs_flood_db_corrected.csv"
 AOI_DIR = DATA_DIR / "aois"
+MANIFEST_NAME = "_manifest.jsonl"
 
 REQUEST_TIMEOUT = 30  # seconds
-SLEEP_BETWEEN_REQUESTS = 0.5  
+MAX_WORKERS = 8  # concurrent downloads
+RATE_LIMIT = 4.0  # requests per second to gdacs.org
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0  # seconds, doubled after every failed attempt
+RETRY_STATUS = {429, 500, 502, 503, 504}
 
 # -----------------------------------------------------------------------------
 # Helpers
@@ -24,64 +38,240 @@ def ensure_aoi_dir():
 
 
 def load_database() -> pd.DataFrame:
-    return pd.read_csv(DB_PATH)
+    return read_db(DB_PATH)
 
 
-def download_aoi(url: str) -> dict:
-    response = requests.get(url, timeout=REQUEST_TIMEOUT)
-    response.raise_for_status()
-    return response.json()
+def make_session(
+    use_cache: bool = True,
+    transport=None,
+    workers: int = 1,
+    rate_limit: float | None = None,
+) -> requests.Session:
+    cache = ResponseCache(HTTP_CACHE_DIR) if use_cache else None
+    return configure_session(
+        requests.Session(),
+        pool_size=workers,
+        rate_limit=rate_limit,
+        cache=cache,
+        transport=transport,
+    )
 
 
-def save_aoi(gdacs_id: str, data: dict):
-    output_path = AOI_DIR / f"{gdacs_id}.json"
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+def download_aoi(
+    url: str,
+    session=requests,
+    retries: int | None = None,
+    backoff: float | None = None,
+) -> dict:
+    """
+    GET an AOI, retrying connection errors and 429/5xx responses with
+    exponential backoff and jitter (MAX_RETRIES and BACKOFF_BASE by
+    default).
+    """
+    retries = MAX_RETRIES if retries is None else retries
+    backoff = BACKOFF_BASE if backoff is None else backoff
+    if retries < 1:
+        raise ValueError(f"retries is the number of attempts and must be >= 1, got {retries}")
+
+    for attempt in range(1, retries + 1):
+        try:
+            response = session.get(url, timeout=REQUEST_TIMEOUT)
+            if response.status_code not in RETRY_STATUS:
+                response.raise_for_status()
+                return response.json()
+            error = requests.HTTPError(f"{response.status_code} for {url}")
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+
+        if attempt < retries:
+            time.sleep(backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+
+    raise error
+
+
+def save_aoi(gdacs_id: str, data: dict, aoi_dir: Path | None = None):
+    """
+    Store one AOI in the packed store of aoi_dir. Kept for callers of
+    the per-file layout; opens the store per call, so batch writers
+    should use AoiStore directly.
+    """
+    with AoiStore.in_dir(AOI_DIR if aoi_dir is None else aoi_dir) as store:
+        store.put(gdacs_id, data)
+
+
+def episode_id(geometry_url: str) -> str | None:
+    values = parse_qs(urlparse(geometry_url).query).get("episodeid")
+    return values[0] if values else None
+
+
+def load_manifest(manifest_path: Path, status: str | None = None) -> dict[str, dict]:
+    """
+    Latest manifest record per GDACS_ID, optionally only among records
+    with the given status.
+    """
+    records = {}
+    if not manifest_path.exists():
+        return records
+
+    with open(manifest_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # partially written last line
+            if status is None or record["status"] == status:
+                records[record["GDACS_ID"]] = record
+    return records
+
+
+def is_complete(
+    store: AoiStore, gdacs_id: str, geometry_url: str, record: dict | None
+) -> bool:
+    """
+    Whether an AOI needs no download: it is packed and its last manifest
+    record, if any, is a success for the same geometry_url. A new
+    geometry_url means GDACS published a new episode polygon.
+    """
+    if gdacs_id not in store:
+        return False
+    if record is None:
+        return True  # packed from a file older than the manifest
+    return record["status"] == "ok" and record.get("geometry_url", geometry_url) == geometry_url
 
 
 # -----------------------------------------------------------------------------
 # Main logic
 # -----------------------------------------------------------------------------
 
-def main():
-    ensure_aoi_dir()
-    df = load_database()
+def download_all_aois(
+    df: pd.DataFrame,
+    aoi_dir: Path = AOI_DIR,
+    session=None,
+    workers: int = MAX_WORKERS,
+    keep_versions: bool = True,
+) -> dict[str, int]:
+    """
+    Download the AOIs of every event in df concurrently into the packed
+    AOI store in aoi_dir, resuming from its progress manifest. Per-event
+    JSON files left by older runs are packed first, then deleted.
 
-    total = len(df)
-    downloaded = 0
-    skipped = 0
-    failed = 0
+    Events whose geometry_url changed since their last successful
+    download are re-fetched; with keep_versions the replaced AOI stays
+    in the store under its episode. Returns summary counts.
+    """
+    aoi_dir.mkdir(parents=True, exist_ok=True)
+    if session is None:
+        session = make_session(workers=workers, rate_limit=RATE_LIMIT)
 
-    for _, row in df.iterrows():
-        gdacs_id = row.get("GDACS_ID")
-        geometry_url = row.get("geometry_url")
+    manifest_path = aoi_dir / MANIFEST_NAME
+    manifest = load_manifest(manifest_path)
+    synced = load_manifest(manifest_path, status="ok")
+    counts = {"total": len(df), "downloaded": 0, "refreshed": 0, "skipped": 0, "failed": 0}
 
-        if not gdacs_id or not geometry_url:
-            failed += 1
-            continue
+    store = AoiStore.in_dir(aoi_dir)
+    # Legacy files are deleted once packed, so later runs glob nothing
+    migrate_json_dir(aoi_dir, store, remove=True)
 
-        output_file = AOI_DIR / f"{gdacs_id}.json"
+    todo = []
+    for gdacs_id, geometry_url in df[["GDACS_ID", "geometry_url"]].itertuples(index=False):
+        if pd.isna(gdacs_id) or pd.isna(geometry_url):
+            counts["failed"] += 1
+        elif is_complete(store, gdacs_id, geometry_url, manifest.get(gdacs_id)):
+            counts["skipped"] += 1
+        else:
+            todo.append((gdacs_id, geometry_url))
 
-        if output_file.exists():
-            skipped += 1
-            continue
+    def fetch_and_save(gdacs_id, geometry_url) -> bool:
+        """
+        Store the AOI; True when it replaces another episode's polygon.
+        """
+        data = download_aoi(geometry_url, session)
+        previous = synced.get(gdacs_id, {}).get("geometry_url")
+        replaced = gdacs_id in store and previous not in (None, geometry_url)
+        if replaced and keep_versions:
+            version = episode_id(previous) or synced[gdacs_id]["time"]
+            store.put(version_key(gdacs_id, version), store.get(gdacs_id))
+        store.put(gdacs_id, data)
+        return replaced
 
-        try:
-            aoi_data = download_aoi(geometry_url)
-            save_aoi(gdacs_id, aoi_data)
-            downloaded += 1
-            time.sleep(SLEEP_BETWEEN_REQUESTS)
+    with (
+        store,
+        ThreadPoolExecutor(max_workers=workers) as pool,
+        open(manifest_path, "a", encoding="utf-8") as manifest_file,
+    ):
+        futures = {
+            pool.submit(fetch_and_save, gdacs_id, url): (gdacs_id, url)
+            for gdacs_id, url in todo
+        }
+
+        for future in as_completed(futures):
+            gdacs_id, geometry_url = futures[future]
+            record = {
+                "GDACS_ID": gdacs_id,
+                "geometry_url": geometry_url,
+                "status": "ok",
+                "time": datetime.now(timezone.utc).isoformat(),
+            }
+            try:
+                if future.result():
+                    counts["refreshed"] += 1
+                counts["downloaded"] += 1
+            except Exception as e:
+                print(f"[ERROR] {gdacs_id}: {e}")
+                record["status"] = "failed"
+                record["error"] = str(e)
+                counts["failed"] += 1
+
+            manifest_file.write(json.dumps(record) + "\n")
+            manifest_file.flush()
+
+    return counts
+
+
+def sync_changed_aois(
+    changed_events: pd.DataFrame,
+    new_events: pd.DataFrame | None = None,
+    aoi_dir: Path = AOI_DIR,
+    session=None,
+    workers: int = MAX_WORKERS,
+) -> dict[str, int]:
+    """
+    Bring the AOI store up to date after a DB update: fetch the AOIs of
+    new events and of changed events (detect_updated_events output)
+    whose geometry_url changed. Work is proportional to the changes, not
+    to the size of the DB.
+    """
+    frames = []
+    if not changed_events.empty:
+        geometry_changed = changed_events["changed_fields"].map(
+            lambda fields: "geometry_url" in fields
+        )
+        frames.append(changed_events.loc[geometry_changed, ["GDACS_ID", "geometry_url"]])
+    if new_events is not None and not new_events.empty:
+        frames.append(new_events[["GDACS_ID", "geometry_url"]])
+
+    todo = (
+        pd.concat(frames).drop_duplicates("GDACS_ID", keep="last")
+        if frames
+        else pd.DataFrame(columns=["GDACS_ID", "geometry_url"])
+    )
+    return download_all_aois(todo, aoi_dir, session, workers)
+
+
+def main(use_cache: bool = True, transport=None, workers: int = MAX_WORKERS):
+    ensure_aoi_dir()
+    df = load_database()
+    session = make_session(use_cache, transport, workers, RATE_LIMIT)
 
-        except Exception as e:
-            print(f"[ERROR] {gdacs_id}: {e}")
-            failed += 1
+    counts = download_all_aois(df, AOI_DIR, session, workers)
 
     print("AOI download summary")
     print("--------------------")
-    print(f"Total events     : {total}")
-    print(f"Downloaded       : {downloaded}")
-    print(f"Already existed  : {skipped}")
-    print(f"Failed           : {failed}")
+    print(f"Total events     : {counts['total']}")
+    print(f"Downloaded       : {counts['downloaded']}")
+    print(f"New episodes     : {counts['refreshed']}")
+    print(f"Already existed  : {counts['skipped']}")
+    print(f"Failed           : {counts['failed']}")
 
 
 if __name__ == "__main__":
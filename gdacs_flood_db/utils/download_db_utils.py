@@ -1,5 +1,12 @@
 from datetime import date
-from .equi7_grid_code import get_equ7_code_lonlat
+from .equi7_grid_code import (
+    get_equ7_code_lonlat,
+    assign_equi7_codes,
+    assign_equi7_tiles,
+    equi7_codes_of,
+)
+from .country_resolver import fill_countries
+from ..schema import flood_fields
 
 
 def month_windows(start: date, end: date):
@@ -23,6 +30,8 @@ def resolve_country_from_gdacs(props: dict) -> dict | None:
 
     if isinstance(affected, list) and affected:
         c = affected[0] or {}
+        if isinstance(c, str):
+            c = {"countryname": c}
         return {
             "country_name": c.get("countryname"),
             "iso2": c.get("iso2"),
@@ -41,18 +50,37 @@ def resolve_country_from_gdacs(props: dict) -> dict | None:
     return None
 
 
-def normalize_flood_event(feature: dict) -> dict:
+def affected_countries(props: dict) -> list[tuple[str, str]]:
+    """
+    (name, ISO3) of every country GDACS lists for an event.
+    """
+    affected = props.get("affectedcountries")
+    if not isinstance(affected, list):
+        return []
+    return [
+        (c.get("countryname"), c.get("iso3"))
+        for c in affected
+        if isinstance(c, dict) and c.get("iso3")
+    ]
+
+
+def normalize_flood_event(
+    feature: dict,
+    assign_equi7: bool = True,
+    equi7_tiles: bool = False,
+) -> dict:
     props = feature.get("properties", {})
-    geom = feature.get("geometry", {})
-    lon, lat = geom.get("coordinates", (None, None))
+    geom = feature.get("geometry") or {}
+    lon, lat = geom.get("coordinates") or (None, None)
 
     # Primary source: GDACS
     country_gdacs = resolve_country_from_gdacs(props)
 
-    # add Equi7 grid code based on lon/lat
-    equi7_code = get_equ7_code_lonlat(lon, lat)
+    # add Equi7 grid code based on lon/lat; with equi7_tiles it comes
+    # from the hierarchical query below
+    equi7_code = get_equ7_code_lonlat(lon, lat) if assign_equi7 and not equi7_tiles else None
 
-    return {
+    row = {
         "GDACS_ID": f"{props.get('eventtype')}-{props.get('eventid')}",
         "equi7_grid_code": equi7_code,
         # primary (GDACS)
@@ -68,9 +96,70 @@ def normalize_flood_event(feature: dict) -> dict:
         "geometry_url": props.get("url", {}).get("geometry"),
         "report_url": props.get("url", {}).get("report"),
         "details_url": props.get("url", {}).get("details"),
-        "geometry": geom,
+        "lon": lon,
+        "lat": lat,
     }
 
+    if not equi7_tiles:
+        return row
+
+    # add continent / T6 / T3 / T1 tile names
+    if assign_equi7:
+        tiles = assign_equi7_tiles(
+            [lon if lon is not None else float("nan")],
+            [lat if lat is not None else float("nan")],
+        )
+        row.update({field: values[0] for field, values in tiles.items()})
+        row["equi7_grid_code"] = equi7_codes_of(tiles["equi7_continent"])[0]
+    return {field: row.get(field) for field in flood_fields(equi7_tiles=True)}
+
+
+def normalize_flood_events(
+    features: list[dict],
+    equi7_tiles: bool = False,
+    resolve_countries: bool = True,
+) -> list[dict]:
+    """
+    Normalize a batch of features, assigning Equi7 codes (and, with
+    equi7_tiles, the T6/T3/T1 tile names) for all of them in one
+    vectorized query. With resolve_countries, missing or ambiguous
+    country fields are filled from the event points.
+    """
+    rows = [
+        normalize_flood_event(f, assign_equi7=False, equi7_tiles=equi7_tiles)
+        for f in features
+    ]
+    if not rows:
+        return rows
+
+    lon = [row["lon"] if row["lon"] is not None else float("nan") for row in rows]
+    lat = [row["lat"] if row["lat"] is not None else float("nan") for row in rows]
+
+    if equi7_tiles:
+        # One hierarchical query; its continent gives the Equi7 code
+        tiles = assign_equi7_tiles(lon, lat)
+        codes = equi7_codes_of(tiles["equi7_continent"])
+        for field, values in tiles.items():
+            for row, value in zip(rows, values):
+                row[field] = value
+    else:
+        codes = assign_equi7_codes(lon, lat)
+
+    for row, code in zip(rows, codes):
+        row["equi7_grid_code"] = code
+
+    if resolve_countries:
+        country, iso3 = fill_countries(
+            [row["country"] for row in rows],
+            [row["iso3"] for row in rows],
+            lon,
+            lat,
+            candidates=[affected_countries(f.get("properties", {})) for f in features],
+        )
+        for row, name, code in zip(rows, country, iso3):
+            row["country"], row["iso3"] = name, code
+    return rows
+
 
 if __name__ == "__main__":
     pass
@@ -1,9 +1,14 @@
 from pathlib import Path
+from functools import cache
+import os
 import pandas as pd
+import numpy as np
 import logging
-import geopandas as gpd
+import shapely
+from shapely import STRtree
 from shapely.geometry import Point
 import ast
+from gdacs_flood_db.config import CACHE_DIR
 
 # -----------------------------------------------------------------------------
 # Configuration
@@ -13,12 +18,93 @@ logger = logging.getLogger(__name__)
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
 FLOOD_DB_CORRECTED_PATH = DATA_DIR / "gdacs_flood_db_corrected.csv"
 EQUI7_GRID_CODE_PATH = DATA_DIR / "Equi7Grid"
-AF020M = gpd.read_file(EQUI7_GRID_CODE_PATH / "AF/GEOG" / "EQUI7_V14_AF_GEOG_TILE_T3.shp").to_crs("EPSG:4326")
-AS020M = gpd.read_file(EQUI7_GRID_CODE_PATH / "AS/GEOG" / "EQUI7_V14_AS_GEOG_TILE_T3.shp").to_crs("EPSG:4326")
-EU020M = gpd.read_file(EQUI7_GRID_CODE_PATH / "EU/GEOG" / "EQUI7_V14_EU_GEOG_TILE_T3.shp").to_crs("EPSG:4326")
-NA020M = gpd.read_file(EQUI7_GRID_CODE_PATH / "NA/GEOG" / "EQUI7_V14_NA_GEOG_TILE_T3.shp").to_crs("EPSG:4326")
-OC020M = gpd.read_file(EQUI7_GRID_CODE_PATH / "OC/GEOG" / "EQUI7_V14_OC_GEOG_TILE_T3.shp").to_crs("EPSG:4326")
-SA020M = gpd.read_file(EQUI7_GRID_CODE_PATH / "SA/GEOG" / "EQUI7_V14_SA_GEOG_TILE_T3.shp").to_crs("EPSG:4326")
+EQUI7_CACHE_DIR = CACHE_DIR / "equi7"
+
+# Lookup priority when a point falls in tiles of several continents
+CONTINENTS = ["AF", "AS", "EU", "NA", "OC", "SA"]
+
+SHAPEFILE_PARTS = (".shp", ".shx", ".dbf", ".prj")
+
+# -----------------------------------------------------------------------------
+# Grid layers
+# -----------------------------------------------------------------------------
+# The tile layers are only read on first use. The geometries and tile names
+# are converted once into a compact WKB cache (data/cache/equi7/*.npz) that
+# is rebuilt whenever the source shapefile changes.
+
+
+def grid_layer_path(continent: str, tiling: str = "T3") -> Path:
+    return (
+        EQUI7_GRID_CODE_PATH
+        / continent
+        / "GEOG"
+        / f"EQUI7_V14_{continent}_GEOG_TILE_{tiling}.shp"
+    )
+
+
+def source_fingerprint(shp_path: Path) -> str:
+    parts = []
+    for suffix in SHAPEFILE_PARTS:
+        part = shp_path.with_suffix(suffix)
+        if part.exists():
+            stat = part.stat()
+            parts.append(f"{part.name}:{stat.st_size}:{stat.st_mtime_ns}")
+    return "|".join(parts)
+
+
+@cache
+def load_grid_layer(continent: str, tiling: str = "T3"):
+    """
+    Full GeoDataFrame of a continent's tile layer (all attributes).
+    """
+    import geopandas as gpd
+
+    return gpd.read_file(grid_layer_path(continent, tiling)).to_crs("EPSG:4326")
+
+
+@cache
+def load_grid_arrays(continent: str, tiling: str = "T3") -> tuple[np.ndarray, np.ndarray]:
+    """
+    (geometries, tile names) of a continent's tile layer, read from the
+    compact cache when it is up to date.
+    """
+    shp_path = grid_layer_path(continent, tiling)
+    cache_path = EQUI7_CACHE_DIR / f"{shp_path.stem}.npz"
+    fingerprint = source_fingerprint(shp_path)
+
+    if cache_path.exists():
+        with np.load(cache_path) as cached:
+            if str(cached["source"]) == fingerprint:
+                wkb = np.split(cached["wkb"], cached["offsets"][1:-1])
+                geometries = shapely.from_wkb([w.tobytes() for w in wkb])
+                return geometries, cached["tiles"].astype(object)
+
+    logger.info("Building Equi7 grid cache for %s", shp_path.name)
+    layer = load_grid_layer(continent, tiling)
+    geometries = layer.geometry.values.to_numpy()
+    tiles = layer["TILE"].to_numpy(dtype=object)
+
+    wkb = shapely.to_wkb(geometries)
+    offsets = np.cumsum([0] + [len(w) for w in wkb])
+    EQUI7_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.tmp.npz")
+    np.savez(
+        tmp_path,
+        wkb=np.frombuffer(b"".join(wkb), dtype=np.uint8),
+        offsets=offsets,
+        tiles=tiles.astype(str),
+        source=np.array(fingerprint),
+    )
+    os.replace(tmp_path, cache_path)
+
+    return geometries, tiles
+
+
+def __getattr__(name: str):
+    # Backwards-compatible lazy access to the T3 layers (AF020M, ...)
+    if len(name) == 6 and name.endswith("020M") and name[:2] in CONTINENTS:
+        return load_grid_layer(name[:2], "T3")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # -----------------------------------------------------------------------------
 # Functions
@@ -28,46 +114,294 @@ def load_flood_db_corrected() -> pd.DataFrame:
     """Load the corrected GDACS flood database.
     """
     try:
-        df = pd.read_csv(FLOOD_DB_CORRECTED_PATH)
+        from gdacs_flood_db.storage import read_db
+
+        df = read_db(FLOOD_DB_CORRECTED_PATH)
         logger.info("Successfully loaded the corrected flood database.")
         return df
     except Exception as e:
         logger.error(f"Error loading the corrected flood database: {e}")
         raise
 
-def get_equ7_code_lonlat(lon: float, lat: float) -> str:
-    point_gdf = gpd.GeoDataFrame(
-        geometry=[Point(lon, lat)],
-        crs="EPSG:4326"
+class Equi7TileIndex:
+    """
+    All continents' tiles merged into one layer behind an STRtree.
+
+    Tiles are ordered by continent priority (CONTINENTS) and then by
+    their order in the source layer; a point on a shared border, or in
+    overlapping tiles, resolves to the first tile in that order.
+    """
+
+    def __init__(self, layers: dict[str, tuple[np.ndarray, np.ndarray]]):
+        geometries = []
+        tiles = []
+        continents = []
+        for continent in CONTINENTS:
+            layer_geometries, layer_tiles = layers[continent]
+            geometries.append(layer_geometries)
+            tiles.append(layer_tiles)
+            continents.append(np.full(len(layer_geometries), continent, dtype=object))
+
+        self.geometries = np.concatenate(geometries)
+        self.tiles = np.concatenate(tiles)
+        self.continents = np.concatenate(continents)
+        self.codes = np.array([c + "020M" for c in self.continents], dtype=object)
+        shapely.prepare(self.geometries)
+        self.tree = STRtree(self.geometries)
+
+    def query_tile(self, lon: float, lat: float) -> int | None:
+        """
+        Index of the first tile containing (or touching) the point.
+        """
+        if lon is None or lat is None or np.isnan(lon) or np.isnan(lat):
+            return None
+
+        candidates = self.tree.query(Point(lon, lat))
+        if len(candidates) == 0:
+            return None
+
+        candidates = np.sort(candidates)
+        hits = shapely.intersects_xy(self.geometries[candidates], lon, lat)
+        if not hits.any():
+            return None
+        return int(candidates[hits.argmax()])
+
+    def lookup(self, lon: float, lat: float) -> str | None:
+        tile = self.query_tile(lon, lat)
+        return None if tile is None else self.codes[tile]
+
+    def query_tiles(self, lon, lat, chunk_size: int = 100_000) -> np.ndarray:
+        """
+        Vectorized query_tile: index of the first matching tile for every
+        point, -1 where there is none. Points are queried in chunks of
+        chunk_size to bound memory.
+        """
+        lon = np.asarray(lon, dtype=float)
+        lat = np.asarray(lat, dtype=float)
+        result = np.full(len(lon), -1, dtype=np.int64)
+        no_match = np.iinfo(np.int64).max
+
+        for start in range(0, len(lon), chunk_size):
+            stop = start + chunk_size
+            points = shapely.points(lon[start:stop], lat[start:stop])
+            point_idx, tile_idx = self.tree.query(points, predicate="intersects")
+
+            first = np.full(len(points), no_match, dtype=np.int64)
+            np.minimum.at(first, point_idx, tile_idx)
+            first[first == no_match] = -1
+            result[start:stop] = first
+
+        return result
+
+    def lookup_many(self, lon, lat, chunk_size: int = 100_000) -> np.ndarray:
+        tiles = self.query_tiles(lon, lat, chunk_size)
+        codes = np.full(len(tiles), None, dtype=object)
+        found = tiles >= 0
+        codes[found] = self.codes[tiles[found]]
+        return codes
+
+
+@cache
+def get_tile_index() -> Equi7TileIndex:
+    return Equi7TileIndex({c: load_grid_arrays(c, "T3") for c in CONTINENTS})
+
+
+def parent_tile(tile: str, tiling: str) -> str:
+    """
+    Name of the tile at a coarser tiling containing `tile`, e.g.
+    parent_tile("E038N093T1", "T6") == "E036N090T6".
+    """
+    size = int(tiling[1:])
+    easting, northing = int(tile[1:4]), int(tile[5:8])
+    return f"E{easting // size * size:03d}N{northing // size * size:03d}{tiling}"
+
+
+class Equi7HierarchicalIndex:
+    """
+    T3 and T1 tiles of all continents behind a single STRtree, answering
+    continent, T6, T3 and T1 tile for a point in one query.
+
+    The continent is the first T3 hit in CONTINENTS priority, exactly as
+    Equi7TileIndex. The T1 tile is the first T1 hit of that continent and
+    T3/T6 are derived from its name, since Equi7 tiles nest exactly in
+    the projected grid. Where the T1 layer has no tile, T3 comes from the
+    T3 hit and T1 is None.
+    """
+
+    def __init__(self, t3_layers, t1_layers):
+        geometries, tiles, continents, levels = [], [], [], []
+        for layers, level in ((t3_layers, 3), (t1_layers, 1)):
+            for continent_id, continent in enumerate(CONTINENTS):
+                layer_geometries, layer_tiles = layers[continent]
+                geometries.append(layer_geometries)
+                tiles.append(layer_tiles)
+                continents.append(np.full(len(layer_geometries), continent_id))
+                levels.append(np.full(len(layer_geometries), level))
+
+        self.geometries = np.concatenate(geometries)
+        self.tiles = np.concatenate(tiles)
+        self.continents = np.concatenate(continents)
+        self.levels = np.concatenate(levels)
+        shapely.prepare(self.geometries)
+        self.tree = STRtree(self.geometries)
+
+        self.t3_of = np.array([parent_tile(t, "T3") for t in self.tiles], dtype=object)
+        self.t6_of = np.array([parent_tile(t, "T6") for t in self.tiles], dtype=object)
+
+    def lookup_many(self, lon, lat, chunk_size: int = 100_000) -> dict[str, np.ndarray]:
+        """
+        Columns equi7_continent, equi7_t6, equi7_t3 and equi7_t1 (None
+        where unknown) for arrays of lon/lat.
+        """
+        lon = np.asarray(lon, dtype=float)
+        lat = np.asarray(lat, dtype=float)
+        n = len(lon)
+        no_match = np.iinfo(np.int64).max
+        result = {
+            field: np.full(n, None, dtype=object)
+            for field in ("equi7_continent", "equi7_t6", "equi7_t3", "equi7_t1")
+        }
+
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            points = shapely.points(lon[start:stop], lat[start:stop])
+            point_idx, tile_idx = self.tree.query(points, predicate="intersects")
+
+            is_t3 = self.levels[tile_idx] == 3
+            first_t3 = np.full(stop - start, no_match, dtype=np.int64)
+            np.minimum.at(first_t3, point_idx[is_t3], tile_idx[is_t3])
+            found = first_t3 != no_match
+            if not found.any():
+                continue
+
+            continent = np.full(stop - start, -1, dtype=np.int64)
+            continent[found] = self.continents[first_t3[found]]
+
+            # T1 hits of the same continent as the T3 hit
+            same = ~is_t3 & (self.continents[tile_idx] == continent[point_idx])
+            first_t1 = np.full(stop - start, no_match, dtype=np.int64)
+            np.minimum.at(first_t1, point_idx[same], tile_idx[same])
+            has_t1 = first_t1 != no_match
+
+            finest = np.where(has_t1, first_t1, first_t3)[found]
+            rows = np.arange(start, stop)[found]
+            prefixes = np.array(CONTINENTS, dtype=object)[continent[found]]
+
+            result["equi7_continent"][rows] = prefixes
+            result["equi7_t6"][rows] = prefixes + "_" + self.t6_of[finest]
+            result["equi7_t3"][rows] = prefixes + "_" + self.t3_of[finest]
+            t1_rows = np.arange(start, stop)[has_t1]
+            result["equi7_t1"][t1_rows] = (
+                np.array(CONTINENTS, dtype=object)[continent[has_t1]]
+                + "_"
+                + self.tiles[first_t1[has_t1]]
+            )
+
+        return result
+
+
+@cache
+def get_hierarchical_index() -> Equi7HierarchicalIndex:
+    return Equi7HierarchicalIndex(
+        {c: load_grid_arrays(c, "T3") for c in CONTINENTS},
+        {c: load_grid_arrays(c, "T1") for c in CONTINENTS},
     )
 
-    for grid_gdf in [AF020M, AS020M, EU020M, NA020M, OC020M, SA020M]:
-        match = gpd.sjoin(
-            point_gdf,
-            grid_gdf,
-            how="left",
-            predicate="intersects"
-        )
-
-        row = match.iloc[0]
-        if pd.notna(row["SHORTNAME"]):
-            code = row["SHORTNAME"]
-            code = code.split("_")[1] +"020M"
-            return code
+
+def get_equ7_code_lonlat(lon: float, lat: float) -> str:
+    return get_tile_index().lookup(lon, lat)
+
+
+def assign_equi7_tiles(lon, lat, chunk_size: int = 100_000) -> dict[str, np.ndarray]:
+    """
+    Continent and T6/T3/T1 tile names (e.g. "AF_E036N090T6") for arrays
+    of lon/lat, from a single hierarchical query.
+    """
+    return get_hierarchical_index().lookup_many(lon, lat, chunk_size)
+
+
+def equi7_codes_of(continents) -> np.ndarray:
+    """
+    Equi7 codes (e.g. "AF020M") of equi7_continent values, so callers
+    that ran assign_equi7_tiles need no second lookup.
+    """
+    continents = np.asarray(continents, dtype=object)
+    codes = np.full(len(continents), None, dtype=object)
+    found = pd.notna(continents)
+    codes[found] = continents[found] + "020M"
+    return codes
+
+
+def assign_equi7_codes(lon, lat, chunk_size: int = 100_000) -> np.ndarray:
+    """
+    Equi7 codes for arrays of lon/lat in one vectorized spatial query.
+    Missing coordinates, or points outside every tile, get None.
+    """
+    return get_tile_index().lookup_many(lon, lat, chunk_size)
+
+
+COORDINATES_PATTERN = r"\[\s*([-+\d.eE]+)\s*,\s*([-+\d.eE]+)\s*\]"
+
+
+def geometry_lonlat(geometry: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Extract point coordinates from a flood-DB geometry column, holding
+    either GeoJSON dicts or their str() representation.
+    """
+    coords = geometry.astype(str).str.extract(COORDINATES_PATTERN)
+    return _parse_floats(coords[0]), _parse_floats(coords[1])
+
+
+def _parse_floats(values: pd.Series) -> np.ndarray:
+    # astype(float) rounds exactly like float(); to_numeric's fast parser
+    # can be off in the last digit
+    try:
+        return values.astype(float).to_numpy()
+    except ValueError:
+        return pd.to_numeric(values, errors="coerce").to_numpy()
+
+
+def db_lonlat(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Point coordinates of a flood-DB DataFrame: its lon/lat columns, or
+    the parsed geometry column of a DB written before they existed.
+    """
+    if "lon" in df and "lat" in df:
+        return df["lon"].to_numpy(dtype=float), df["lat"].to_numpy(dtype=float)
+    return geometry_lonlat(df["geometry"])
+
+
+def assign_equi7_codes_df(df: pd.DataFrame, chunk_size: int = 100_000) -> pd.Series:
+    """
+    Equi7 codes for every row of a flood-DB DataFrame.
+    """
+    lon, lat = db_lonlat(df)
+    return pd.Series(assign_equi7_codes(lon, lat, chunk_size), index=df.index)
+
+
+def assign_equi7_tiles_df(df: pd.DataFrame, chunk_size: int = 100_000) -> pd.DataFrame:
+    """
+    Continent and T6/T3/T1 tile columns for every row of a flood-DB
+    DataFrame.
+    """
+    lon, lat = db_lonlat(df)
+    return pd.DataFrame(assign_equi7_tiles(lon, lat, chunk_size), index=df.index)
         
 
 def process_row(row):
-    geo = row["geometry"]
-
-    if isinstance(geo, str):
-        geo = ast.literal_eval(geo)
+    if "lon" in row:
+        lon, lat = row["lon"], row["lat"]
+    else:
+        geo = row["geometry"]
+        if isinstance(geo, str):
+            geo = ast.literal_eval(geo)
+        lon, lat = geo["coordinates"]
 
-    lon, lat = geo["coordinates"]
     equi7_code = get_equ7_code_lonlat(lon, lat)
     row["equi7_code"] = equi7_code
     return row
 if __name__ == "__main__":
     # Example usage
     df = load_flood_db_corrected()
-    df = df.apply(process_row, axis=1)
+    df["equi7_code"] = assign_equi7_codes_df(df)
     # df.to_csv(FLOOD_DB_CORRECTED_PATH, index=False)
\ No newline at end of file
@@ -0,0 +1,177 @@
+from pathlib import Path
+from functools import cache
+import json
+import logging
+import os
+import numpy as np
+import shapely
+from gdacs_flood_db.utils.equi7_grid_code import (
+    CONTINENTS,
+    EQUI7_CACHE_DIR,
+    grid_layer_path,
+    load_grid_arrays,
+    source_fingerprint,
+    get_tile_index,
+)
+
+# -----------------------------------------------------------------------------
+# Configuration
+# -----------------------------------------------------------------------------
+# A global lat/lon raster where each cell holds the continent whose T3 tiles
+# fully cover it, NO_TILE, or AMBIGUOUS when a tile border crosses the cell.
+# Points in unambiguous cells are resolved with a single array lookup; the
+# rest fall back to the exact STRtree query.
+
+logger = logging.getLogger(__name__)
+
+RESOLUTION = 0.05  # degrees
+NO_TILE = 0
+AMBIGUOUS = 255
+
+# Raster value -> Equi7 code
+CODE_TABLE = np.array(
+    [None] + [c + "020M" for c in CONTINENTS] + [None] * (255 - len(CONTINENTS)),
+    dtype=object,
+)
+
+# -----------------------------------------------------------------------------
+# Build
+# -----------------------------------------------------------------------------
+
+
+def raster_shape(resolution: float) -> tuple[int, int]:
+    return round(180 / resolution), round(360 / resolution)
+
+
+def cell_index(lon, lat, resolution: float) -> tuple[np.ndarray, np.ndarray]:
+    n_rows, n_cols = raster_shape(resolution)
+    rows = np.floor((90.0 - lat) / resolution).astype(np.int64)
+    cols = np.floor((lon + 180.0) / resolution).astype(np.int64)
+    return np.clip(rows, 0, n_rows - 1), np.clip(cols, 0, n_cols - 1)
+
+
+def mark_boundary(grid: np.ndarray, boundary, resolution: float):
+    """
+    Mark every cell a boundary passes through as AMBIGUOUS.
+
+    The boundary is densified to vertices at most half a cell apart, and
+    the cells holding a vertex are dilated by one cell, so no crossed
+    cell is missed.
+    """
+    coords = shapely.get_coordinates(shapely.segmentize(boundary, resolution / 2))
+    rows, cols = cell_index(coords[:, 0], coords[:, 1], resolution)
+
+    n_rows, n_cols = grid.shape
+    for d_row in (-1, 0, 1):
+        for d_col in (-1, 0, 1):
+            grid[
+                np.clip(rows + d_row, 0, n_rows - 1),
+                np.clip(cols + d_col, 0, n_cols - 1),
+            ] = AMBIGUOUS
+
+
+def build_lookup_grid(resolution: float = RESOLUTION) -> np.ndarray:
+    n_rows, n_cols = raster_shape(resolution)
+    grid = np.full((n_rows, n_cols), NO_TILE, dtype=np.uint8)
+    lats = 90.0 - (np.arange(n_rows) + 0.5) * resolution
+    lons = -180.0 + (np.arange(n_cols) + 0.5) * resolution
+
+    boundaries = []
+    for value, continent in enumerate(CONTINENTS, start=1):
+        geometries, _ = load_grid_arrays(continent, "T3")
+        coverage = shapely.union_all(geometries)
+        shapely.prepare(coverage)
+        boundaries.append(coverage.boundary)
+
+        # Only test cell centers inside the continent's bounding box
+        west, south, east, north = coverage.bounds
+        row_sel = np.flatnonzero((lats >= south - resolution) & (lats <= north + resolution))
+        col_sel = np.flatnonzero((lons >= west - resolution) & (lons <= east + resolution))
+
+        for row in row_sel:
+            unassigned = grid[row, col_sel] == NO_TILE
+            cols = col_sel[unassigned]
+            inside = shapely.contains_xy(coverage, lons[cols], lats[row])
+            grid[row, cols[inside]] = value
+
+        logger.info("Rasterized Equi7 %s tiles", continent)
+
+    for boundary in boundaries:
+        mark_boundary(grid, boundary, resolution)
+
+    return grid
+
+
+# -----------------------------------------------------------------------------
+# Cache
+# -----------------------------------------------------------------------------
+
+
+def grid_sources() -> list[str]:
+    return [source_fingerprint(grid_layer_path(c, "T3")) for c in CONTINENTS]
+
+
+def lookup_grid_path(resolution: float, cache_dir: Path | None = None) -> Path:
+    cache_dir = EQUI7_CACHE_DIR if cache_dir is None else cache_dir
+    return cache_dir / f"equi7_lookup_{resolution:g}.npy"
+
+
+@cache
+def load_lookup_grid(resolution: float = RESOLUTION, cache_dir: Path | None = None) -> np.ndarray:
+    """
+    The lookup raster at `resolution`, memory-mapped from the on-disk
+    cache and (re)built when missing or when the tile layers changed.
+    """
+    path = lookup_grid_path(resolution, cache_dir)
+    meta_path = path.with_suffix(".json")
+    sources = grid_sources()
+
+    if path.exists() and meta_path.exists():
+        with open(meta_path, encoding="utf-8") as f:
+            if json.load(f).get("sources") == sources:
+                return np.load(path, mmap_mode="r")
+
+    logger.info("Building Equi7 lookup grid at %g degrees", resolution)
+    grid = build_lookup_grid(resolution)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+    np.save(tmp_path, grid)
+    os.replace(tmp_path, path)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({"resolution": resolution, "sources": sources}, f)
+
+    return np.load(path, mmap_mode="r")
+
+
+# -----------------------------------------------------------------------------
+# Lookup
+# -----------------------------------------------------------------------------
+
+
+def assign_equi7_codes_raster(
+    lon,
+    lat,
+    resolution: float = RESOLUTION,
+    cache_dir: Path | None = None,
+) -> np.ndarray:
+    """
+    Same result as equi7_grid_code.assign_equi7_codes, answered from the
+    lookup raster; only points in border cells use the exact geometry.
+    """
+    lon = np.asarray(lon, dtype=float)
+    lat = np.asarray(lat, dtype=float)
+    grid = load_lookup_grid(resolution, cache_dir)
+
+    valid = ~(np.isnan(lon) | np.isnan(lat))
+    values = np.full(len(lon), NO_TILE, dtype=np.uint8)
+    rows, cols = cell_index(lon[valid], lat[valid], resolution)
+    values[valid] = grid[rows, cols]
+
+    codes = CODE_TABLE[values]
+
+    ambiguous = np.flatnonzero(values == AMBIGUOUS)
+    if len(ambiguous):
+        codes[ambiguous] = get_tile_index().lookup_many(lon[ambiguous], lat[ambiguous])
+
+    return codes
@@ -1,7 +1,21 @@
 from datetime import datetime
 from urllib.parse import urlparse, parse_qs
 from pathlib import Path
+from typing import Callable, NamedTuple
+import hashlib
+import logging
+import os
+import numpy as np
 import pandas as pd
+from gdacs_flood_db.storage import read_db
+from gdacs_flood_db.fingerprint import (
+    FINGERPRINT_COLUMN,
+    fingerprint_path,
+    row_fingerprints,
+)
+from gdacs_flood_db.schema import FLOOD_FIELDS
+
+logger = logging.getLogger(__name__)
 
 ISO_FORMAT = "%Y-%m-%dT%H:%M:%S"
 
@@ -52,9 +66,105 @@ def is_valid_geometry_url(url: str) -> bool:
     return True
 
 
+# -----------------------------------------------------------------------------
+# Columnar rules
+# -----------------------------------------------------------------------------
+# Each rule checks whole columns and returns a boolean array, True where
+# the event breaks the rule. validate_frame packs the results into one
+# bitmask per row: bit i is set when RULES[i] fails. New checks are added
+# with register_rule and must stay columnar.
+
+# URLs in GDACS' own parameter order, which is_valid_geometry_url
+# accepts, matched in one pass by the columnar (RE2) string engine. Any
+# other URL (reordered or repeated parameters, percent-encoding, ...) is
+# checked with is_valid_geometry_url itself, so both always agree.
+GEOMETRY_URL_PATTERN = (
+    r"^(?i:https?)://[^/?#]*gdacs\.org[^/?#]*(?:/[^?#]*)?/getgeometry\?"
+    r"eventtype=FL&eventid=[^&#\s]+&episodeid=[^&#\s]"
+)
+
+
+class Rule(NamedTuple):
+    rule_id: str
+    check: Callable[[pd.DataFrame], np.ndarray]  # True where invalid
+
+
+def _column(df: pd.DataFrame, field: str) -> pd.Series:
+    return df[field] if field in df else pd.Series(None, index=df.index, dtype=object)
+
+
+def invalid_equi7_grid_code(df: pd.DataFrame) -> np.ndarray:
+    codes = _column(df, "equi7_grid_code")
+    return (codes.isna() | (codes.astype(object) == "")).to_numpy()
+
+
+def invalid_datetimes(values: pd.Series) -> np.ndarray:
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.isna().to_numpy()
+    # Non-string values never format as ISO_FORMAT, so they stay invalid
+    # as in is_valid_iso_datetime
+    text = values.astype("str")
+    return pd.to_datetime(text, format=ISO_FORMAT, errors="coerce").isna().to_numpy()
+
+
+def invalid_geometry_url(df: pd.DataFrame) -> np.ndarray:
+    urls = _column(df, "geometry_url")
+    invalid = ~urls.astype("str").str.contains(GEOMETRY_URL_PATTERN).fillna(False).to_numpy(dtype=bool)
+    others = np.flatnonzero(invalid & urls.notna().to_numpy())
+    valid = [is_valid_geometry_url(url) for url in urls.iloc[others]]
+    invalid[others[np.asarray(valid, dtype=bool)]] = False
+    return invalid
+
+
+RULES: list[Rule] = [
+    Rule(RULE_INVLAID_EQUI7_GRID_CODE, invalid_equi7_grid_code),
+    Rule(RULE_INVALID_FROMDATE, lambda df: invalid_datetimes(_column(df, "fromdate"))),
+    Rule(RULE_INVALID_TODATE, lambda df: invalid_datetimes(_column(df, "todate"))),
+    Rule(RULE_INVALID_GEOMETRY_URL, invalid_geometry_url),
+]
+
+
+def register_rule(rule_id: str, check: Callable[[pd.DataFrame], np.ndarray]) -> int:
+    """
+    Add a columnar rule; returns its bit.
+    """
+    if any(rule.rule_id == rule_id for rule in RULES):
+        raise ValueError(f"Rule {rule_id} already registered")
+    if len(RULES) == 64:
+        raise ValueError("At most 64 validation rules")
+    RULES.append(Rule(rule_id, check))
+    return len(RULES) - 1
+
+
+def validate_frame(df: pd.DataFrame, rules: list[Rule] = RULES) -> np.ndarray:
+    """
+    Per-row bitmask of the failed rules, in the smallest unsigned dtype
+    holding one bit per rule. Zero means the row is valid.
+    """
+    dtype = np.min_scalar_type((1 << len(rules)) - 1)
+    mask = np.zeros(len(df), dtype=dtype)
+    for bit, rule in enumerate(rules):
+        mask |= np.asarray(rule.check(df), dtype=bool).astype(dtype) << dtype.type(bit)
+    return mask
+
+
+def mask_reasons(mask: np.ndarray, rules: list[Rule] = RULES) -> list[list[str]]:
+    """
+    Bitmasks back to the lists of rule IDs validate_row returns.
+    """
+    reasons = {}
+    result = []
+    for value in mask.tolist():
+        if value not in reasons:
+            reasons[value] = [rule.rule_id for bit, rule in enumerate(rules) if value >> bit & 1]
+        result.append(reasons[value])
+    return result
+
+
 def validate_row(row) -> list[str]:
     """
-    Validate a single GDACS flood event row.
+    Validate a single GDACS flood event row. Reference implementation of
+    the built-in rules; validate_db uses validate_frame.
 
     Returns:
         List of rule IDs explaining why the row needs manual review.
@@ -63,7 +173,8 @@ def validate_row(row) -> list[str]:
     reasons = []
 
     # Spatial / semantic checks
-    if not row.get("equi7_grid_code"):
+    code = row.get("equi7_grid_code")
+    if pd.isna(code) or not code:
         reasons.append(RULE_INVLAID_EQUI7_GRID_CODE)
 
     # Temporal checks
@@ -81,21 +192,157 @@ def validate_row(row) -> list[str]:
 
 
 def derived_db_path(base: Path, suffix: str) -> Path:
-    return base.with_name(f"{base.stem}_{suffix}{base.suffix}")
+    # Review files are for people: always CSV, whatever the DB format
+    return base.with_name(f"{base.stem}_{suffix}.csv")
+
+
+# -----------------------------------------------------------------------------
+# Validation cache
+# -----------------------------------------------------------------------------
+# A row's mask depends on its content only, so masks are cached next to
+# the DB per GDACS_ID with the row fingerprint (see fingerprint.py) they
+# were computed for, and a run only validates events whose fingerprint
+# changed. Fingerprints cover FLOOD_FIELDS only, so cached rules must not
+# read other columns. The cache is a binary .npz of the current events,
+# rewritten when it changes; the daily job passes the DB and fingerprint
+# index it already holds, so a run neither re-reads nor re-hashes the DB.
+# The file name carries the rule set's version; changing what a rule
+# checks needs a new rule ID.
+
+
+def rules_version(rules: list[Rule] = RULES) -> str:
+    return hashlib.sha1("|".join(rule.rule_id for rule in rules).encode()).hexdigest()[:8]
+
 
+def validation_cache_path(db_path: Path, rules: list[Rule] = RULES) -> Path:
+    return db_path.with_name(f"{db_path.stem}.validation.{rules_version(rules)}.npz")
 
-def validate_db(db_path: Path, logger) -> pd.DataFrame:
+
+def load_validation_cache(path: Path) -> tuple[pd.Index, np.ndarray, np.ndarray]:
+    """
+    GDACS_IDs with their fingerprints and masks; empty if there is no
+    cache yet.
+    """
+    if not path.exists():
+        return pd.Index([], dtype=object), np.array([], dtype=str), np.array([], dtype=np.uint64)
+    with np.load(path) as cache:
+        return pd.Index(cache["ids"]), cache["fingerprints"], cache["masks"]
+
+
+def save_validation_cache(path: Path, ids: np.ndarray, fingerprints: np.ndarray, masks: np.ndarray):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(
+            f,
+            ids=np.asarray(ids, dtype=str),
+            fingerprints=np.asarray(fingerprints, dtype=str),
+            masks=np.asarray(masks, dtype=np.uint64),
+        )
+    os.replace(tmp_path, path)
+
+
+def db_fingerprints(
+    df: pd.DataFrame,
+    db_path: Path,
+    fingerprints: pd.DataFrame | None = None,
+    fields: list[str] = FLOOD_FIELDS,
+) -> np.ndarray:
+    """
+    Fingerprint of each row of df. Taken from a fingerprint index (the
+    given one, or the one stored alongside the DB if not older than it);
+    rows it does not cover are hashed over the same fields as the index.
+    """
+    if fingerprints is None:
+        index_path = fingerprint_path(db_path)
+        if index_path.exists() and index_path.stat().st_mtime >= db_path.stat().st_mtime:
+            fingerprints = pd.read_csv(
+                index_path, usecols=["GDACS_ID", FINGERPRINT_COLUMN], dtype=str, keep_default_na=False
+            )
+    ids = df["GDACS_ID"].to_numpy(dtype=object)
+    result = np.full(len(df), None, dtype=object)
+    if fingerprints is not None:
+        index_ids = fingerprints["GDACS_ID"].to_numpy(dtype=object)
+        if len(index_ids) == len(ids) and (index_ids == ids).all():
+            # The index was built from this frame
+            result[:] = fingerprints[FINGERPRINT_COLUMN].to_numpy(dtype=object)
+        else:
+            known = fingerprints.drop_duplicates("GDACS_ID", keep="last")
+            pos = pd.Index(known["GDACS_ID"]).get_indexer(ids)
+            result[pos >= 0] = known[FINGERPRINT_COLUMN].to_numpy(dtype=object)[pos[pos >= 0]]
+    unknown = pd.isna(result)
+    if unknown.any():
+        present = [field for field in fields if field in df.columns]
+        result[unknown] = row_fingerprints(df[unknown], present).to_numpy()
+    return result
+
+
+def validate_cached(
+    df: pd.DataFrame,
+    fingerprints: np.ndarray,
+    cache_path: Path,
+    rules: list[Rule] = RULES,
+) -> np.ndarray:
+    """
+    validate_frame, reusing the cached masks of events whose fingerprint
+    is unchanged, and caching the masks of the current events.
+    """
+    cached_ids, cached_fingerprints, cached_masks = load_validation_cache(cache_path)
+    ids = df["GDACS_ID"].to_numpy(dtype=object)
+    fingerprints = np.asarray(fingerprints, dtype=str)
+
+    if len(cached_ids) == len(ids) and (cached_ids.to_numpy(dtype=object) == ids).all():
+        pos = np.arange(len(ids))  # same events in the same order
+    else:
+        pos = cached_ids.get_indexer(ids)
+    hit = pos >= 0
+    hit[hit] = cached_fingerprints[pos[hit]] == fingerprints[hit]
+
+    mask = np.zeros(len(df), dtype=np.uint64)
+    mask[hit] = cached_masks[pos[hit]]
+    stale = ~hit
+    if stale.any():
+        mask[stale] = validate_frame(df[stale], rules)
+    logger.info("Validated %d new or changed of %d events", stale.sum(), len(df))
+
+    current = ~df["GDACS_ID"].duplicated(keep="last").to_numpy()
+    if stale.any() or current.sum() != len(cached_ids):
+        save_validation_cache(cache_path, ids[current], fingerprints[current], mask[current])
+
+    return mask.astype(np.min_scalar_type((1 << len(rules)) - 1))
+
+
+def validate_db(
+    db_path: Path,
+    logger,
+    fingerprints: pd.DataFrame | None = None,
+    cache: bool = True,
+    df: pd.DataFrame | None = None,
+) -> pd.DataFrame:
     """
     Validate the GDACS flood event database.
 
+    With cache, only events whose fingerprint changed since the last run
+    are validated; fingerprints is an optional fingerprint index of the
+    DB (build_fingerprint_index) to avoid hashing it again. df is the DB
+    if the caller already holds it.
     """
     # Load database
-    df = pd.read_csv(db_path)
+    if df is None:
+        df = read_db(db_path)
     logger.info(f"Total events: {len(df)}")
 
     # Detect events needing review
-    df["validation_errors"] = df.apply(validate_row, axis=1)
-    review_df = df[df["validation_errors"].str.len() > 0].copy()
+    if cache:
+        cache_path = validation_cache_path(db_path)
+        # Caches of other rule sets are stale
+        for path in db_path.parent.glob(f"{db_path.stem}.validation.*"):
+            if path != cache_path:
+                path.unlink()
+        mask = validate_cached(df, db_fingerprints(df, db_path, fingerprints), cache_path)
+    else:
+        mask = validate_frame(df)
+    review_df = df[mask != 0].copy()
+    review_df["validation_errors"] = mask_reasons(mask[mask != 0])
 
     if review_df is None or len(review_df) == 0:
         logger.info("No events need review.")
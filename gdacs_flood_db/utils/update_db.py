@@ -2,6 +2,7 @@
 from pathlib import Path
 import pandas as pd
 import logging
+from gdacs_flood_db.storage import read_db, write_db
 
 # -----------------------------------------------------------------------------
 # Configuration
@@ -25,7 +26,7 @@ OVERRIDE_COLUMNS = {
 # -----------------------------------------------------------------------------
 
 def load_data():
-    raw = pd.read_csv(RAW_DB_PATH)
+    raw = read_db(RAW_DB_PATH)
     overrides = pd.read_csv(OVERRIDES_PATH)
     return raw, overrides
 
@@ -68,6 +69,17 @@ def apply_overrides(raw: pd.DataFrame, overrides: pd.DataFrame) -> pd.DataFrame:
     return merged
 
 
+def apply_overrides_to_store(store, overrides: pd.DataFrame) -> int:
+    """
+    Apply overrides to a FloodStore in place, upserting only the
+    overridden events. Returns the number of events updated.
+    """
+    raw = store.get(overrides["GDACS_ID"])
+    if raw.empty:
+        return 0
+    return store.upsert(apply_overrides(raw, overrides))
+
+
 # -----------------------------------------------------------------------------
 # Main
 # -----------------------------------------------------------------------------
@@ -78,7 +90,7 @@ def main():
 
     corrected_db = apply_overrides(raw_db, overrides)
 
-    corrected_db.to_csv(OUTPUT_PATH, index=False)
+    write_db(corrected_db, OUTPUT_PATH)
 
     logger.info(f"Corrected database written to: {OUTPUT_PATH}")
     logger.info(f"Total events: {len(corrected_db)}")
@@ -0,0 +1,163 @@
+import json
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# The GDACS event list silently truncates at this many features
+GDACS_EVENT_CAP = 100
+MIN_WINDOW = timedelta(hours=1)
+
+SEASONS = {
+    12: "DJF", 1: "DJF", 2: "DJF",
+    3: "MAM", 4: "MAM", 5: "MAM",
+    6: "JJA", 7: "JJA", 8: "JJA",
+    9: "SON", 10: "SON", 11: "SON",
+}
+
+
+def as_datetime(value: date) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime(value.year, value.month, value.day)
+
+
+def window_span(start: date, end: date) -> timedelta:
+    return as_datetime(end) - as_datetime(start)
+
+
+def bisect_window(start: date, end: date):
+    """
+    Split a window in two halves, on whole days while the window spans
+    several days and on whole hours below that.
+
+    Returns None once the window cannot be split any further.
+    """
+    span = window_span(start, end)
+    if span <= MIN_WINDOW:
+        return None
+
+    if span >= timedelta(days=2) and not isinstance(start, datetime):
+        mid = start + timedelta(days=span.days // 2)
+        return [(start, mid), (mid, end)]
+
+    start, end = as_datetime(start), as_datetime(end)
+    hours = span // timedelta(hours=1)
+    mid = start + timedelta(hours=hours // 2)
+    return [(start, mid), (mid, end)]
+
+
+def chunk_window(start: date, end: date, span: timedelta):
+    """
+    Yield consecutive sub-windows of at most `span` covering [start, end].
+    """
+    if span >= window_span(start, end):
+        yield start, end
+        return
+
+    if span % timedelta(days=1) != timedelta(0) or isinstance(start, datetime):
+        start, end = as_datetime(start), as_datetime(end)
+
+    current = start
+    while current < end:
+        nxt = min(current + span, end)
+        yield current, nxt
+        current = nxt
+
+
+class WindowProfile:
+    """
+    Learned window sizes per year and season, persisted as JSON.
+
+    Maps keys such as "2024-JJA" to the smallest window (in hours) a
+    saturated window had to be split into to stay below GDACS_EVENT_CAP,
+    so later runs can start with a size that fits the season's busiest
+    stretch instead of re-discovering it.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self.spans: dict[str, int] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+        if path is not None and path.exists():
+            with open(path, encoding="utf-8") as f:
+                self.spans = {k: int(v) for k, v in json.load(f).items()}
+
+    @staticmethod
+    def key(when: date) -> str:
+        return f"{when.year}-{SEASONS[when.month]}"
+
+    def span_for(self, when: date) -> timedelta | None:
+        hours = self.spans.get(self.key(when))
+        return timedelta(hours=hours) if hours else None
+
+    def record(self, start: date, end: date):
+        hours = max(1, window_span(start, end) // timedelta(hours=1))
+        key = self.key(start)
+
+        with self._lock:
+            if key not in self.spans or hours < self.spans[key]:
+                self.spans[key] = hours
+                self._dirty = True
+
+    def plan(self, windows):
+        """
+        Refine base windows (e.g. month_windows) with the learned sizes.
+        """
+        for start, end in windows:
+            span = self.span_for(start)
+            if span is None:
+                yield start, end
+            else:
+                yield from chunk_window(start, end, span)
+
+    def save(self):
+        if self.path is None or not self._dirty:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(dict(sorted(self.spans.items())), f, indent=2)
+        self._dirty = False
+
+
+def fetch_adaptive(
+    fetch,
+    start: date,
+    end: date,
+    profile: WindowProfile | None = None,
+    cap: int = GDACS_EVENT_CAP,
+    _depth: int = 0,
+) -> list:
+    """
+    Fetch a window with fetch(start, end), bisecting it recursively while
+    it returns `cap` or more events. Sub-window events are concatenated
+    in chronological order.
+    """
+    events = fetch(start, end)
+
+    if len(events) < cap:
+        if _depth and profile is not None:
+            profile.record(start, end)
+        return events
+
+    halves = bisect_window(start, end)
+    if halves is None:
+        logger.warning(
+            "Window %s to %s still returned %d events at the minimum window size",
+            start,
+            end,
+            len(events),
+        )
+        return events
+
+    logger.info("Window %s to %s saturated, splitting", start, end)
+
+    merged = []
+    for sub_start, sub_end in halves:
+        merged.extend(fetch_adaptive(fetch, sub_start, sub_end, profile, cap, _depth + 1))
+    return merged
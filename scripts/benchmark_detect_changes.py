@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from gdacs_flood_db.tests.test_detect_db_change import reference_updated_events
+from gdacs_flood_db.utils.detect_db_change import diff_events
+
+SIZES = [4_000, 100_000, 1_000_000]
+LOOP_MAX_ROWS = 100_000  # the per-ID loop takes minutes beyond this
+CHANGE_RATE = 0.01  # share of shared events with a changed tracked field
+CHURN = 0.005  # share of events added / removed between versions
+
+
+def synthetic_versions(n: int, rng) -> tuple[pd.DataFrame, pd.DataFrame]:
+    dates = pd.date_range("2000-01-01", periods=n, freq="h").strftime("%Y-%m-%d %H:%M:%S")
+    old = pd.DataFrame(
+        {
+            "GDACS_ID": "FL-" + pd.RangeIndex(n).astype(str),
+            "fromdate": dates,
+            "todate": dates,
+            "geometry_url": "https://www.gdacs.org/geometry?episodeid=1&eventid="
+            + pd.RangeIndex(n).astype(str),
+            "country": rng.choice(["Kenya", "India", "Brazil"], n),
+        }
+    )
+
+    churn = int(n * CHURN)
+    added = old.iloc[:churn].assign(GDACS_ID=lambda d: d["GDACS_ID"] + "-new")
+    new = pd.concat([old.iloc[churn:], added])
+    changed = rng.choice(len(new), int(n * CHANGE_RATE), replace=False)
+    new.iloc[changed, new.columns.get_loc("todate")] = "2026-01-01 00:00:00"
+    return new.reset_index(drop=True), old
+
+
+def main():
+    rng = np.random.default_rng(0)
+    for n in SIZES:
+        new, old = synthetic_versions(n, rng)
+
+        t0 = time.perf_counter()
+        diff = diff_events(new, old)
+        columnar = time.perf_counter() - t0
+        line = (
+            f"{n:>9} rows: diff_events {columnar:7.3f}s "
+            f"({len(diff.updated)} updated, {len(diff.added)} added, {len(diff.removed)} removed)"
+        )
+
+        if n <= LOOP_MAX_ROWS:
+            t0 = time.perf_counter()
+            reference_updated_events(new, old)
+            loop = time.perf_counter() - t0
+            line += f", per-ID loop {loop:7.2f}s ({loop / columnar:.0f}x)"
+
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from gdacs_flood_db.storage import read_db
+from gdacs_flood_db.tests.test_equi7_grid_code import sjoin_code
+from gdacs_flood_db.utils import equi7_grid_code as equi7
+from gdacs_flood_db.utils.equi7_lookup_grid import (
+    load_lookup_grid,
+    assign_equi7_codes_raster,
+)
+
+DB_PATH = Path(__file__).parent.parent / "data" / "gdacs_flood_db.csv"
+SJOIN_SAMPLE = 200  # the per-point sjoin path is too slow to run on every row
+SYNTHETIC_POINTS = 2_000_000
+
+
+def per_event_us(seconds: float, n: int) -> str:
+    return f"{seconds / n * 1e6:10.1f} us/event"
+
+
+def main():
+    df = read_db(DB_PATH)
+    n = len(df)
+    equi7.get_tile_index()  # build the index outside the timings
+
+    t0 = time.perf_counter()
+    sample = df.head(SJOIN_SAMPLE)
+    for lon, lat in zip(sample["lon"], sample["lat"]):
+        sjoin_code(lon, lat)
+    sjoin = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    df.apply(equi7.process_row, axis=1)
+    per_row = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    equi7.assign_equi7_codes_df(df)
+    batch = time.perf_counter() - t0
+
+    print(f"{n} events in {DB_PATH.name}")
+    print(f"per-point sjoin (sample of {SJOIN_SAMPLE}) {per_event_us(sjoin, SJOIN_SAMPLE)}")
+    print(f"process_row + STRtree lookup        {per_event_us(per_row, n)}")
+    print(f"assign_equi7_codes_df (batch)       {per_event_us(batch, n)}")
+
+    # Lookup raster vs exact geometry on uniformly distributed points
+    t0 = time.perf_counter()
+    load_lookup_grid()
+    print(f"\nlookup raster load/build: {time.perf_counter() - t0:.2f}s")
+
+    rng = np.random.default_rng(0)
+    lon = rng.uniform(-180, 180, SYNTHETIC_POINTS)
+    lat = rng.uniform(-90, 90, SYNTHETIC_POINTS)
+
+    t0 = time.perf_counter()
+    exact = equi7.assign_equi7_codes(lon, lat)
+    exact_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    raster = assign_equi7_codes_raster(lon, lat)
+    raster_time = time.perf_counter() - t0
+
+    mismatches = int((exact != raster).sum())
+    print(f"{SYNTHETIC_POINTS} synthetic points")
+    print(f"assign_equi7_codes (STRtree)        {per_event_us(exact_time, SYNTHETIC_POINTS)}")
+    print(f"assign_equi7_codes_raster           {per_event_us(raster_time, SYNTHETIC_POINTS)}")
+    print(f"mismatches vs exact geometry: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
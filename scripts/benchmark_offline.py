@@ -0,0 +1,91 @@
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from gdacs_flood_db.pipeline import download_all_floods
+from gdacs_flood_db.replay import FixtureArchive, StandInServer
+from gdacs_flood_db.storage import read_db
+from gdacs_flood_db.utils.download_aois import make_session, download_all_aois
+from scripts.record_gdacs_fixtures import FIXTURE_PATH, START_DATE, END_DATE
+
+# --------------------------------------------------
+# Configuration
+# --------------------------------------------------
+
+LATENCY = 0.25  # seconds per response, roughly what gdacs.org takes
+ERROR_RATE = 0.02
+WORKERS = [1, 4, 8]
+AOI_RATE_LIMIT = None  # the stand-in needs no politeness limit
+
+# --------------------------------------------------
+# Benchmarks
+# --------------------------------------------------
+
+
+def bench_download(archive: FixtureArchive, workers: int) -> tuple[float, int, int]:
+    with (
+        StandInServer(archive, latency=LATENCY, error_rate=ERROR_RATE) as server,
+        tempfile.TemporaryDirectory() as tmp,
+    ):
+        output = Path(tmp) / "db.csv"
+        t0 = time.perf_counter()
+        download_all_floods(
+            START_DATE,
+            END_DATE,
+            output_csv=output,
+            max_workers=workers,
+            window_profile=None,
+            transport=server.transport,
+        )
+        elapsed = time.perf_counter() - t0
+        return elapsed, len(read_db(output)), server.requests
+
+
+def bench_aois(archive: FixtureArchive, workers: int) -> tuple[float, dict]:
+    urls = [
+        f"https://www.gdacs.org{entry['key']}"
+        for entry in archive.entries.values()
+        if "getgeometry" in entry["key"]
+    ]
+    df = pd.DataFrame(
+        {"GDACS_ID": [f"AOI-{i}" for i in range(len(urls))], "geometry_url": urls}
+    )
+    with (
+        StandInServer(archive, latency=LATENCY, error_rate=ERROR_RATE) as server,
+        tempfile.TemporaryDirectory() as tmp,
+    ):
+        session = make_session(
+            use_cache=False,
+            transport=server.transport,
+            workers=workers,
+            rate_limit=AOI_RATE_LIMIT,
+        )
+        t0 = time.perf_counter()
+        counts = download_all_aois(df, Path(tmp), session, workers)
+        return time.perf_counter() - t0, counts
+
+
+def main():
+    archive = FixtureArchive.load(FIXTURE_PATH)
+    print(f"Fixture: {len(archive.entries)} responses, {len(archive.events())} events")
+    print(f"Latency {LATENCY}s, error rate {ERROR_RATE:.0%}\n")
+
+    for workers in WORKERS:
+        elapsed, rows, requests = bench_download(archive, workers)
+        print(
+            f"download_all_floods workers={workers}: "
+            f"{elapsed:.2f}s, {rows} events, {requests} requests"
+        )
+
+    for workers in WORKERS:
+        elapsed, counts = bench_aois(archive, workers)
+        print(
+            f"AOI download workers={workers}: {elapsed:.2f}s, "
+            f"{counts['downloaded']} downloaded, {counts['failed']} failed"
+        )
+
+
+if __name__ == "__main__":
+    main()
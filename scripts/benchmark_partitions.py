@@ -0,0 +1,74 @@
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+from gdacs_flood_db.partitions import read_partitioned, update_partitions, write_partitioned
+from gdacs_flood_db.storage import read_db, write_db
+
+DB_PATH = Path(__file__).parent.parent / "data" / "latest_gdacs_flood_db.csv"
+SCALE = 100  # the DB replicated to a large synthetic DB
+CONTINENT, YEARS = "AS", range(2020, 2022)
+CHANGED_EVENTS = 20
+
+
+def measured(f, *args, **kwargs) -> tuple[float, float, int]:
+    """
+    Time (s), peak allocation (MB) and number of rows returned.
+    """
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    df = f(*args, **kwargs)
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1e6, len(df)
+
+
+def full_load_and_filter(path: Path) -> pd.DataFrame:
+    df = read_db(path)
+    year = df["fromdate"].str[:4].astype(float)
+    return df[(df["equi7_grid_code"].str[:2] == CONTINENT) & year.isin(YEARS)]
+
+
+def main():
+    base = read_db(DB_PATH)
+    df = pd.concat([base] * SCALE, ignore_index=True)
+    df["GDACS_ID"] = df["GDACS_ID"] + "-" + (df.index // len(base)).astype(str)
+    print(f"{len(df)} events; {CONTINENT} in {YEARS.start}-{YEARS.stop - 1}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for suffix in (".csv", ".parquet"):
+            db_path = Path(tmp) / f"db{suffix}"
+            root = Path(tmp) / f"partitions{suffix}"
+            write_db(df, db_path)
+            partitions = write_partitioned(df, root, suffix)
+            print(f"{suffix[1:]:<8}{partitions} partitions")
+
+            for label, f, args in (
+                ("full load + filter", full_load_and_filter, (db_path,)),
+                ("partitioned read", read_partitioned, (root, CONTINENT, YEARS)),
+            ):
+                elapsed, peak, rows = measured(f, *args)
+                print(f"{suffix[1:]:<8}{label:<20}{elapsed:8.3f}s {peak:8.1f} MB peak {rows:8d} rows")
+
+            new = df.copy()
+            # Daily updates hit the latest events, i.e. current-year partitions
+            changed = new["fromdate"].sort_values().index[-CHANGED_EVENTS:]
+            new.loc[changed, "todate"] = "2030-01-01T00:00:00"
+            t0 = time.perf_counter()
+            write_db(new, db_path)
+            rewrite = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            n = update_partitions(new, new.loc[changed, "GDACS_ID"], root, suffix)
+            update = time.perf_counter() - t0
+            print(
+                f"{suffix[1:]:<8}{CHANGED_EVENTS} changed events: full rewrite {rewrite:.3f}s, "
+                f"{n} partitions rewritten {update:.3f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
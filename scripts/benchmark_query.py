@@ -0,0 +1,104 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from gdacs_flood_db.query import FloodIndex
+
+SIZES = [10_000, 100_000, 1_000_000]
+REPEATS = 200
+ISO3 = [f"C{i:02d}" for i in range(150)]
+QUERIES = {
+    "active on a day": {"since": "2021-07-14", "until": "2021-07-14"},
+    "overlapping a month": {"since": "2021-07-01", "until": "2021-07-31"},
+    "bbox 5x5 deg": {"bbox": (85.0, 20.0, 90.0, 25.0)},
+    "iso3": {"iso3": "C42"},
+    "iso3 + year": {"iso3": "C42", "since": "2021-01-01", "until": "2021-12-31"},
+    "day + bbox 20x20 deg": {
+        "since": "2021-07-14",
+        "until": "2021-07-14",
+        "bbox": (70.0, 10.0, 90.0, 30.0),
+    },
+    "tile + month + bbox": {
+        "tile": "AS020M",
+        "since": "2021-07-01",
+        "until": "2021-07-31",
+        "bbox": (70.0, 10.0, 90.0, 30.0),
+    },
+}
+
+
+def synthetic_db(n: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Flood-DB-like events over 25 years: skewed countries, mostly short
+    durations with a long tail, and a few ongoing events.
+    """
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2000-01-01T00:00:00") + rng.integers(0, 25 * 365 * 86_400, n).astype(
+        "timedelta64[s]"
+    )
+    days = np.minimum(rng.lognormal(2.0, 1.0, n), 720).astype(np.int64)
+    end = start + (days * 86_400).astype("timedelta64[s]")
+    weights = 1 / np.arange(1, len(ISO3) + 1)
+    db = pd.DataFrame(
+        {
+            "GDACS_ID": [f"FL-{i}" for i in range(n)],
+            "equi7_grid_code": rng.choice(["AF020M", "AS020M", "EU020M", "NA020M", "OC020M", "SA020M"], n),
+            "iso3": rng.choice(ISO3, n, p=weights / weights.sum()),
+            "fromdate": start.astype(str),
+            "todate": end.astype(str),
+            "lon": rng.uniform(-180, 180, n),
+            "lat": rng.uniform(-60, 75, n),
+        }
+    )
+    db.loc[rng.random(n) < 0.01, "todate"] = None
+    return db
+
+
+def scan(db: pd.DataFrame, since=None, until=None, bbox=None, iso3=None, tile=None) -> np.ndarray:
+    """
+    The query as a pandas scan, parsing the date strings first.
+    """
+    fromdate = pd.to_datetime(db["fromdate"], format="%Y-%m-%dT%H:%M:%S")
+    todate = pd.to_datetime(db["todate"], format="%Y-%m-%dT%H:%M:%S")
+    mask = np.ones(len(db), dtype=bool)
+    if since is not None:
+        mask &= (todate.isna() | (todate >= pd.Timestamp(since))).to_numpy()
+    if until is not None:
+        mask &= (fromdate < pd.Timestamp(until) + pd.Timedelta(days=1)).to_numpy()
+    if bbox is not None:
+        mask &= (db["lon"].between(bbox[0], bbox[2]) & db["lat"].between(bbox[1], bbox[3])).to_numpy()
+    if iso3 is not None:
+        mask &= (db["iso3"] == iso3).to_numpy()
+    if tile is not None:
+        mask &= (db["equi7_grid_code"] == tile).to_numpy()
+    return np.flatnonzero(mask)
+
+
+def best_of(f, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        f()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    for n in SIZES:
+        db = synthetic_db(n)
+        t0 = time.perf_counter()
+        index = FloodIndex(db)
+        print(f"\n{n} events, index built in {time.perf_counter() - t0:.2f}s")
+        print(f"{'query':<24}{'rows':>8}{'index ms':>10}{'scan ms':>10}")
+
+        for label, filters in QUERIES.items():
+            rows = index.select(**filters)
+            assert np.array_equal(rows, scan(db, **filters)), label
+            indexed = best_of(lambda: index.select(**filters), REPEATS)
+            scanned = best_of(lambda: scan(db, **filters), 1 if n > 100_000 else 3)
+            print(f"{label:<24}{len(rows):8d}{indexed * 1e3:10.3f}{scanned * 1e3:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
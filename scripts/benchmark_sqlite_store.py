@@ -0,0 +1,61 @@
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from gdacs_flood_db.sqlite_store import FloodStore
+from gdacs_flood_db.storage import read_db, write_db
+from gdacs_flood_db.utils.detect_db_change import diff_events
+
+DB_PATH = Path(__file__).parent.parent / "data" / "latest_gdacs_flood_db.csv"
+SCALES = [1, 100]  # the DB as is, and replicated to a large synthetic DB
+CHANGED_EVENTS = 20
+
+
+def timed(f, *args, **kwargs) -> float:
+    t0 = time.perf_counter()
+    f(*args, **kwargs)
+    return time.perf_counter() - t0
+
+
+def daily_update(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The next day's DB: CHANGED_EVENTS events with a new todate.
+    """
+    new = df.copy()
+    changed = new.index[:: len(new) // CHANGED_EVENTS][:CHANGED_EVENTS]
+    new.loc[changed, "todate"] = "2030-01-01T00:00:00"
+    return new
+
+
+def main():
+    base = read_db(DB_PATH)
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in SCALES:
+            df = pd.concat([base] * scale, ignore_index=True)
+            df["GDACS_ID"] = df["GDACS_ID"] + "-" + (df.index // len(base)).astype(str)
+            new = daily_update(df)
+            diff = diff_events(new, df)
+            print(f"\n{len(df)} events, {len(diff.updated)} changed")
+
+            csv_path = Path(tmp) / f"db_{scale}.csv"
+            write_db(df, csv_path)
+            print(f"csv rewrite                {timed(write_db, new, csv_path):8.3f}s")
+
+            store_path = Path(tmp) / f"db_{scale}.sqlite"
+            print(f"sqlite bulk load           {timed(write_db, df, store_path):8.3f}s")
+            with FloodStore(store_path) as store:
+                print(f"sqlite upsert changes      {timed(store.apply_diff, diff, new):8.3f}s")
+
+                print(f"csv load + filter (iso3)   "
+                      f"{timed(lambda: (d := read_db(csv_path))[d['iso3'] == 'BGD']):8.3f}s")
+                print(f"sqlite query (iso3)        {timed(store.query, iso3='BGD'):8.3f}s")
+                print(f"sqlite query (bbox)        "
+                      f"{timed(store.query, bbox=(88.0, 20.0, 93.0, 27.0)):8.3f}s")
+                print(f"sqlite query (year, tile)  "
+                      f"{timed(store.query, since='2020-01-01', until='2020-12-31', tile='AS020M'):8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+from gdacs_flood_db.storage import read_db, to_text, write_db
+
+DB_PATH = Path(__file__).parent.parent / "data" / "latest_gdacs_flood_db.csv"
+SCALES = [1, 100]  # the DB as is, and replicated to a large synthetic DB
+REPEATS = 3
+
+
+def timed_read(path: Path, typed: bool) -> tuple[float, float, float]:
+    """
+    Best-of load time (s), peak allocation and frame size (MB).
+    """
+    best = float("inf")
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        read_db(path, typed=typed)
+        best = min(best, time.perf_counter() - t0)
+
+    tracemalloc.start()
+    df = read_db(path, typed=typed)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak / 1e6, df.memory_usage(deep=True).sum() / 1e6
+
+
+def main():
+    base = read_db(DB_PATH)
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in SCALES:
+            df = pd.concat([base] * scale, ignore_index=True)
+            df["GDACS_ID"] = df["GDACS_ID"] + "-" + (df.index // len(base)).astype(str)
+            print(f"\n{len(df)} events")
+            print(f"{'format':<22}{'file MB':>9}{'load s':>9}{'peak MB':>9}{'frame MB':>10}")
+
+            for suffix in (".csv", ".parquet"):
+                path = Path(tmp) / f"db_{scale}{suffix}"
+                write_db(df, path)
+                size = path.stat().st_size / 1e6
+                for typed in (False, True):
+                    load, peak, frame = timed_read(path, typed)
+                    label = f"{suffix[1:]} ({'typed' if typed else 'text'})"
+                    print(f"{label:<22}{size:9.2f}{load:9.3f}{peak:9.1f}{frame:10.1f}")
+
+
+
+if __name__ == "__main__":
+    main()
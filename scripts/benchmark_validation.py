@@ -0,0 +1,101 @@
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from gdacs_flood_db.fingerprint import build_fingerprint_index, fingerprint_path, save_fingerprint_index
+from gdacs_flood_db.storage import read_db, write_db
+from gdacs_flood_db.utils.country_resolver import resolve_countries
+from gdacs_flood_db.utils.geo_validation import (
+    mask_reasons,
+    register_rule,
+    validate_db,
+    validate_frame,
+    validate_row,
+)
+
+DB_PATH = Path(__file__).parent.parent / "data" / "gdacs_flood_db.csv"
+SCALES = [1, 10, 100]  # the DB replicated to larger synthetic DBs
+BROKEN = 0.01  # share of events given an invalid field
+CHANGED_EVENTS = 20  # daily churn for the cached runs
+
+
+def with_errors(df: pd.DataFrame, seed: int = 0) -> pd.DataFrame:
+    """
+    The DB with a few broken dates, codes and URLs, so both paths report
+    something.
+    """
+    rng = np.random.default_rng(seed)
+    df = df.copy()
+    for field, value in (
+        ("equi7_grid_code", ""),
+        ("fromdate", "2015-02-30T00:00:00"),
+        ("todate", None),
+        ("geometry_url", "https://www.gdacs.org/gdacsapi/api/polygons/getgeometry?eventtype=TC"),
+    ):
+        df.loc[rng.random(len(df)) < BROKEN, field] = value
+    return df
+
+
+def point_outside_country(df: pd.DataFrame) -> np.ndarray:
+    """
+    Example of a costlier rule: the point resolves to another country
+    than the event's ISO3.
+    """
+    resolved = resolve_countries(df["lon"], df["lat"])["iso3"]
+    return pd.notna(resolved) & (resolved != df["iso3"].to_numpy(dtype=object))
+
+
+def main():
+    base = read_db(DB_PATH)
+    print(f"{'events':>8}{'apply s':>10}{'columnar s':>12}{'speedup':>9}{'review':>8}")
+    for scale in SCALES:
+        df = with_errors(pd.concat([base] * scale, ignore_index=True))
+
+        t0 = time.perf_counter()
+        expected = df.apply(validate_row, axis=1)
+        per_row = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        mask = validate_frame(df)
+        reasons = mask_reasons(mask[mask != 0])
+        columnar = time.perf_counter() - t0
+
+        assert reasons == [r for r in expected if r]
+        print(
+            f"{len(df):8d}{per_row:10.3f}{columnar:12.3f}"
+            f"{per_row / columnar:8.0f}x{int((mask != 0).sum()):8d}"
+        )
+
+    # Daily runs as in update_flood_db: the DB and its fingerprint index
+    # are rewritten, then validated against the previous run's cache with
+    # the frame and index the job holds. The uncached run reads the DB
+    # back, as the job did before the cache; a spatial rule shows the
+    # cache with a costlier rule set.
+    df = with_errors(pd.concat([base] * SCALES[-1], ignore_index=True))
+    df["GDACS_ID"] = df["GDACS_ID"] + "-" + (df.index // len(base)).astype(str)
+    log = logging.getLogger(__name__)
+    for rules in ("built-in rules", "+ country check"):
+        if rules == "+ country check":
+            register_rule("point_outside_country", point_outside_country)
+        print(f"\nvalidate_db, {len(df)} events, {rules}")
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = Path(tmp) / "db.csv"
+            for label, cache in (("uncached", False), ("first cached", True), ("daily cached", True)):
+                if label == "daily cached":
+                    df.loc[df.index[-CHANGED_EVENTS:], "todate"] = "2030-01-01T00:00:00"
+                write_db(df, db_path)
+                fingerprints = build_fingerprint_index(df)
+                save_fingerprint_index(fingerprints, fingerprint_path(db_path))
+                t0 = time.perf_counter()
+                if cache:
+                    validate_db(db_path, log, fingerprints=fingerprints, df=df)
+                else:
+                    validate_db(db_path, log, cache=False)
+                print(f"{label:<14}{time.perf_counter() - t0:8.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,19 @@
 from gdacs_flood_db.pipeline import download_all_floods
 from gdacs_flood_db.logger import setup_logging
+from gdacs_flood_db.cache import ResponseCache
+from gdacs_flood_db.config import HTTP_CACHE_DIR
 import logging
 
+MAX_WORKERS = 8  # monthly windows fetched concurrently
+RATE_LIMIT = 4.0  # requests per second to gdacs.org
+
 if __name__ == "__main__":
 
     logger = logging.getLogger(__name__)
     setup_logging()
-    download_all_floods()
+    download_all_floods(
+        max_workers=MAX_WORKERS,
+        rate_limit=RATE_LIMIT,
+        cache=ResponseCache(HTTP_CACHE_DIR),
+    )
     logger.info("Flood events downloaded")
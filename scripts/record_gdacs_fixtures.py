@@ -0,0 +1,58 @@
+import logging
+from datetime import date
+from functools import partial
+from pathlib import Path
+
+from gdacs_flood_db.logger import setup_logging
+from gdacs_flood_db.pipeline import download_all_floods
+from gdacs_flood_db.replay import FixtureArchive, RecordingAdapter
+from gdacs_flood_db.storage import read_db
+from gdacs_flood_db.utils.download_aois import make_session, download_aoi
+
+logger = logging.getLogger(__name__)
+
+# --------------------------------------------------
+# Configuration
+# --------------------------------------------------
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+FIXTURE_PATH = DATA_DIR / "fixtures" / "gdacs_fixtures.jsonl.gz"
+
+START_DATE = date(2024, 1, 1)
+END_DATE = date(2025, 1, 1)
+MAX_AOIS = 200  # getgeometry responses to record
+
+# --------------------------------------------------
+# Main
+# --------------------------------------------------
+
+
+def main():
+    setup_logging()
+    archive = FixtureArchive()
+    transport = partial(RecordingAdapter, archive)
+    events_csv = FIXTURE_PATH.with_suffix("").with_suffix(".csv")
+    events_csv.parent.mkdir(parents=True, exist_ok=True)
+
+    download_all_floods(
+        START_DATE,
+        END_DATE,
+        output_csv=events_csv,
+        window_profile=None,
+        transport=transport,
+    )
+
+    urls = read_db(events_csv)["geometry_url"].dropna().head(MAX_AOIS)
+    session = make_session(use_cache=False, transport=transport)
+    for url in urls:
+        try:
+            download_aoi(url, session)
+        except Exception as e:
+            logger.warning(f"Could not record {url}: {e}")
+
+    archive.save(FIXTURE_PATH)
+    logger.info(f"Recorded {len(archive.entries)} responses to {FIXTURE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
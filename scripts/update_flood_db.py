@@ -5,9 +5,29 @@ from pathlib import Path
 import pandas as pd
 
 from gdacs_flood_db.logger import setup_logging
-from gdacs_flood_db.pipeline import download_all_floods
-from gdacs_flood_db.utils.detect_db_change import detect_updated_events
-from gdacs_flood_db.config import OUTPUT_CSV as NEW_DB_PATH
+from gdacs_flood_db.pipeline import download_all_floods, download_new_floods
+from gdacs_flood_db.utils.detect_db_change import diff_events
+from gdacs_flood_db.fingerprint import (
+    build_fingerprint_index,
+    diff_fingerprints,
+    fingerprint_path,
+    load_fingerprint_index,
+    save_fingerprint_index,
+)
+from gdacs_flood_db.utils.download_aois import sync_changed_aois
+from gdacs_flood_db.utils.geo_validation import validate_db
+from gdacs_flood_db.config import (
+    OUTPUT_CSV as NEW_DB_PATH,
+    HTTP_CACHE_DIR,
+    JOURNAL_DIR,
+    PARTITIONS_DIR,
+    DB_FORMAT,
+)
+from gdacs_flood_db.storage import read_db, write_db
+from gdacs_flood_db.sqlite_store import FloodStore
+from gdacs_flood_db.partitions import update_partitions
+from gdacs_flood_db.journal import ChangeJournal
+from gdacs_flood_db.cache import ResponseCache
 
 # --------------------------------------------------
 # Configuration
@@ -23,7 +43,18 @@ DATA_DIR = Path(__file__).parent.parent / "data"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 today = date.today()
 today_str = today.strftime("%Y%m%d")
-LATEST_DB_PATH = DATA_DIR / "latest_gdacs_flood_db.csv"
+LATEST_DB_PATH = DATA_DIR / f"latest_gdacs_flood_db.{DB_FORMAT}"
+FINGERPRINTS_PATH = fingerprint_path(LATEST_DB_PATH)
+
+MAX_WORKERS = 8  # windows fetched concurrently
+RATE_LIMIT = 4.0  # requests per second to gdacs.org
+LOOKBACK_DAYS = 30  # days re-fetched before the last known event start
+SYNC_AOIS = True  # fetch AOIs of new events and of new episode polygons
+SNAPSHOT_EVERY_DAYS = 30  # full journal snapshot interval
+KEEP_DAILY_DOWNLOADS = True  # False once the change journal is trusted as the history
+WRITE_PARTITIONS = False  # keep the year/continent partitioned copy of the DB
+PARTITION_FORMAT = "csv"  # or "parquet"
+VALIDATE_DB = True  # refresh the needs_review / review_work files
 
 # --------------------------------------------------
 # Helpers
@@ -56,42 +87,61 @@ def main() -> None:
 
     # ------------------ Download ------------------ #
     logger.info("Downloading latest GDACS flood database...")
-    download_all_floods()
+    cache = ResponseCache(HTTP_CACHE_DIR)
+    if LATEST_DB_PATH.exists():
+        download_new_floods(
+            LATEST_DB_PATH,
+            lookback_days=LOOKBACK_DAYS,
+            max_workers=MAX_WORKERS,
+            rate_limit=RATE_LIMIT,
+            cache=cache,
+        )
+    else:
+        download_all_floods(
+            max_workers=MAX_WORKERS, rate_limit=RATE_LIMIT, cache=cache
+        )
     logger.info("Download completed.")
 
     # ------------------ Load ------------------ #
     if not LATEST_DB_PATH.exists():
         logger.warning("No existing latest DB found. Initializing baseline.")
         # exit early
-        df_new = pd.read_csv(NEW_DB_PATH)
-        df_new.to_csv(LATEST_DB_PATH)
+        df_new = read_db(NEW_DB_PATH)
+        write_db(df_new, LATEST_DB_PATH)
+        save_fingerprint_index(build_fingerprint_index(df_new), FINGERPRINTS_PATH)
+        ChangeJournal(JOURNAL_DIR).write_snapshot(df_new, today)
         logger.info(f"Latest DB initialized: {LATEST_DB_PATH}")
         return
-    else:
-        df_old = pd.read_csv(LATEST_DB_PATH)
 
-    df_new = pd.read_csv(NEW_DB_PATH)
+    df_new = read_db(NEW_DB_PATH)
+
+    # Diff against the fingerprint index of the latest DB; the full
+    # previous DB is only read when no index was written yet
+    fingerprints = load_fingerprint_index(FINGERPRINTS_PATH)
+    if fingerprints is not None:
+        logger.info(f"Previous DB size: {len(fingerprints)} events")
+        diff = diff_fingerprints(df_new, fingerprints)
+    else:
+        df_old = read_db(LATEST_DB_PATH)
+        logger.info(f"Previous DB size: {len(df_old)} events")
+        diff = diff_events(df_new, df_old)
 
-    logger.info(f"Previous DB size: {len(df_old)} events")
     logger.info(f"New DB size: {len(df_new)} events")
 
     db_changed = False
 
     # ------------------ New Events ------------------ #
-
-    new_events = df_new.loc[~df_new["GDACS_ID"].isin(df_old["GDACS_ID"])]
+    new_events = df_new.loc[df_new["GDACS_ID"].isin(diff.added)]
 
     logger.info(f"New events detected: {len(new_events)}")
+    logger.info(f"Events no longer listed: {len(diff.removed)}")
 
     if not new_events.empty:
         logger.info("New events summary:" + summarize_events(new_events))
         db_changed = True
 
     # ------------------ Changed Events ------------------ #
-    if not df_old.empty:
-        changed_events = detect_updated_events(df_new, df_old)
-    else:
-        changed_events = pd.DataFrame()
+    changed_events = diff.updated
 
     logger.info(f"Changed existing events: {len(changed_events)}")
 
@@ -105,12 +155,57 @@ def main() -> None:
 
         db_changed = True
 
+    # Other fields (alert level, country, Equi7 codes) change without
+    # being reported above; those rows must be rewritten too
+    other_changes = len(diff.upserted()) - len(new_events) - len(changed_events)
+    if other_changes > 0:
+        logger.info(f"Events with other field changes: {other_changes}")
+        db_changed = True
+
+    # ------------------ AOIs ------------------ #
+    if SYNC_AOIS and db_changed:
+        counts = sync_changed_aois(changed_events, new_events)
+        logger.info(
+            f"AOIs synced: {counts['downloaded']} downloaded "
+            f"({counts['refreshed']} new episodes), {counts['failed']} failed"
+        )
+
     # ------------------ Persist ------------------ #
+    journal = ChangeJournal(JOURNAL_DIR)
     if db_changed:
-        df_new.to_csv(LATEST_DB_PATH)
+        journal.record(today, diff, df_new)
+        if LATEST_DB_PATH.suffix == ".sqlite":
+            # Upsert only the affected events instead of rewriting the DB
+            with FloodStore(LATEST_DB_PATH) as store:
+                store.apply_diff(diff, df_new)
+        else:
+            write_db(df_new, LATEST_DB_PATH)
+        fingerprints = build_fingerprint_index(df_new)
+        save_fingerprint_index(fingerprints, FINGERPRINTS_PATH)
+        journal.maybe_snapshot(df_new, today, SNAPSHOT_EVERY_DAYS)
         logger.info(f"Latest DB updated: {LATEST_DB_PATH}")
+
+        if WRITE_PARTITIONS:
+            changed_ids = [*diff.upserted(), *diff.removed]
+            update_partitions(df_new, changed_ids, PARTITIONS_DIR, f".{PARTITION_FORMAT}")
     else:
         logger.info("No changes detected. Latest DB not updated.")
+        if fingerprints is None:
+            fingerprints = build_fingerprint_index(df_old)
+            save_fingerprint_index(fingerprints, FINGERPRINTS_PATH)
+
+    if VALIDATE_DB:
+        # Only events whose fingerprint is new are validated; the latest
+        # DB holds the same rows as df_new
+        validate_db(LATEST_DB_PATH, logger, fingerprints=fingerprints, df=df_new)
+
+    if not journal.snapshots():
+        # Existing installs start their journal from the current DB
+        journal.write_snapshot(read_db(LATEST_DB_PATH), today)
+
+    if not KEEP_DAILY_DOWNLOADS:
+        NEW_DB_PATH.unlink(missing_ok=True)
+        logger.info(f"Daily download removed: {NEW_DB_PATH}")
 
     # ------------------ Final ------------------ #
     logger.info("=" * 70)